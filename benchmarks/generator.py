@@ -0,0 +1,174 @@
+"""Deterministic synthetic household/individual workbooks and csv files.
+
+The sheets have the same columns of `tests/data/rdi1.xlsx` (and of the `hh_validator`/`ind_validator`
+fixtures): each household has between 1 and 6 individuals (about 3.5 on average).
+Workbooks are written in streaming mode, so strings are stored inline instead of in the shared
+strings table Excel uses: absolute xlsx figures are lower than with Excel files, compare them across commits.
+
+    python -m benchmarks.generator --households 10000 --output /tmp/bench
+"""
+
+import argparse
+import csv
+import random
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from openpyxl import Workbook
+
+SEED = 2024
+
+HOUSEHOLD_COLUMNS = (
+    "household_id",
+    "consent_h_c",
+    "country_origin_h_c",
+    "country_h_c",
+    "admin1_h_c",
+    "admin2_h_c",
+    "size_h_c",
+    "hh_latrine_h_f",
+    "hh_electricity_h_f",
+    "registration_method_h_c",
+    "collect_individual_data_h_c",
+    "name_enumerator_h_c",
+    "org_enumerator_h_c",
+    "consent_sharing_h_c",
+    "first_registration_date_h_c",
+)
+INDIVIDUAL_COLUMNS = (
+    "household_id",
+    "relationship_i_c",
+    "full_name_i_c",
+    "given_name_i_c",
+    "middle_name_i_c",
+    "family_name_i_c",
+    "photo_i_c",
+    "gender_i_c",
+    "birth_date_i_c",
+    "estimated_birth_date_i_c",
+    "national_id_no_i_c",
+    "national_id_photo_i_c",
+    "national_id_issuer_i_c",
+    "phone_no_i_c",
+    "primary_collector_id",
+    "alternate_collector_id",
+    "first_registration_date_i_c",
+    "disability_i_c",
+)
+
+GIVEN_NAMES = ("Edward", "Mary", "Ryan", "Linda", "James", "Sarah", "Hery", "Fara", "Naina", "Tiana")
+FAMILY_NAMES = ("Rogers", "Smith", "Rakoto", "Rabe", "Andria", "Johnson", "Brown", "Razafy")
+ADMIN2 = ("MG31301", "MG31302", "MG32101", "MG33201", "MG11101")
+ENUMERATORS = ("Ryan", "Mary", "Hery")
+RELATIONSHIPS = ("SON_DAUGHTER", "WIFE_HUSBAND", "BROTHER_SISTER", "MOTHER_FATHER")
+REGISTRATION_DATE = datetime(2023, 6, 18)
+
+
+def generate(households: int, seed: int = SEED) -> Iterator[tuple[str, tuple[Any, ...]]]:
+    """Yield `("household" | "individual", row)` tuples, each household followed by its members."""
+    rnd = random.Random(seed)  # noqa: S311
+    for hh_id in range(1, households + 1):
+        size = rnd.randint(1, 6)
+        admin2 = rnd.choice(ADMIN2)
+        yield (
+            "household",
+            (
+                hh_id,
+                True,
+                "MDG",
+                "MDG",
+                admin2[:4],
+                admin2,
+                size,
+                rnd.randint(0, 1),
+                rnd.randint(0, 1),
+                "HH_REGISTRATION",
+                1,
+                rnd.choice(ENUMERATORS),
+                "PARTNER",
+                "unicef government_partner",
+                REGISTRATION_DATE,
+            ),
+        )
+        family_name = rnd.choice(FAMILY_NAMES)
+        for member in range(size):
+            given_name, middle_name = rnd.choice(GIVEN_NAMES), rnd.choice(GIVEN_NAMES)
+            yield (
+                "individual",
+                (
+                    hh_id,
+                    "HEAD" if member == 0 else rnd.choice(RELATIONSHIPS),
+                    f"{given_name} {middle_name} {family_name}",
+                    given_name,
+                    middle_name,
+                    family_name,
+                    None,
+                    rnd.choice(("FEMALE", "MALE")),
+                    datetime(rnd.randint(1940, 2022), rnd.randint(1, 12), rnd.randint(1, 28)),
+                    rnd.random() < 0.2,  # noqa: PLR2004
+                    f"XY{rnd.randint(0, 10**8):08d}",
+                    None,
+                    "MDG",
+                    f"+2613{rnd.randint(0, 10**8):08d}",
+                    hh_id if member == 0 else None,
+                    None,
+                    REGISTRATION_DATE,
+                    "disabled" if rnd.random() < 0.05 else "not disabled",  # noqa: PLR2004
+                ),
+            )
+
+
+def write_xlsx(path: Path, households: int, seed: int = SEED) -> Path:
+    wb = Workbook(write_only=True)
+    sheets = {"household": wb.create_sheet("Households"), "individual": wb.create_sheet("Individuals")}
+    sheets["household"].append(HOUSEHOLD_COLUMNS)
+    sheets["individual"].append(INDIVIDUAL_COLUMNS)
+    for kind, row in generate(households, seed):
+        sheets[kind].append(row)
+    wb.save(path)
+    return path
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return "" if value is None else value
+
+
+def write_csv(directory: Path, households: int, seed: int = SEED) -> tuple[Path, Path]:
+    paths = (directory / f"households-{households}.csv", directory / f"individuals-{households}.csv")
+    with paths[0].open("w", newline="") as hh, paths[1].open("w", newline="") as ind:
+        writers = {"household": csv.writer(hh), "individual": csv.writer(ind)}
+        writers["household"].writerow(HOUSEHOLD_COLUMNS)
+        writers["individual"].writerow(INDIVIDUAL_COLUMNS)
+        for kind, row in generate(households, seed):
+            writers[kind].writerow([_csv_value(v) for v in row])
+    return paths
+
+
+def get_dataset(directory: Path, households: int, seed: int = SEED) -> dict[str, Path]:
+    """Return the paths of the dataset of `households` households, generating the missing files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    xlsx = directory / f"rdi-{households}.xlsx"
+    if not xlsx.exists():
+        write_xlsx(xlsx, households, seed)
+    hh_csv, ind_csv = directory / f"households-{households}.csv", directory / f"individuals-{households}.csv"
+    if not (hh_csv.exists() and ind_csv.exists()):
+        write_csv(directory, households, seed)
+    return {"xlsx": xlsx, "households_csv": hh_csv, "individuals_csv": ind_csv}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, nargs="+", default=[1000])
+    parser.add_argument("--output", type=Path, default=Path(".benchmarks"))
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+    for households in args.households:
+        get_dataset(args.output, households, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Measure throughput, time to first row and peak memory of readers and validators.
+
+    python -m benchmarks.runner --households 1000 10000 --output results.json
+    python -m benchmarks.runner --compare base.json results.json
+
+Each case runs in its own (forked) process, so that `peak_rss_kb` is not affected by the previous ones.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from .generator import SEED, get_dataset
+
+HERE = Path(__file__).parent
+RESULTS_VERSION = 1
+
+
+def setup_django() -> None:
+    sys.path.insert(0, str(HERE.parent / "src"))
+    sys.path.insert(0, str(HERE.parent / "tests" / "demoapp"))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "demo.settings")
+
+    import django  # noqa: PLC0415
+    from django.db import connection  # noqa: PLC0415
+
+    django.setup()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def get_validators() -> tuple[Any, Any]:
+    """Return household/individual fieldsets shaped like the `hh_validator`/`ind_validator` test fixtures."""
+    from django import forms  # noqa: PLC0415
+    from hope_flex_fields.models import FieldDefinition, Fieldset, FlexField  # noqa: PLC0415
+
+    from .generator import HOUSEHOLD_COLUMNS, INDIVIDUAL_COLUMNS  # noqa: PLC0415
+
+    charfield = FieldDefinition.objects.get(field_type=forms.CharField)
+    choicefield = FieldDefinition.objects.get(field_type=forms.ChoiceField)
+    datefield = FieldDefinition.objects.get(field_type=forms.DateField)
+    special = {
+        "gender_i_c": (choicefield, {"choices": [["FEMALE", "FEMALE"], ["MALE", "MALE"]]}),
+        "birth_date_i_c": (datefield, {}),
+        "disability_i_c": (choicefield, {"choices": [["not disabled", "not disabled"], ["disabled", "disabled"]]}),
+    }
+    validators = []
+    for name, columns in (("household", HOUSEHOLD_COLUMNS), ("individual", INDIVIDUAL_COLUMNS)):
+        fs, __ = Fieldset.objects.get_or_create(name=f"benchmark {name}")
+        for column in columns:
+            definition, attrs = special.get(column, (charfield, {}))
+            FlexField.objects.get_or_create(name=column, fieldset=fs, definition=definition, attrs=attrs)
+        validators.append(fs)
+    hh, ind = validators
+    hh.set_primary_key_col("household_id")
+    ind.set_master(hh, "household_id")
+    return hh, ind
+
+
+class Probe:
+    """Counts the rows flowing through an iterable and records when the first one is produced."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.first_row: float | None = None
+        self.rows = 0
+
+    def __call__(self, rows: Iterable[Any]) -> Iterator[Any]:
+        for row in rows:
+            if self.first_row is None:
+                self.first_row = time.perf_counter() - self.started
+            self.rows += 1
+            yield row
+
+
+def _open_xls(dataset: dict[str, Path], probe: Probe) -> None:
+    from hope_smart_import.readers import open_xls  # noqa: PLC0415
+
+    for __ in probe(open_xls(str(dataset["xlsx"]), index_or_name=1)):
+        pass
+
+
+def _open_xls_multi(dataset: dict[str, Path], probe: Probe) -> None:
+    from hope_smart_import.readers import open_xls_multi  # noqa: PLC0415
+
+    for __, rows in open_xls_multi(str(dataset["xlsx"]), [0, 1]):
+        for __ in probe(rows):
+            pass
+
+
+def _open_csv(dataset: dict[str, Path], probe: Probe) -> None:
+    from hope_smart_import.readers import open_csv  # noqa: PLC0415
+
+    for __ in probe(open_csv(str(dataset["individuals_csv"]), has_header=True)):
+        pass
+
+
+def _validate_single(dataset: dict[str, Path], probe: Probe) -> None:
+    from hope_smart_import.readers import open_xls  # noqa: PLC0415
+    from hope_smart_import.shortcuts import validate_single  # noqa: PLC0415
+
+    hh, __ = get_validators()
+    probe.started = time.perf_counter()
+    validate_single(probe(open_xls(str(dataset["xlsx"]), index_or_name=0)), hh)
+
+
+def _validate_xls_multi(dataset: dict[str, Path], probe: Probe, **kwargs: Any) -> None:
+    from hope_smart_import.readers import open_xls_multi  # noqa: PLC0415
+    from hope_smart_import.shortcuts import validate_xls_multi  # noqa: PLC0415
+
+    hh, ind = get_validators()
+    probe.started = time.perf_counter()
+    sheets = ((i, probe(rows)) for i, rows in open_xls_multi(str(dataset["xlsx"]), [0, 1]))
+    validate_xls_multi(sheets, [hh, ind], **kwargs)
+
+
+CASES: dict[str, Callable[[dict[str, Path], Probe], None]] = {
+    "open_xls": _open_xls,
+    "open_xls_multi": _open_xls_multi,
+    "open_csv": _open_csv,
+    "validate_single": _validate_single,
+    "validate_xls_multi": _validate_xls_multi,
+    "validate_xls_multi_columnar": partial(_validate_xls_multi, columnar=True),
+}
+
+
+def run_case(case: str, dataset: dict[str, Path]) -> dict[str, Any]:
+    probe = Probe()
+    CASES[case](dataset, probe)
+    seconds = time.perf_counter() - probe.started
+    return {
+        "case": case,
+        "rows": probe.rows,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(probe.rows / seconds, 1) if seconds else None,
+        "first_row_seconds": None if probe.first_row is None else round(probe.first_row, 4),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=HERE, text=True).strip()  # noqa: S607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(cases: list[str], households: list[int], directory: Path, seed: int = SEED) -> dict[str, Any]:
+    setup_django()
+    results = []
+    for size in households:
+        dataset = get_dataset(directory, size, seed)
+        for case in cases:
+            with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as executor:
+                result = executor.submit(run_case, case, dataset).result()
+            results.append({"households": size, **result})
+            sys.stdout.write(f"{size:>8} {case:<20} {result['rows']:>9} rows {result['rows_per_second']:>10} rows/s\n")
+    return {
+        "version": RESULTS_VERSION,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(base: dict[str, Any], current: dict[str, Any], threshold: float = 0.1) -> list[str]:
+    """Return the cases whose throughput dropped more than `threshold` compared to `base`."""
+    previous = {(r["households"], r["case"]): r for r in base["results"]}
+    regressions = []
+    for r in current["results"]:
+        if not (old := previous.get((r["households"], r["case"]))) or not old["rows_per_second"]:
+            continue
+        ratio = (r["rows_per_second"] or 0) / old["rows_per_second"]
+        rss = r["peak_rss_kb"] / old["peak_rss_kb"] if old["peak_rss_kb"] else 0
+        sys.stdout.write(f"{r['households']:>8} {r['case']:<20} speed x{ratio:.2f} rss x{rss:.2f}\n")
+        if ratio < 1 - threshold:
+            regressions.append(f"{r['households']}:{r['case']}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, nargs="+", default=[1000])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--data", type=Path, default=Path(".benchmarks"))
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASE", "CURRENT"))
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        base, current = (json.loads(p.read_text()) for p in args.compare)
+        regressions = compare(base, current, args.threshold)
+        if regressions:
+            sys.stdout.write(f"regressions: {', '.join(regressions)}\n")
+        return 1 if regressions else 0
+
+    results = run(args.cases, args.households, args.data, args.seed)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,123 @@
+import zipfile
+from typing import Any
+from urllib.parse import urlencode
+
+from admin_extra_buttons.decorators import button
 from admin_extra_buttons.mixins import ExtraButtonsMixin
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core import signing
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from .forms import ImportFileForm, PreviewFileForm
+from .models import Configuration, ImportJob
+from .preview import preview_page, storage, store_upload
+from .readers import SheetNotError
+
+PREVIEW_SALT = "hope_smart_import.preview"
+
 
-from .models import Configuration
+def _queue(model_admin: admin.ModelAdmin, request: HttpRequest, job: ImportJob) -> bool:
+    # celery is an optional dependency: without it the jobs cannot be queued
+    try:
+        job.queue()
+    except ImportError as e:
+        model_admin.message_user(request, f"Unable to queue job #{job.pk}: {e}", messages.ERROR)
+        return False
+    model_admin.message_user(request, f"Job #{job.pk} queued", messages.SUCCESS)
+    return True
 
 
 @admin.register(Configuration)
 class ConfigurationAdmin(ExtraButtonsMixin, admin.ModelAdmin):
-    pass
+    @button()
+    def import_file(self, request: HttpRequest, pk: str) -> HttpResponse:
+        ctx = self.get_common_context(request, pk, title="Import file")
+        if request.method == "POST":
+            form = ImportFileForm(request.POST, request.FILES)
+            if form.is_valid():
+                job = ImportJob.objects.create(configuration=self.object, **form.cleaned_data)
+                if _queue(self, request, job):
+                    return HttpResponseRedirect(reverse("admin:hope_smart_import_importjob_change", args=[job.pk]))
+                job.file.delete(save=False)
+                job.delete()
+        else:
+            form = ImportFileForm()
+        ctx["form"] = form
+        return TemplateResponse(request, "hope_smart_import/import_file.html", ctx)
+
+    @button()
+    def test_file(self, request: HttpRequest, pk: str) -> HttpResponse:
+        ctx = self.get_common_context(request, pk, title="Test file")
+        if request.method == "POST":
+            form = PreviewFileForm(request.POST, request.FILES)
+            if form.is_valid():
+                preview = {
+                    "file": store_upload(form.cleaned_data["file"]),
+                    "sheet": form.cleaned_data["sheet"],
+                    "page_size": form.cleaned_data["page_size"],
+                }
+                token = signing.dumps(preview, salt=PREVIEW_SALT)
+                return HttpResponseRedirect(f"{request.path}?{urlencode({'preview': token})}")
+        elif "preview" in request.GET:
+            form = self._preview(request, ctx)
+        else:
+            form = PreviewFileForm()
+        ctx["form"] = form
+        return TemplateResponse(request, "hope_smart_import/test_file.html", ctx)
+
+    def _preview(self, request: HttpRequest, ctx: dict[str, Any]) -> PreviewFileForm:
+        # the uploaded file is stored once, pages are read and validated one at a time
+        try:
+            preview = signing.loads(request.GET["preview"], salt=PREVIEW_SALT)
+        except signing.BadSignature:
+            self.message_user(request, "Invalid preview", messages.ERROR)
+            return PreviewFileForm()
+        page = request.GET.get("page", "1")
+        try:
+            ctx["page"] = preview_page(
+                storage.path(preview["file"]),
+                self.object.get_compiled_checker(),
+                sheet=preview["sheet"],
+                page=max(int(page), 1) if page.isdigit() else 1,
+                page_size=preview["page_size"],
+            )
+        except (SheetNotError, OSError, ValueError, zipfile.BadZipFile) as e:
+            self.message_user(request, f"Unable to read the file: {e}", messages.ERROR)
+        ctx["preview"] = request.GET["preview"]
+        return PreviewFileForm(initial={"sheet": preview["sheet"], "page_size": preview["page_size"]})
+
+    @button()
+    def jobs(self, request: HttpRequest, pk: str) -> HttpResponse:
+        url = reverse("admin:hope_smart_import_importjob_changelist")
+        return HttpResponseRedirect(f"{url}?configuration__id__exact={pk}")
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(ExtraButtonsMixin, admin.ModelAdmin):
+    list_display = ("__str__", "configuration", "status", "created", "finished", "rows", "invalid")
+    list_filter = ("status", "configuration")
+    readonly_fields = ("status", "task_id", "progress", "result", "created", "started", "finished")
+
+    @admin.display()
+    def rows(self, obj: ImportJob) -> int | None:
+        return obj.result.get("rows", obj.progress.get("rows"))
+
+    @admin.display()
+    def invalid(self, obj: ImportJob) -> int | None:
+        return obj.result.get("invalid")
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    @button(visible=lambda btn: btn.original.status == ImportJob.Status.FAILURE)
+    def requeue(self, request: HttpRequest, pk: str) -> None:
+        job = self.get_object(request, pk)
+        previous = job.status, job.progress, job.result
+        job.status = ImportJob.Status.QUEUED
+        job.progress = job.result = {}
+        job.save(update_fields=["status", "progress", "result"])
+        if not _queue(self, request, job):
+            job.status, job.progress, job.result = previous
+            job.save(update_fields=["status", "progress", "result"])
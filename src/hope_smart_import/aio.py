@@ -0,0 +1,198 @@
+import asyncio
+import os
+import threading
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from contextlib import aclosing
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from asgiref.sync import sync_to_async
+
+from .readers import open_csv, open_xls, open_xls_multi
+from .validation import SheetValidator
+
+if TYPE_CHECKING:
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .keyindex import KeyIndexFactory
+    from .memo import ValidationMemo
+    from .types import RowResult
+
+DEFAULT_BLOCK_SIZE = 500
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+_executor: Executor | None = None
+_lock = threading.Lock()
+
+AsyncSheetResult = AsyncIterator["RowResult"]
+
+
+def get_executor() -> Executor:
+    """Return the thread pool shared by the async readers and validations (`DEFAULT_WORKERS` threads)."""
+    global _executor  # noqa: PLW0603
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(DEFAULT_WORKERS, thread_name_prefix="hope-smart-import")
+        return _executor
+
+
+async def _run(executor: Executor | None, func: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(executor or get_executor(), partial(func, *args))
+
+
+def _next_block(it: Iterator[Any], size: int) -> list[Any]:
+    return list(islice(it, size))
+
+
+async def aiterate(
+    g: Iterable[Any], *, block_size: int = DEFAULT_BLOCK_SIZE, executor: Executor | None = None
+) -> AsyncIterator[Any]:
+    """Consume the blocking iterable `g` in the executor, `block_size` items per call.
+
+    Each upload only holds a thread while a block is produced, so many of them can share a small pool.
+    """
+    it = iter(g)
+    try:
+        while block := await _run(executor, _next_block, it, block_size):
+            for item in block:
+                yield item
+    finally:
+        if close := getattr(it, "close", None):
+            await _run(executor, close)
+
+
+def aopen_csv(
+    filepath: str, *, block_size: int = DEFAULT_BLOCK_SIZE, executor: Executor | None = None, **kwargs: Any
+) -> AsyncSheetResult:
+    """Async `open_csv()`: the same options, rows are parsed in the executor."""
+    return aiterate(open_csv(filepath, **kwargs), block_size=block_size, executor=executor)
+
+
+def aopen_xls(
+    filepath: str, *, block_size: int = DEFAULT_BLOCK_SIZE, executor: Executor | None = None, **kwargs: Any
+) -> AsyncSheetResult:
+    """Async `open_xls()`: the same options, the workbook is loaded and parsed in the executor."""
+    return aiterate(open_xls(filepath, **kwargs), block_size=block_size, executor=executor)
+
+
+async def aopen_xls_multi(
+    filepath: str,
+    *args: Any,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    executor: Executor | None = None,
+    **kwargs: Any,
+) -> AsyncIterator[tuple[int, AsyncSheetResult]]:
+    """Async `open_xls_multi()`: each sheet must be consumed before moving to the next one."""
+    g = open_xls_multi(filepath, *args, **kwargs)
+    try:
+        while (sheet := await _run(executor, next, g, None)) is not None:
+            index, rows = sheet
+            yield index, aiterate(rows, block_size=block_size, executor=executor)
+    finally:
+        await _run(executor, g.close)
+
+
+async def _blocks(g: Iterable[Any] | AsyncIterator[Any], block_size: int, executor: Executor | None) -> AsyncIterator:
+    if not hasattr(g, "__aiter__"):
+        g = aiterate(g, block_size=block_size, executor=executor)
+    block = []
+    async for row in g:
+        block.append(row)
+        if len(block) >= block_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+async def _validate(  # noqa: PLR0913
+    g: Iterable["RowResult"] | AsyncSheetResult,
+    validator: SheetValidator,
+    *,
+    max_errors: int | None,
+    block_size: int,
+    executor: Executor | None,
+) -> AsyncIterator[tuple[int, Any]]:
+    await _run(executor, validator.setup)
+    row, found = 0, 0
+    blocks = _blocks(g, block_size, executor)
+    try:
+        async for block in blocks:
+            for errors in await _run(executor, validator.validate_rows, block):
+                row += 1
+                if errors:
+                    yield row, errors
+                    found += 1
+                    if max_errors is not None and found >= max_errors:
+                        return
+                elif validator.include_success:
+                    yield row, "Ok"
+    finally:
+        # closes the reader as well
+        await blocks.aclose()
+
+
+async def avalidate_single(  # noqa: PLR0913
+    g: Iterable["RowResult"] | AsyncSheetResult,
+    checker: "ValidatorMixin",
+    *,
+    include_success: bool = False,
+    fail_if_alien: bool = False,
+    memo: "ValidationMemo | None" = None,
+    key_index: "KeyIndexFactory | None" = None,
+    max_errors: int | None = None,
+    stop_on_first_error: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    executor: Executor | None = None,
+) -> AsyncIterator[tuple[int, Any]]:
+    """Async `validate_single()` yielding the `(row, errors)` pairs as soon as each block of rows is validated.
+
+    The checker form is built with `sync_to_async` (it queries the database), rows are validated in the executor.
+    """
+    validator = await sync_to_async(SheetValidator)(
+        checker, include_success=include_success, fail_if_alien=fail_if_alien, memo=memo, key_index=key_index
+    )
+    results = _validate(
+        g,
+        validator,
+        max_errors=1 if stop_on_first_error else max_errors,
+        block_size=block_size,
+        executor=executor,
+    )
+    async with aclosing(results):
+        async for result in results:
+            yield result
+
+
+async def avalidate_xls_multi(  # noqa: PLR0913
+    g: AsyncIterator[tuple[int, AsyncSheetResult]],
+    checkers: list["ValidatorMixin"],
+    include_success: bool = False,
+    fail_if_alien: bool = False,
+    *,
+    memo: "ValidationMemo | None" = None,
+    key_index: "KeyIndexFactory | None" = None,
+    max_errors: int | None = None,
+    stop_on_first_error: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    executor: Executor | None = None,
+) -> AsyncIterator[tuple[str, int, Any]]:
+    """Async `validate_xls_multi()` over `aopen_xls_multi()` yielding `(sheet label, row, errors)`."""
+    remaining = 1 if stop_on_first_error else max_errors
+    async with aclosing(g):
+        async for sheet_index, rows in g:
+            checker = checkers[sheet_index]
+            label = f"{sheet_index + 1}:{checker.name}"
+            validator = await sync_to_async(SheetValidator)(
+                checker, include_success=include_success, fail_if_alien=fail_if_alien, memo=memo, key_index=key_index
+            )
+            results = _validate(rows, validator, max_errors=remaining, block_size=block_size, executor=executor)
+            async with aclosing(results):
+                async for row, errors in results:
+                    yield label, row, errors
+                    if remaining is not None and not isinstance(errors, str):
+                        remaining -= 1
+            if remaining is not None and remaining <= 0:
+                return
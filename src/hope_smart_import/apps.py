@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class Config(AppConfig):
     name = "hope_smart_import"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self) -> None:
+        from . import checks, signals  # noqa: F401, PLC0415
+
+        signals.connect()
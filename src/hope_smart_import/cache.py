@@ -0,0 +1,112 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+BLOCK_SIZE = 1000
+CACHE_VERSION = 1
+
+
+def file_digest(filepath: str) -> str:
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of the values parsed from workbook sheets.
+
+    Entries are keyed by the sha256 of the file content and the sheet name and store the raw rows
+    (header included) as a sequence of pickled blocks, so reader options (`start_at_row`,
+    `has_header`, `value_mapper`...) are applied on top of them and do not need their own entry.
+    When the directory grows over `max_size` bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str, sheet: str | None = None) -> Path:
+        if sheet is None:
+            return self.directory / f"{digest}.v{CACHE_VERSION}.sheets"
+        return self.directory / f"{digest}-{hashlib.sha1(sheet.encode()).hexdigest()}.v{CACHE_VERSION}.rows"  # noqa: S324
+
+    def _open(self, path: Path) -> IO[bytes] | None:
+        try:
+            f = open(path, "rb")  # noqa: SIM115
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return f
+
+    def _store(self, path: Path, objs: Iterable[Any]) -> Iterator[Any]:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for obj in objs:
+                    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    yield obj
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        self.evict()
+
+    def get_sheetnames(self, digest: str) -> list[str] | None:
+        if (f := self._open(self._path(digest))) is None:
+            return None
+        with f:
+            return pickle.load(f)  # noqa: S301 cache files are only written by ParseCache
+
+    def set_sheetnames(self, digest: str, sheetnames: list[str]) -> None:
+        for __ in self._store(self._path(digest), [list(sheetnames)]):
+            pass
+
+    def contains(self, digest: str, sheet: str) -> bool:
+        return self._path(digest, sheet).exists()
+
+    def read(self, digest: str, sheet: str) -> Iterator[tuple[Any, ...]] | None:
+        if (f := self._open(self._path(digest, sheet))) is None:
+            return None
+        return self._load(f)
+
+    def _load(self, f: IO[bytes]) -> Iterator[tuple[Any, ...]]:
+        with f:
+            while True:
+                try:
+                    block = pickle.load(f)  # noqa: S301 cache files are only written by ParseCache
+                except EOFError:
+                    return
+                yield from block
+
+    def write(self, digest: str, sheet: str, rows: Iterable[tuple[Any, ...]]) -> Iterator[tuple[Any, ...]]:
+        """Yield `rows` while storing them; the entry is saved only if `rows` are fully consumed."""
+        rows = iter(rows)
+        for block in self._store(self._path(digest, sheet), iter(lambda: list(islice(rows, BLOCK_SIZE)), [])):
+            yield from block
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.iterdir() if p.is_file())
+
+    def evict(self) -> None:
+        entries = []
+        for p in self.directory.iterdir():
+            if p.is_file() and p.suffix != ".tmp":
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+        total = sum(e[1] for e in entries)
+        for __, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        for p in self.directory.iterdir():
+            if p.is_file():
+                p.unlink(missing_ok=True)
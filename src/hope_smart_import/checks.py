@@ -0,0 +1,25 @@
+from typing import Any
+
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@checks.register()
+def check_shared_cache(app_configs: Any = None, **kwargs: Any) -> list[checks.Warning]:
+    """Warn when the `default` cache cannot notify the other processes that the compiled checkers changed."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Warning(
+            f"The default cache ({backend}) is not shared between processes",
+            hint="Compiled checkers of other processes are not invalidated when the configurations change: "
+            "use a shared cache backend (ie. Redis or Memcached) with more than one process.",
+            id="hope_smart_import.W001",
+        )
+    ]
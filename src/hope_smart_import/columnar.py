@@ -0,0 +1,139 @@
+import json
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms.widgets import ChoiceWidget
+
+if TYPE_CHECKING:
+    from hope_flex_fields.forms import FlexForm
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .types import RowResult
+    from .validation import RowOutcome
+
+# distinct values remembered per column, columns with more unique values (ie. ids) are cleaned value by value
+MAX_DISTINCT = 10000
+_MISSING = object()
+
+
+def _reads_value(widget: forms.Widget) -> bool:
+    # the form reads `data.get(name)` from these widgets
+    if isinstance(widget, ChoiceWidget):
+        return (
+            not widget.allow_multiple_selected and type(widget).value_from_datadict is ChoiceWidget.value_from_datadict
+        )
+    return type(widget).value_from_datadict is forms.Widget.value_from_datadict
+
+
+def is_columnar(field: forms.Field) -> bool:
+    """Return True if the cleaning of `field` only depends on its own value, so that it can be done by column."""
+    flex_field = getattr(field, "flex_field", None)
+    return (
+        not field.disabled
+        and not field.show_hidden_initial
+        and not (flex_field is not None and flex_field.master_id)
+        and not hasattr(field, "validate_with_parent")
+        and _reads_value(field.widget)
+    )
+
+
+def _has_rules(form_class: type["FlexForm"]) -> bool:
+    # fieldset validation rules need the whole cleaned row
+    fieldset = getattr(form_class, "fieldset", None)
+    return bool(getattr(form_class, "fieldset_specs", None)) or bool(fieldset and fieldset.has_validation_rules())
+
+
+class ColumnCleaner:
+    """Clean a single field over a column of values.
+
+    The outcome of each distinct value (its json-ready cleaned value or its error messages) is computed
+    once with `field.clean()` and then found with a dictionary lookup. Values are keyed with their type:
+    `1`, `1.0` and `True` are equal but are not cleaned the same way (ie. by a CharField).
+    """
+
+    def __init__(self, name: str, field: forms.Field, max_distinct: int = MAX_DISTINCT) -> None:
+        self.name = name
+        self.field = field
+        self.max_distinct = max_distinct
+        self.outcomes: dict[tuple[type, Any], tuple[Any, list[str] | None]] = {}
+
+    def _clean(self, value: Any) -> tuple[Any, list[str] | None]:
+        try:
+            cleaned = self.field.clean(value)
+        except ValidationError as e:
+            return None, list(e.messages)
+        # as done by `FlexForm.clean()`
+        return json.loads(json.dumps(cleaned, cls=DjangoJSONEncoder)), None
+
+    def clean(self, values: Sequence[Any]) -> list[tuple[Any, list[str] | None]]:
+        outcomes, results = self.outcomes, []
+        for value in values:
+            key = (type(value), value)
+            try:
+                outcome = outcomes.get(key, _MISSING)
+            except TypeError:  # unhashable
+                outcome = self._clean(value)
+            else:
+                if outcome is _MISSING:
+                    outcome = self._clean(value)
+                    if len(outcomes) < self.max_distinct:
+                        outcomes[key] = outcome
+            results.append(outcome)
+        return results
+
+
+class ColumnarCleaner:
+    """Form cleaning of a batch of rows done column by column, equivalent to `SheetValidator.clean_row()`.
+
+    Fields whose cleaning depends on other values (parent/child fields, custom widgets) are cleaned
+    row by row with a form made of those fields only.
+    """
+
+    def __init__(self, checker: "ValidatorMixin", form_class: type["FlexForm"], *, fail_if_alien: bool = False) -> None:
+        self.checker = checker
+        self.fail_if_alien = fail_if_alien
+        self.fields = list(form_class.base_fields)
+        self.known_fields = set(self.fields)
+        if _has_rules(form_class):
+            self.columns, fallback = {}, dict(form_class.base_fields)
+        else:
+            self.columns = {
+                name: ColumnCleaner(name, field) for name, field in form_class.base_fields.items() if is_columnar(field)
+            }
+            fallback = {name: field for name, field in form_class.base_fields.items() if name not in self.columns}
+        self.fallback_class = type(form_class.__name__, (form_class,), {}) if fallback else None
+        if self.fallback_class is not None:
+            self.fallback_class.base_fields = fallback
+
+    def clean_batch(self, rows: Sequence["RowResult"]) -> list["RowOutcome"]:
+        from .validation import RowOutcome  # noqa: PLC0415
+
+        columns = {name: column.clean([row.get(name) for row in rows]) for name, column in self.columns.items()}
+        outcomes = []
+        for i, row in enumerate(rows):
+            field_errors, cleaned_data = {}, {}
+            for name, results in columns.items():
+                cleaned, messages = results[i]
+                if messages is None:
+                    cleaned_data[name] = cleaned
+                else:
+                    field_errors[name] = messages
+            if self.fallback_class is not None:
+                self.checker.form = form = self.fallback_class(data=row, initial=row)
+                if not form.is_valid():
+                    field_errors.update((name, list(messages)) for name, messages in form.errors.items())
+                cleaned_data.update(form.cleaned_data)
+            # keep the order of the form errors
+            errors = {name: field_errors[name] for name in self.fields if name in field_errors}
+            errors.update((name, messages) for name, messages in field_errors.items() if name not in errors)
+            form_errors = len(errors)
+            if self.fallback_class is not None:
+                self.checker.validate_parent_child(errors, row)
+            alien = None
+            if self.fail_if_alien and (diff := set(row.keys()).difference(self.known_fields)):
+                alien = f"Alien values found {diff}"
+            outcomes.append(RowOutcome(errors, form_errors, alien, cleaned_data))
+        return outcomes
@@ -0,0 +1,61 @@
+import threading
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .generation import get_generation, next_generation
+
+if TYPE_CHECKING:
+    from hope_flex_fields.forms import FlexForm
+    from hope_flex_fields.models import DataChecker
+
+    from .models import Configuration
+
+# the generation counter tells the other processes to drop their compiled checkers:
+# it needs a cache shared by all of them (see `checks.check_shared_cache`)
+GENERATION_KEY = "hsi:compiled:generation"
+# form class attributes that point to the checker the form class has been built for
+BOUND_ATTRIBUTES = ("datachecker", "validator", "fieldset")
+
+_compiled: dict[Any, "CompiledChecker"] = {}
+_lock = threading.Lock()
+_generation: int | None = None
+
+
+class CompiledChecker(NamedTuple):
+    checker: "DataChecker"
+    form_class: type["FlexForm"]
+
+    @classmethod
+    def compile(cls, checker: "DataChecker") -> "CompiledChecker":
+        return cls(checker, checker.get_form_class())
+
+    def new_checker(self) -> "DataChecker":
+        """Return a fresh checker (with its own validation state) using the compiled form class."""
+        template = self.checker
+        checker = type(template)(**{f.attname: getattr(template, f.attname) for f in template._meta.concrete_fields})
+        checker._state.adding = False
+        checker._state.db = template._state.db
+        # the form class is shared, the subclass binds it to the new checker instead of the template
+        bound = {name: checker for name in BOUND_ATTRIBUTES if getattr(self.form_class, name, None) is template}
+        form_class = type(self.form_class.__name__, (self.form_class,), bound)
+        checker.get_form_class = lambda: form_class
+        return checker
+
+
+def get_compiled_checker(configuration: "Configuration") -> "DataChecker":
+    global _generation  # noqa: PLW0603
+    generation = get_generation(GENERATION_KEY)
+    with _lock:
+        if generation != _generation:
+            # another process changed the configurations
+            _compiled.clear()
+            _generation = generation
+        if (compiled := _compiled.get(configuration.pk)) is None:
+            compiled = _compiled[configuration.pk] = CompiledChecker.compile(configuration.checker)
+    return compiled.new_checker()
+
+
+def invalidate(**kwargs: Any) -> None:
+    global _generation  # noqa: PLW0603
+    with _lock:
+        _compiled.clear()
+        _generation = next_generation(GENERATION_KEY)
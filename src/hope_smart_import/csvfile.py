@@ -0,0 +1,190 @@
+import codecs
+import csv
+import io
+import mmap
+import os
+from array import array
+from collections.abc import Iterator
+from itertools import accumulate, islice
+from typing import Any
+
+DEFAULT_BLOCK_SIZE = 1000
+SCAN_WINDOW = 1 << 20
+
+
+# bytes the scanner looks for: they must be encoded as themselves
+SCAN_CHARS = '\n\r"'
+BLANK_LINES = (b"", b"\r")
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """Return True if `encoding` stores line breaks and quotes as single ASCII bytes (UTF-16 does not)."""
+    try:
+        return SCAN_CHARS.encode(encoding) == SCAN_CHARS.encode("ascii")
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _get_dialect(dialect: "str | type[csv.Dialect]") -> "csv.Dialect | type[csv.Dialect]":
+    return csv.get_dialect(dialect) if isinstance(dialect, str) else dialect
+
+
+def _quotechar(encoding: str, dialect: "str | type[csv.Dialect]") -> bytes | None:
+    if not is_ascii_compatible(encoding):
+        raise ValueError(f"CsvFile needs an ASCII compatible encoding, not {encoding!r}")
+    params = _get_dialect(dialect)
+    if params.quoting == csv.QUOTE_NONE or not params.quotechar:
+        return None
+    if not params.doublequote:
+        # only doubled quote chars are recognised as escaped by the scanner
+        raise ValueError("CsvFile does not support dialects with `doublequote=False`")
+    quote = params.quotechar.encode(encoding)
+    if len(quote) != 1:
+        raise ValueError(f"CsvFile needs a single byte quote char, not {params.quotechar!r}")
+    return quote
+
+
+def _parse(data: bytes, encoding: str, dialect: "str | type[csv.Dialect]") -> list[list[str]]:
+    # blank lines are skipped (as csv.DictReader does)
+    return [row for row in csv.reader(io.StringIO(data.decode(encoding), newline=""), dialect) if row]
+
+
+def read_range(filepath: str, start: int, end: int, encoding: str = "utf-8", dialect: str = "excel") -> list[list[str]]:
+    """Parse the rows stored between two byte offsets returned by `CsvFile.ranges()`."""
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        return _parse(f.read(end - start), encoding, dialect)
+
+
+class CsvFile:
+    """Memory mapped csv file with a row-offset index.
+
+    The index (the byte offset where each row starts) is built lazily while the rows are read,
+    so that once a row has been reached it can be accessed again with a single seek.
+    Line breaks inside quoted values are honoured by tracking the quote chars of `dialect` that open
+    (at the start of a field) and close a value, so the encoding must be ASCII compatible
+    (see `is_ascii_compatible()`).
+    Blank lines are not rows and a leading UTF-8 BOM is skipped.
+    """
+
+    def __init__(self, filepath: str, *, encoding: str = "utf-8", dialect: "str | type[csv.Dialect]" = "excel") -> None:
+        self._quote = _quotechar(encoding, dialect)
+        params = _get_dialect(dialect)
+        self._delimiter = params.delimiter.encode(encoding)
+        self._skip_spaces = params.skipinitialspace
+        self.filepath = filepath
+        self.encoding = encoding
+        self.dialect = dialect
+        self._file = open(filepath, "rb")  # noqa: SIM115
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm: mmap.mmap | bytes = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        start = len(codecs.BOM_UTF8) if self._mm[:3] == codecs.BOM_UTF8 else 0
+        self._offsets = array("q")
+        self._complete = False
+        self._scanner = self._scan(start)
+
+    def __enter__(self) -> "CsvFile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self._index_to(-1)
+        return len(self._offsets) - 1
+
+    @property
+    def indexed(self) -> int:
+        """Number of rows whose offsets are known: all of them once `index_block()` returned False."""
+        return max(len(self._offsets) - 1, 0)
+
+    def index_block(self) -> bool:
+        """Index the offsets of the next block of rows, return True while there are rows left to index."""
+        self._index_to(len(self._offsets))
+        return not self._complete
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def _scan(self, pos: int) -> Iterator[int]:
+        # yields the offset of each row, blank lines are left inside the previous row and skipped by `_parse()`
+        mm = self._mm
+        quote = self._quote
+        in_quotes = False
+        while pos < self.size:
+            # work on windows of whole lines, windows without quotes are split in one go
+            end = min(pos + SCAN_WINDOW, self.size)
+            if end < self.size:
+                nl = mm.rfind(b"\n", pos, end)
+                if nl == -1:
+                    nl = mm.find(b"\n", end)
+                end = self.size if nl == -1 else nl + 1
+            window = mm[pos:end]
+            if not in_quotes and (quote is None or quote not in window):
+                lines = window.split(b"\n")
+                if not lines[-1]:
+                    lines.pop()
+                starts = accumulate((len(line) + 1 for line in lines[:-1]), initial=pos)
+                yield from (start for start, line in zip(starts, lines, strict=True) if line not in BLANK_LINES)
+                pos = end
+                continue
+            while pos < end:
+                nl = mm.find(b"\n", pos, end)
+                line_end = end if nl == -1 else nl + 1
+                if not in_quotes and mm[pos:line_end].rstrip(b"\n") not in BLANK_LINES:
+                    yield pos
+                if in_quotes or mm.find(quote, pos, line_end) != -1:
+                    in_quotes = self._ends_quoted(mm[pos:line_end], in_quotes)
+                pos = line_end
+
+    def _ends_quoted(self, line: bytes, in_quotes: bool) -> bool:
+        # return True if `line` ends inside a quoted value. As csv.reader does, a quote char opens a quoted
+        # value only at the start of a field (ie. `5" tv` is a literal), doubled quote chars are escaped
+        quote, delimiter = self._quote, self._delimiter
+        pos = 0
+        while (q := line.find(quote, pos)) != -1:
+            if in_quotes:
+                if line[q + 1 : q + 2] == quote:
+                    pos = q + 2
+                    continue
+                in_quotes = False
+            else:
+                before = line[:q].rstrip(b" ") if self._skip_spaces else line[:q]
+                in_quotes = not before or before.endswith(delimiter)
+            pos = q + 1
+        return in_quotes
+
+    def _index_to(self, row: int) -> None:
+        # make sure the offsets up to the end of `row` are known (-1 indexes the whole file)
+        while not self._complete and (row < 0 or len(self._offsets) <= row + 1):
+            found = len(self._offsets)
+            self._offsets.extend(islice(self._scanner, DEFAULT_BLOCK_SIZE))
+            if len(self._offsets) - found < DEFAULT_BLOCK_SIZE:
+                self._offsets.append(self.size)
+                self._complete = True
+
+    def row(self, row: int) -> list[str]:
+        self._index_to(row)
+        if row < 0 or row + 1 >= len(self._offsets):
+            raise IndexError(row)
+        return _parse(self._mm[self._offsets[row] : self._offsets[row + 1]], self.encoding, self.dialect)[0]
+
+    def rows(
+        self, start: int = 0, stop: int | None = None, block_size: int = DEFAULT_BLOCK_SIZE
+    ) -> Iterator[list[str]]:
+        while stop is None or start < stop:
+            end = start + block_size if stop is None else min(start + block_size, stop)
+            self._index_to(end)
+            end = min(end, len(self._offsets) - 1)
+            if end <= start:
+                break
+            yield from _parse(self._mm[self._offsets[start] : self._offsets[end]], self.encoding, self.dialect)
+            start = end
+
+    def ranges(self, parts: int) -> list[tuple[int, int]]:
+        """Split the file in `parts` byte ranges aligned to row boundaries, to be parsed with `read_range()`."""
+        total = len(self)
+        bounds = sorted({total * i // parts for i in range(parts + 1)})
+        return [(self._offsets[a], self._offsets[b]) for a, b in zip(bounds, bounds[1:], strict=False) if a < b]
@@ -0,0 +1,151 @@
+import json
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import IO, Any
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+
+from .readers import get_sheet_index
+
+ERRORS_COLUMN = "Errors"
+ERROR_FILL = PatternFill(fill_type="solid", start_color="FFC7CE", end_color="FFC7CE")
+
+# sheet labels used by `validate_xls_multi()`: "<sheet index + 1>:<checker name>"
+LABEL = re.compile(r"^(\d+):")
+
+ErrorEntry = tuple[str | int | None, int, Mapping[str, Any]]
+
+
+def _sheet_index(key: str | int | None, sheetnames: list[str], index_or_name: int | str = 0) -> int:
+    # `index_or_name` is the sheet of the errors without one (single sheet results)
+    match key:
+        case None:
+            return get_sheet_index(sheetnames, index_or_name)
+        case int():
+            return get_sheet_index(sheetnames, key)
+        case str() if m := LABEL.match(key):
+            return get_sheet_index(sheetnames, int(m[1]) - 1)
+        case _:
+            return get_sheet_index(sheetnames, key)
+
+
+def format_errors(errors: Mapping[str, Any]) -> str:
+    parts = []
+    for name, messages in errors.items():
+        text = ", ".join(messages) if isinstance(messages, list) else str(messages)
+        parts.append(text if name == "-" else f"{name}: {text}")
+    return "; ".join(parts)
+
+
+def read_errors(file: str | Path | IO[str]) -> Iterator[ErrorEntry]:
+    """Read back the `(sheet, row, errors)` entries written by `JsonLinesSink`."""
+    f = open(file, encoding="utf-8") if isinstance(file, str | Path) else file  # noqa: SIM115
+    try:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry["sheet"], entry["row"], entry["errors"]
+    finally:
+        if f is not file:
+            f.close()
+
+
+def _entries(
+    errors: Mapping[Any, Any] | Iterable[ErrorEntry], sheetnames: list[str], index_or_name: int | str
+) -> Iterator[tuple[int, int, Any]]:
+    if isinstance(errors, Mapping):
+        # `validate_single()` results are keyed by row, `validate_xls_multi()` ones by sheet label
+        if errors and isinstance(next(iter(errors)), int):
+            errors = {None: errors}
+        sheets = sorted((_sheet_index(key, sheetnames, index_or_name), rows) for key, rows in errors.items())
+        stream: Iterable[ErrorEntry] = ((index, row, rows[row]) for index, rows in sheets for row in sorted(rows))
+    else:
+        stream = errors
+    last = (-1, 0)
+    for sheet, row, row_errors in stream:
+        position = (_sheet_index(sheet, sheetnames, index_or_name), row)
+        if position <= last:
+            raise ValueError(f"errors must be sorted by sheet and row: {sheet} {row}")
+        last = position
+        # `include_success` results mark valid rows with "Ok"
+        if isinstance(row_errors, Mapping):
+            yield *position, row_errors
+
+
+def _annotate(  # noqa: PLR0913
+    ws: Any,
+    values: tuple[Any, ...],
+    row_errors: Mapping[str, Any],
+    *,
+    width: int,
+    columns: dict[str, int],
+    fill: PatternFill,
+) -> list[Any]:
+    cells: list[Any] = [*values, *(None,) * (width - len(values))]
+    for name in row_errors:
+        if (i := columns.get(name)) is not None:
+            cells[i] = cell = WriteOnlyCell(ws, cells[i])
+            cell.fill = fill
+    cells.append(format_errors(row_errors))
+    return cells
+
+
+def export_errors(  # noqa: PLR0913
+    source: str | Path,
+    target: str | Path | IO[bytes],
+    errors: Mapping[Any, Any] | Iterable[ErrorEntry],
+    *,
+    index_or_name: int | str = 0,
+    start_at_row: list[int] | int = 0,
+    has_header: list[bool] | bool = True,
+    column: str = ERRORS_COLUMN,
+    fill: PatternFill = ERROR_FILL,
+) -> None:
+    """Write a copy of the `source` workbook with the invalid cells highlighted and an errors column.
+
+    `errors` is the result of `validate_single()`/`validate_xls_multi()` or a stream of
+    `(sheet, row, errors)` entries sorted by sheet and row (see `read_errors()`).
+    The source is re-read in read-only mode and the copy is written in write-only mode one row at a time,
+    so memory does not depend on the size of the sheets. Only cell values are copied.
+    `index_or_name` is the sheet validated by `validate_single()` (the sheet of entries without one),
+    `start_at_row` and `has_header` must be the ones used to read the source.
+    """
+    src = openpyxl.load_workbook(source, read_only=True)
+    out = openpyxl.Workbook(write_only=True)
+    try:
+        entries = _entries(errors, src.sheetnames, index_or_name)
+        pending = next(entries, None)
+        for si, worksheet in enumerate(src.worksheets):
+            sheet_start_at_row = start_at_row if isinstance(start_at_row, int) else start_at_row[si]
+            sheet_has_header = has_header if isinstance(has_header, bool) else has_header[si]
+            ws = out.create_sheet(worksheet.title)
+            rows = worksheet.iter_rows(values_only=True)
+            width, columns = worksheet.max_column or 0, {}
+            if sheet_has_header and (header := next(rows, None)) is not None:
+                width = len(header)
+                columns = {str(value): i for i, value in enumerate(header)}
+                # entries are sorted: sheets without errors are copied unchanged
+                ws.append([*header, column] if pending is not None and pending[0] == si else header)
+            for n, values in enumerate(rows, 1 - sheet_start_at_row):
+                if pending is None or pending[:2] != (si, n):
+                    ws.append(values)
+                    continue
+                if not sheet_has_header:
+                    columns = {f"column{i + 1}": i for i in range(len(values))}
+                ws.append(_annotate(ws, values, pending[2], width=width, columns=columns, fill=fill))
+                pending = next(entries, None)
+            # entries past the end of the sheet (ie. a different `start_at_row`) are dropped
+            while pending is not None and pending[0] == si:
+                pending = next(entries, None)
+        out.save(target)
+    except Exception:
+        # finalize the streamed sheets so that their temporary files are released
+        for ws in out.worksheets:
+            if not ws.closed:
+                ws.close()
+        raise
+    finally:
+        src.close()
@@ -0,0 +1,12 @@
+from django import forms
+
+from .preview import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class ImportFileForm(forms.Form):
+    file = forms.FileField()
+    sheet = forms.CharField(required=False, help_text="xlsx sheet name or index")
+
+
+class PreviewFileForm(ImportFileForm):
+    page_size = forms.IntegerField(initial=DEFAULT_PAGE_SIZE, min_value=1, max_value=MAX_PAGE_SIZE)
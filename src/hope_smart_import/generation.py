@@ -0,0 +1,15 @@
+from django.core.cache import cache
+
+
+def get_generation(key: str) -> int:
+    """Return the generation counter stored under `key` in the `default` cache, 0 when missing."""
+    return cache.get_or_set(key, 0, None)
+
+
+def next_generation(key: str) -> int:
+    """Increment the counter `key`: the other processes see a new generation and drop what they cached."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+        return 1
@@ -0,0 +1,169 @@
+import logging
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from .types import ColumnMapper
+
+logger = logging.getLogger(__name__)
+
+
+class Phase:
+    """Counters of one phase (`load`, `parse`, `map`, `validate`) of one sheet.
+
+    `wall` and `cpu` are exclusive: the time spent in the phases nested into this one
+    (eg. parsing the rows consumed by the validation) is not included.
+    """
+
+    __slots__ = ("bytes", "cpu", "name", "rows", "sheet", "wall")
+
+    def __init__(self, name: str, sheet: str | None = None) -> None:
+        self.name = name
+        self.sheet = sheet
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def __repr__(self) -> str:
+        return f"<Phase {self.name} sheet={self.sheet} wall={self.wall:.4f} cpu={self.cpu:.4f} rows={self.rows}>"
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.wall if self.wall > 0 else 0.0
+
+
+class Observer(Protocol):
+    def record(self, phase: Phase) -> None: ...
+
+
+class Instrument:
+    """Collects the per phase timings of readers and validators and reports them to the observers.
+
+    Pass it as `instrument=` to the readers and to the shortcuts; `flush()` (called at the end of
+    `validate_single()`/`validate_xls_multi()`) sends the collected phases to the observers and resets them.
+    """
+
+    def __init__(self, *observers: Observer) -> None:
+        self.observers = observers
+        self.phases: dict[tuple[str, str | None], Phase] = {}
+        self._stack: list[Phase] = []
+
+    def get(self, name: str, sheet: str | None = None) -> Phase:
+        if (phase := self.phases.get((name, sheet))) is None:
+            phase = self.phases[name, sheet] = Phase(name, sheet)
+        return phase
+
+    def _start(self, phase: Phase) -> tuple[float, float]:
+        self._stack.append(phase)
+        return time.perf_counter(), time.process_time()
+
+    def _stop(self, phase: Phase, started: tuple[float, float]) -> None:
+        wall = time.perf_counter() - started[0]
+        cpu = time.process_time() - started[1]
+        self._stack.pop()
+        phase.wall += wall
+        phase.cpu += cpu
+        if self._stack:
+            parent = self._stack[-1]
+            parent.wall -= wall
+            parent.cpu -= cpu
+
+    @contextmanager
+    def measure(self, name: str, sheet: str | None = None) -> Iterator[Phase]:
+        phase = self.get(name, sheet)
+        started = self._start(phase)
+        try:
+            yield phase
+        finally:
+            self._stop(phase, started)
+
+    def iterate(self, name: str, rows: Iterable[Any], sheet: str | None = None) -> Generator[Any]:
+        """Yield `rows` measuring the time spent producing them."""
+        phase = self.get(name, sheet)
+        it = iter(rows)
+        while True:
+            started = self._start(phase)
+            try:
+                row = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._stop(phase, started)
+            phase.rows += 1
+            yield row
+
+    def count(self, phase: Phase, rows: Iterable[Any]) -> Generator[Any]:
+        for row in rows:
+            phase.rows += 1
+            yield row
+
+    def mapper(self, value_mapper: "ColumnMapper", sheet: str | None = None) -> "ColumnMapper":
+        phase = self.get("map", sheet)
+
+        def mapper(value: Any) -> Any:
+            started = self._start(phase)
+            try:
+                return value_mapper(value)
+            finally:
+                self._stop(phase, started)
+
+        return mapper
+
+    def flush(self) -> None:
+        for phase in self.phases.values():
+            for observer in self.observers:
+                observer.record(phase)
+        self.phases = {}
+
+
+class LoggingObserver:
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO) -> None:
+        self.log = log
+        self.level = level
+
+    def record(self, phase: Phase) -> None:
+        self.log.log(
+            self.level,
+            "phase=%s sheet=%s wall=%.4fs cpu=%.4fs rows=%d rows/s=%.1f bytes=%d",
+            phase.name,
+            phase.sheet or "",
+            phase.wall,
+            phase.cpu,
+            phase.rows,
+            phase.rows_per_second,
+            phase.bytes,
+        )
+
+
+class PrometheusObserver:
+    """Accumulates the phases as counters rendered in the Prometheus text exposition format."""
+
+    METRICS: tuple[tuple[str, str, Callable[[Phase], float]], ...] = (
+        ("phase_seconds_total", "Wall time spent per phase", lambda p: p.wall),
+        ("phase_cpu_seconds_total", "CPU time spent per phase", lambda p: p.cpu),
+        ("phase_rows_total", "Rows processed per phase", lambda p: p.rows),
+        ("phase_bytes_total", "Bytes read per phase", lambda p: p.bytes),
+    )
+
+    def __init__(self, namespace: str = "hope_smart_import") -> None:
+        self.namespace = namespace
+        self.values: dict[tuple[str, str], list[float]] = {}
+
+    def record(self, phase: Phase) -> None:
+        values = self.values.setdefault((phase.name, phase.sheet or ""), [0.0] * len(self.METRICS))
+        for i, (__, __, getter) in enumerate(self.METRICS):
+            values[i] += getter(phase)
+
+    def render(self) -> str:
+        lines = []
+        for i, (name, help_text, __) in enumerate(self.METRICS):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (phase, sheet), values in sorted(self.values.items()):
+                sheet_label = sheet.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                lines.append(f'{metric}{{phase="{phase}",sheet="{sheet_label}"}} {values[i]:g}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,77 @@
+import sys
+from collections.abc import Callable, Sequence
+from operator import call
+from typing import Any, NamedTuple
+
+DEFAULT_MAX_DISTINCT = 10000
+
+
+class ColumnStats(NamedTuple):
+    # distinct values stored, their size in bytes and the cells that reused one of them
+    distinct: int
+    bytes: int
+    hits: int
+    # the column reached `max_distinct`: new values are no longer stored
+    saturated: bool
+
+
+class ColumnDictionary:
+    """Distinct string values of a column: repeated cells share the first object read."""
+
+    __slots__ = ("bytes", "hits", "max_distinct", "saturated", "values")
+
+    def __init__(self, max_distinct: int = DEFAULT_MAX_DISTINCT) -> None:
+        self.max_distinct = max_distinct
+        self.values: dict[str, str] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.saturated = False
+
+    def __call__(self, value: Any) -> Any:
+        # only strings: 1, 1.0 and True are equal keys but must keep their own type
+        if type(value) is not str:
+            return value
+        if (found := self.values.get(value)) is not None:
+            self.hits += 1
+            return found
+        if len(self.values) < self.max_distinct:
+            self.values[value] = value
+            self.bytes += sys.getsizeof(value)
+        else:
+            self.saturated = True
+        return value
+
+    def stats(self) -> ColumnStats:
+        return ColumnStats(len(self.values), self.bytes, self.hits, self.saturated)
+
+
+class DictionaryEncoder:
+    """Dictionary encoding of the string values read by the readers (`dictionary=` option).
+
+    Each column of each sheet has its own `ColumnDictionary` holding up to `max_distinct` values,
+    so sheets repeating the same codes and labels keep one string object per distinct value;
+    high cardinality columns (names, ids) stop growing once the limit is reached.
+    One encoder can be shared by several readers, `stats()` reports the dictionaries of all of them.
+    """
+
+    def __init__(self, max_distinct: int = DEFAULT_MAX_DISTINCT) -> None:
+        self.max_distinct = max_distinct
+        self.sheets: dict[str | None, dict[str, ColumnDictionary]] = {}
+
+    def columns(self, sheet: str | None, names: Sequence[str]) -> list[ColumnDictionary]:
+        columns = self.sheets.setdefault(sheet, {})
+        for name in names:
+            if name not in columns:
+                columns[name] = ColumnDictionary(self.max_distinct)
+        return [columns[name] for name in names]
+
+    def compile(self, sheet: str | None, names: Sequence[str]) -> Callable[[tuple[Any, ...]], tuple[Any, ...]]:
+        """Return a function encoding a tuple of values of the columns `names`."""
+        columns = self.columns(sheet, names)
+        return lambda values: tuple(map(call, columns, values))
+
+    def stats(self) -> dict[str | None, dict[str, ColumnStats]]:
+        return {sheet: {name: d.stats() for name, d in columns.items()} for sheet, columns in self.sheets.items()}
+
+    def clear(self) -> None:
+        self.sheets.clear()
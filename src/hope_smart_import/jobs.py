@@ -0,0 +1,155 @@
+import time
+from contextlib import nullcontext
+from collections.abc import Callable, Generator, Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from .csvfile import CsvFile
+from .readers import get_sheet_index, open_csv, open_xls
+from .shortcuts import validate_single
+from .sinks import DictSink
+
+if TYPE_CHECKING:
+    from django.db.models.fields.files import FieldFile
+
+    from .models import ImportJob
+    from .types import RowResult, SheetResult, Source
+
+PROGRESS_EVERY = 1000
+MAX_STORED_ERRORS = 1000
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+class Progress(NamedTuple):
+    rows: int
+    total: int | None
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        if self.total is None or not self.rate:
+            return None
+        return max(self.total - self.rows, 0) / self.rate
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "total": self.total,
+            "elapsed": round(self.elapsed, 3),
+            "rate": round(self.rate, 1),
+            "eta": None if (eta := self.eta) is None else round(eta, 1),
+        }
+
+
+class ProgressTracker:
+    def __init__(self, total: int | None = None, every: int = PROGRESS_EVERY) -> None:
+        self.total = total
+        self.every = every
+        self.rows = 0
+        self.started = time.monotonic()
+
+    @property
+    def progress(self) -> Progress:
+        return Progress(self.rows, self.total, time.monotonic() - self.started)
+
+    def track(self, rows: Iterable["RowResult"], callback: ProgressCallback) -> Generator["RowResult"]:
+        """Yield `rows` calling `callback` with the progress every `every` rows."""
+        for row in rows:
+            yield row
+            self.rows += 1
+            if self.rows % self.every == 0:
+                callback(self.progress.as_dict())
+
+
+def parse_sheet(sheet: str) -> int | str:
+    """Return the index (digits) or the name of a sheet entered in a form, the first one if blank."""
+    return int(sheet) if sheet.isdigit() else sheet or 0
+
+
+def count_rows(filepath: str, sheet: str = "") -> int | None:
+    """Return the number of data rows (header excluded), if it can be known without reading the file."""
+    if Path(filepath).suffix.lower() == ".csv":
+        with CsvFile(filepath) as f:
+            return max(len(f) - 1, 0)
+    wb = load_workbook(filepath, read_only=True)
+    try:
+        ws = wb.worksheets[get_sheet_index(wb.sheetnames, parse_sheet(sheet))]
+        return None if ws.max_row is None else max(ws.max_row - 1, 0)
+    finally:
+        wb.close()
+
+
+def open_file(filepath: "Source", sheet: str = "", *, name: str | None = None) -> "SheetResult":
+    """Read a csv/xlsx file, `name` gives the type of the streams without a path."""
+    if Path(name or filepath).suffix.lower() == ".csv":
+        return open_csv(filepath, has_header=True)
+    return open_xls(filepath, index_or_name=parse_sheet(sheet))
+
+
+def get_local_path(file: "FieldFile") -> str | None:
+    """Return the filesystem path of a stored file, None if its storage is not a local one (ie. S3)."""
+    try:
+        return file.path
+    except NotImplementedError:
+        return None
+
+
+def serializable_errors(errors: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of the `{field: messages}` errors of a row with plain lists of messages.
+
+    Form ErrorLists are not json serializable.
+    """
+    return {name: list(messages) if isinstance(messages, list) else messages for name, messages in errors.items()}
+
+
+def run_import(job: "ImportJob", *, every: int = PROGRESS_EVERY, on_progress: ProgressCallback | None = None) -> dict:
+    """Validate the file of `job` storing progress and result summary on it."""
+    job.status = job.Status.STARTED
+    job.started = timezone.now()
+    job.save(update_fields=["status", "started"])
+
+    def report(progress: dict[str, Any]) -> None:
+        job.status = job.Status.PROGRESS
+        job.progress = progress
+        job.save(update_fields=["status", "progress"])
+        if on_progress:
+            on_progress(progress)
+
+    try:
+        checker = job.configuration.get_compiled_checker()
+        # files of remote storages are streamed, their rows are not counted in advance
+        path = get_local_path(job.file)
+        tracker = ProgressTracker(None if path is None else count_rows(path, job.sheet), every)
+        with nullcontext(path) if path else job.file.open("rb") as source:
+            rows = tracker.track(open_file(source, job.sheet, name=job.file.name), report)
+            # only the stored errors are kept in memory, the others are just counted
+            sink = validate_single(rows, checker, sink=DictSink(max_errors=MAX_STORED_ERRORS))
+    except Exception as e:
+        job.status = job.Status.FAILURE
+        job.result = {"error": str(e)}
+        job.finished = timezone.now()
+        job.save(update_fields=["status", "result", "finished"])
+        raise
+
+    progress = tracker.progress
+    job.status = job.Status.SUCCESS
+    job.progress = progress.as_dict()
+    job.result = {
+        "rows": progress.rows,
+        "valid": progress.rows - sink.total,
+        "invalid": sink.total,
+        "elapsed": round(progress.elapsed, 3),
+        "errors": {str(row): serializable_errors(errors) for row, errors in sink.result().items()},
+        "truncated": sink.truncated,
+    }
+    job.finished = timezone.now()
+    job.save(update_fields=["status", "progress", "result", "finished"])
+    return job.result
@@ -0,0 +1,199 @@
+import hashlib
+import heapq
+import os
+import sqlite3
+import tempfile
+import threading
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Protocol
+
+MIN_PENDING = 1 << 16
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+SQLITE_MAX_PARAMS = 500
+
+
+class KeyIndex(Protocol):
+    """Set of primary keys used by master/detail checks, with batched operations."""
+
+    def __contains__(self, key: Any) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, key: Any) -> None: ...
+
+    def add_many(self, keys: Sequence[Any]) -> list[bool]:
+        """Add `keys` returning, for each of them, if it was already present (or repeated in `keys`)."""
+
+    def contains_many(self, keys: Sequence[Any]) -> list[bool]: ...
+
+
+KeyIndexFactory = Callable[[], KeyIndex]
+
+
+def add_many(index: "KeyIndex | set[Any]", keys: Sequence[Any]) -> list[bool]:
+    if isinstance(index, set):
+        found = []
+        for key in keys:
+            found.append(key in index)
+            index.add(key)
+        return found
+    return index.add_many(keys)
+
+
+def contains_many(index: "KeyIndex | set[Any]", keys: Sequence[Any]) -> list[bool]:
+    if isinstance(index, set):
+        return [key in index for key in keys]
+    return index.contains_many(keys)
+
+
+def key_hash(key: Any) -> int:
+    """Return a signed 64 bit hash of `key`: integers are stored as they are, other keys as a blake2b digest.
+
+    Equal keys get the same hash as in a set (`1 == 1.0 == True`), unlike `hash()` different
+    small integers never collide (`hash(-1) == hash(-2)`).
+    """
+    if isinstance(key, float) and key.is_integer():
+        key = int(key)
+    if isinstance(key, int) and INT64_MIN <= key <= INT64_MAX:
+        return int(key)
+    # strings and the other keys are tagged: "None" and None have different digests
+    data = b"s" + key.encode("utf-8", "surrogatepass") if isinstance(key, str) else b"r" + repr(key).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little", signed=True)
+
+
+class CompactKeyIndex:
+    """In memory index storing a 64 bit hash of each key (see `key_hash()`) in a sorted array.
+
+    It needs 8 bytes per key instead of the ~100 of a set of strings. New keys are collected in a
+    small set merged in the array when it grows over a quarter of it. Two different keys with the
+    same digest are considered the same key (a false "duplicated"): with 64 bit digests it is not
+    expected below billions of keys.
+    """
+
+    def __init__(self, keys: Iterable[Any] = ()) -> None:
+        self._sorted = array("q")
+        self._pending: set[int] = set()
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def _search(self, h: int) -> bool:
+        i = bisect_left(self._sorted, h)
+        return i < len(self._sorted) and self._sorted[i] == h
+
+    def __contains__(self, key: Any) -> bool:
+        h = key_hash(key)
+        return h in self._pending or self._search(h)
+
+    def _merge(self) -> None:
+        # the two sorted runs are merged straight into the new array, without a list of all the hashes
+        merged = array("q")
+        merged.extend(heapq.merge(self._sorted, sorted(self._pending)))
+        self._sorted = merged
+        self._pending = set()
+
+    def add(self, key: Any) -> None:
+        self.add_many([key])
+
+    def add_many(self, keys: Sequence[Any]) -> list[bool]:
+        found = []
+        pending = self._pending
+        for key in keys:
+            h = key_hash(key)
+            present = h in pending or self._search(h)
+            if not present:
+                pending.add(h)
+            found.append(present)
+        if len(pending) > max(MIN_PENDING, len(self._sorted) // 4):
+            self._merge()
+        return found
+
+    def contains_many(self, keys: Sequence[Any]) -> list[bool]:
+        return [key in self for key in keys]
+
+
+def _unlink(path: str) -> None:
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+class SqliteKeyIndex:
+    """Index stored in a SQLite database, for masters too big to be kept in memory.
+
+    Without `path` a temporary file is used and removed when the index is closed or collected.
+    The keys already stored in `path` are removed, unless `reuse` is set.
+    The index can be used from any thread (ie. by the async validation, see `aio`), one at a time.
+    """
+
+    def __init__(self, path: str | None = None, *, reuse: bool = False) -> None:
+        self._finalizer = None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".keys.sqlite")
+            os.close(fd)
+            self._finalizer = weakref.finalize(self, _unlink, path)
+        self.path = path
+        # the connection is shared by the threads of the executors, the lock serializes its use
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS keys (k PRIMARY KEY) WITHOUT ROWID")
+        if not reuse:
+            with self._conn:
+                self._conn.execute("DELETE FROM keys")
+
+    @staticmethod
+    def _value(key: Any) -> Any:
+        if isinstance(key, str | float) or (isinstance(key, int) and INT64_MIN <= key <= INT64_MAX):
+            return key
+        # other keys are stored as BLOBs, which never match the TEXT of a string key ("None" and None)
+        return repr(key).encode()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM keys").fetchone()[0]
+
+    def __contains__(self, key: Any) -> bool:
+        return self.contains_many([key])[0]
+
+    def _present(self, values: Iterable[Any]) -> set[Any]:
+        present = set()
+        values = list(values)
+        with self._lock:
+            for start in range(0, len(values), SQLITE_MAX_PARAMS):
+                chunk = values[start : start + SQLITE_MAX_PARAMS]
+                sql = f"SELECT k FROM keys WHERE k IN ({','.join('?' * len(chunk))})"  # noqa: S608
+                present.update(k for (k,) in self._conn.execute(sql, chunk))
+        return present
+
+    def add(self, key: Any) -> None:
+        self.add_many([key])
+
+    def add_many(self, keys: Sequence[Any]) -> list[bool]:
+        values = [self._value(key) for key in keys]
+        with self._lock:
+            seen = self._present(set(values))
+            new = set(values) - seen
+            with self._conn:
+                self._conn.executemany("INSERT INTO keys VALUES (?)", ((v,) for v in new))
+        found = []
+        for value in values:
+            found.append(value in seen)
+            seen.add(value)
+        return found
+
+    def contains_many(self, keys: Sequence[Any]) -> list[bool]:
+        values = [self._value(key) for key in keys]
+        present = self._present(set(values))
+        return [value in present for value in values]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        if self._finalizer is not None:
+            self._finalizer()
@@ -0,0 +1,77 @@
+from collections.abc import Callable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .types import ColumnMapper, ValueMapper
+
+DEFAULT_MEMO_SIZE = 4096
+_MISSING = object()
+
+
+def identity(x: Any) -> Any:
+    return x
+
+
+class MemoizedMapper:
+    """Pure mapper remembering the result of up to `maxsize` distinct values.
+
+    Meant for columns with few distinct values (ie. genders, relationships, admin codes):
+    each of them is mapped once, the other cells are a dictionary lookup.
+    Values are keyed with their type: `1`, `1.0` and `True` are equal but may not be mapped the same way.
+    """
+
+    __slots__ = ("cache", "func", "maxsize")
+
+    def __init__(self, func: "ColumnMapper", maxsize: int = DEFAULT_MEMO_SIZE) -> None:
+        self.func = func
+        self.maxsize = maxsize
+        self.cache: dict[tuple[type, Any], Any] = {}
+
+    def __call__(self, value: Any) -> Any:
+        key = (type(value), value)
+        try:
+            if (result := self.cache.get(key, _MISSING)) is not _MISSING:
+                return result
+        except TypeError:  # unhashable
+            return self.func(value)
+        result = self.func(value)
+        if len(self.cache) < self.maxsize:
+            self.cache[key] = result
+        return result
+
+    def __repr__(self) -> str:
+        return f"memoize({self.func!r})"
+
+
+def memoize(func: "ColumnMapper", maxsize: int = DEFAULT_MEMO_SIZE) -> MemoizedMapper:
+    return func if isinstance(func, MemoizedMapper) else MemoizedMapper(func, maxsize)
+
+
+def column_mappers(value_mapper: "ValueMapper", names: Sequence[str]) -> list[tuple[int, "ColumnMapper"]]:
+    """Return the position and the mapper of each column that is not left unchanged."""
+    if not isinstance(value_mapper, Mapping):
+        return [] if value_mapper is identity else [(i, value_mapper) for i in range(len(names))]
+    return [(i, m) for i, name in enumerate(names) if (m := value_mapper.get(name, identity)) is not identity]
+
+
+def compile_mapper(
+    value_mapper: "ValueMapper", names: Sequence[str]
+) -> Callable[[tuple[Any, ...]], tuple[Any, ...]] | None:
+    """Compile `value_mapper` for the columns `names` into a function mapping a tuple of values (None: no changes).
+
+    A single callable is applied to every value, a `{column: mapper}` dict only to the given columns.
+    """
+    if not isinstance(value_mapper, Mapping):
+        if value_mapper is identity:
+            return None
+        return lambda values: tuple(map(value_mapper, values))
+    if not (mappers := column_mappers(value_mapper, names)):
+        return None
+
+    def apply(values: tuple[Any, ...]) -> tuple[Any, ...]:
+        mapped = list(values)
+        for i, mapper in mappers:
+            mapped[i] = mapper(mapped[i])
+        return tuple(mapped)
+
+    return apply
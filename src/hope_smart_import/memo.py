@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from django.core.cache import caches
+
+DEFAULT_MAXSIZE = 10000
+
+
+class MemoStore(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+
+class DjangoCacheStore:
+    """Persistent memo tier backed by one of the configured Django caches."""
+
+    def __init__(self, alias: str = "default", *, timeout: int | None = None, prefix: str = "hsi:memo") -> None:
+        self.alias = alias
+        self.timeout = timeout
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        return caches[self.alias].get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, value: Any) -> None:
+        caches[self.alias].set(f"{self.prefix}:{key}", value, self.timeout)
+
+
+class ValidationMemo:
+    """Two tier memo of the row validation outcomes.
+
+    The first tier is an in-process LRU of `maxsize` entries, the optional `store` (any object
+    with `get()`/`set()`, eg. `DjangoCacheStore`) is looked up on LRU misses, so that
+    outcomes survive across processes and repeated uploads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, *, store: MemoStore | None = None) -> None:
+        self.maxsize = maxsize
+        self.store = store
+        self._lru: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "store_hits": self.store_hits, "misses": self.misses, "size": len(self._lru)}
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._lru[key] = value
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Any:
+        if (value := self._lru.get(key)) is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return value
+        if self.store is not None and (value := self.store.get(key)) is not None:
+            self._remember(key, value)
+            self.store_hits += 1
+            return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self.hits = self.store_hits = self.misses = 0
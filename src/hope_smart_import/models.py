@@ -1,6 +1,13 @@
+from typing import TYPE_CHECKING
+
 from django.db import models
 from hope_flex_fields.models import DataChecker
 
+from .compiled import get_compiled_checker
+
+if TYPE_CHECKING:
+    from .jobs import ProgressCallback
+
 
 class Configuration(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -8,3 +15,48 @@ class Configuration(models.Model):
 
     def __str__(self):
         return self.name
+
+    def get_compiled_checker(self) -> DataChecker:
+        """Return the checker with its form class built once per process and cached until a change."""
+        return get_compiled_checker(self)
+
+
+class ImportJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED"
+        STARTED = "STARTED"
+        PROGRESS = "PROGRESS"
+        SUCCESS = "SUCCESS"
+        FAILURE = "FAILURE"
+
+    configuration = models.ForeignKey(Configuration, on_delete=models.CASCADE, related_name="jobs")
+    file = models.FileField(upload_to="smart_import/")
+    sheet = models.CharField(max_length=100, blank=True, default="", help_text="xlsx sheet name or index")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    task_id = models.CharField(max_length=50, blank=True, default="")
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created",)
+
+    def __str__(self):
+        return f"{self.configuration} #{self.pk}"
+
+    def queue(self) -> None:
+        """Send the job to the celery workers: raise ImportError when celery is not installed."""
+        try:
+            from .tasks import import_job  # noqa: PLC0415 celery is an optional dependency
+        except ImportError as e:
+            raise ImportError(f"celery is required to queue import jobs ({e})") from e
+
+        self.task_id = import_job.delay(self.pk).id
+        self.save(update_fields=["task_id"])
+
+    def run(self, *, on_progress: "ProgressCallback | None" = None) -> dict:
+        from .jobs import run_import  # noqa: PLC0415 readers and validation are not loaded with the models
+
+        return run_import(self, on_progress=on_progress)
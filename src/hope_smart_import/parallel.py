@@ -0,0 +1,327 @@
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.apps import apps
+from django.db import connections
+from hope_flex_fields.fields import IdentityField
+
+if TYPE_CHECKING:
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .types import MultiSheetResult, RowResult, SheetResult
+
+DEFAULT_CHUNK_SIZE = 5000
+
+_checkers: dict[tuple[str, Any], "ValidatorMixin"] = {}
+_spec: "CheckerSpec | None" = None
+
+
+class _Master:
+    def __init__(self, primary_keys: set[Any]) -> None:
+        self.primary_keys = primary_keys
+
+
+class CheckerSpec(NamedTuple):
+    model: str
+    pk: Any
+    primary_key_col: str | None = None
+    master_col: str | None = None
+    master_keys: set[Any] | None = None
+    collect: tuple[str, ...] = ()
+
+    @classmethod
+    def from_checker(cls, checker: "ValidatorMixin") -> "CheckerSpec":
+        master = checker._master_fieldset
+        return cls(
+            checker._meta.label,
+            checker.pk,
+            checker._primary_key_field_name,
+            checker._master_fieldset_col if master else None,
+            master.primary_keys if master else None,
+            tuple(checker._collected_values),
+        )
+
+
+class ChunkResult(NamedTuple):
+    errors: dict[int, Any]
+    # primary key -> row number of its first occurrence in the chunk
+    keys: dict[Any, int]
+    collected: dict[str, list[Any]]
+
+
+def _init_worker(spec: CheckerSpec | None = None) -> None:
+    global _spec  # noqa: PLW0603
+    _spec = spec
+
+
+def get_executor(workers: int, spec: CheckerSpec | None = None) -> ProcessPoolExecutor:
+    """Return a pool of `workers` processes forked from the current one.
+
+    The database connections of the calling thread are closed first, so that the workers open their own
+    ones instead of sharing the sockets of the parent: it must not be called inside a transaction.
+    In-memory sqlite databases are kept (only the inherited handle holds them).
+    Forking is not safe in processes running other threads that hold locks (ie. threaded ASGI servers,
+    celery thread pools): use `workers` from the main thread of a process, ie. a prefork celery worker.
+    """
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(spec,),
+    )
+
+
+def get_checker(spec: CheckerSpec) -> "ValidatorMixin":
+    key = (spec.model, spec.pk)
+    if (checker := _checkers.get(key)) is None:
+        checker = _checkers[key] = apps.get_model(spec.model).objects.get(pk=spec.pk)
+        # the form class is built once per worker, not once per chunk
+        form_class = checker.get_form_class()
+        checker.get_form_class = lambda: form_class
+    checker.set_primary_key_col(spec.primary_key_col)
+    if spec.master_col:
+        checker.set_master(_Master(spec.master_keys), spec.master_col)
+    else:
+        checker._master_fieldset = None
+    return checker
+
+
+def _get_primary_key_col(checker: "ValidatorMixin") -> str | None:
+    if checker._primary_key_field_name:
+        return checker._primary_key_field_name
+    for field_name, field in checker.get_form_class().declared_fields.items():
+        if isinstance(field, IdentityField):
+            return field_name
+    return None
+
+
+def validate_rows(
+    spec: CheckerSpec | None,
+    rows: list["RowResult"],
+    *,
+    offset: int = 0,
+    include_success: bool = False,
+    fail_if_alien: bool = False,
+) -> ChunkResult:
+    spec = spec or _spec
+    checker = get_checker(spec)
+    pk_col = _get_primary_key_col(checker)
+    checker._collected_values = {}
+    checker.collect(*spec.collect, *filter(None, [pk_col]))
+    errors = checker.validate(rows, include_success=include_success, fail_if_alien=fail_if_alien)
+    keys: dict[Any, int] = {}
+    if pk_col:
+        for i, pk in enumerate(checker.collected(pk_col), offset + 1):
+            keys.setdefault(pk, i)
+    return ChunkResult(
+        {i + offset: e if isinstance(e, str) else {k: list(v) for k, v in e.items()} for i, e in errors.items()},
+        keys,
+        {field_name: checker.collected(field_name) for field_name in spec.collect},
+    )
+
+
+def _chunks(rows: "SheetResult", size: int) -> Iterator[list["RowResult"]]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+class _Sheet:
+    # chunks of a sheet being validated, merged in order as they complete
+    def __init__(self, key: str, checker: "ValidatorMixin", merger: "ChunkedValidator") -> None:
+        self.key = key
+        self.checker = checker
+        self.merger = merger
+        self.futures: deque[Future] = deque()
+        self.offset = 0
+        self.submitted = False
+
+
+class SheetScheduler:
+    """Validate the sheets of a workbook in a process pool.
+
+    Sheets are read sequentially (they share the workbook) and split in chunks of `chunk_size` rows
+    validated concurrently, as ``ChunkedValidator`` does for a single sheet.
+    A detail sheet is submitted as soon as the primary keys of its master have been published;
+    detail sheets found before their master are kept in memory until the master sheet has been read.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        include_success: bool = False,
+        fail_if_alien: bool = False,
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.include_success = include_success
+        self.fail_if_alien = fail_if_alien
+        self.errors: dict[str, Any] = {}
+        self.pending: list[tuple[str, "ValidatorMixin", list[list["RowResult"]]]] = []
+        self.running: dict[Future, _Sheet] = {}
+        self.unpublished: Counter[int] = Counter()
+
+    def is_waiting(self, checker: "ValidatorMixin") -> bool:
+        return any(c is checker for __, c, __ in self.pending)
+
+    def is_ready(self, checker: "ValidatorMixin", exhausted: bool) -> bool:
+        if not (master := checker._master_fieldset):
+            return True
+        return (exhausted or id(master) in self.unpublished) and not self.is_waiting(master)
+
+    def finish(self, sheet: _Sheet) -> None:
+        self.errors[sheet.key] = sheet.merger.publish(sheet.checker)
+        self.unpublished[id(sheet.checker)] -= 1
+
+    def publish(self, done: set[Future]) -> None:
+        for sheet in {self.running[future] for future in done}:
+            # chunks are merged in order, so that duplicated keys are reported on their later occurrences
+            while sheet.futures and sheet.futures[0].done():
+                future = sheet.futures.popleft()
+                del self.running[future]
+                sheet.merger.merge(future.result())
+            if sheet.submitted and not sheet.futures:
+                self.finish(sheet)
+
+    def wait(self) -> None:
+        done, __ = wait(self.running, return_when=FIRST_COMPLETED)
+        self.publish(done)
+
+    def wait_master(self, checker: "ValidatorMixin") -> None:
+        if master := checker._master_fieldset:
+            while self.unpublished[id(master)] > 0:
+                self.wait()
+
+    def submit(
+        self, pool: ProcessPoolExecutor, key: str, checker: "ValidatorMixin", chunks: Iterable[list["RowResult"]]
+    ) -> None:
+        spec = CheckerSpec.from_checker(checker)
+        merger = ChunkedValidator(
+            self.workers, self.chunk_size, include_success=self.include_success, fail_if_alien=self.fail_if_alien
+        )
+        sheet = _Sheet(key, checker, merger)
+        for chunk in chunks:
+            future = pool.submit(
+                validate_rows,
+                spec,
+                chunk,
+                offset=sheet.offset,
+                include_success=self.include_success,
+                fail_if_alien=self.fail_if_alien,
+            )
+            sheet.futures.append(future)
+            self.running[future] = sheet
+            sheet.offset += len(chunk)
+            # bound the number of chunks held in memory
+            while len(self.running) > 2 * self.workers:
+                self.wait()
+        sheet.submitted = True
+        if not sheet.futures:
+            self.finish(sheet)
+
+    def run(self, g: "MultiSheetResult", checkers: list["ValidatorMixin"]) -> dict[str, Any]:
+        with get_executor(self.workers) as pool:
+            for sheet_index, sheet_generator in g:
+                checker = checkers[sheet_index]
+                key = f"{sheet_index + 1}:{checker.name}"
+                self.errors[key] = None
+                self.unpublished[id(checker)] += 1
+                chunks = _chunks(sheet_generator, self.chunk_size)
+                if self.is_ready(checker, exhausted=False):
+                    self.wait_master(checker)
+                    self.submit(pool, key, checker, chunks)
+                else:
+                    self.pending.append((key, checker, list(chunks)))
+            while self.pending:
+                if ready := [e for e in self.pending if self.is_ready(e[1], exhausted=True)]:
+                    entry = ready[0]
+                    self.wait_master(entry[1])
+                else:
+                    # circular master/detail relationship: fall back to the currently known keys
+                    entry = self.pending[0]
+                self.pending.remove(entry)
+                self.submit(pool, *entry)
+            while self.running:
+                self.wait()
+        return self.errors
+
+
+class ChunkedValidator:
+    """Validate a single sheet in a process pool, splitting the rows in numbered chunks.
+
+    The result is identical to ``checker.validate()``: row numbers refer to the whole sheet
+    and primary keys duplicated across different chunks are reported as well.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        include_success: bool = False,
+        fail_if_alien: bool = False,
+    ) -> None:
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.include_success = include_success
+        self.fail_if_alien = fail_if_alien
+        self.errors: dict[int, Any] = {}
+        self.keys: set[Any] = set()
+        self.collected: dict[str, list[Any]] = {}
+
+    def add_duplicate(self, row: int, pk: Any) -> None:
+        row_errors = self.errors.get(row)
+        if not isinstance(row_errors, dict):
+            self.errors[row] = row_errors = {}
+        messages = row_errors.setdefault("-", [])
+        # keep the same order of checker.validate(): alien values, duplicates, foreign key
+        position = 1 if self.fail_if_alien and messages and messages[0].startswith("Alien values found") else 0
+        messages.insert(position, f"{pk} duplicated")
+
+    def merge(self, result: ChunkResult) -> None:
+        self.errors.update(result.errors)
+        for pk, row in result.keys.items():
+            if pk in self.keys:
+                self.add_duplicate(row, pk)
+            else:
+                self.keys.add(pk)
+        for field_name, values in result.collected.items():
+            self.collected.setdefault(field_name, []).extend(values)
+
+    def run(self, g: "SheetResult", checker: "ValidatorMixin") -> dict[int, Any]:
+        spec = CheckerSpec.from_checker(checker)
+        offset = 0
+        running: deque[Future] = deque()
+        with get_executor(self.workers, spec) as pool:
+            for chunk in _chunks(g, self.chunk_size):
+                running.append(
+                    pool.submit(
+                        validate_rows,
+                        None,
+                        chunk,
+                        offset=offset,
+                        include_success=self.include_success,
+                        fail_if_alien=self.fail_if_alien,
+                    )
+                )
+                offset += len(chunk)
+                # bound the number of chunks held in memory
+                if len(running) > 2 * self.workers:
+                    self.merge(running.popleft().result())
+            while running:
+                self.merge(running.popleft().result())
+        return self.publish(checker)
+
+    def publish(self, checker: "ValidatorMixin") -> dict[int, Any]:
+        """Store the primary keys and the collected values of the sheet on `checker` and return the errors."""
+        checker.primary_keys = self.keys
+        for field_name, values in self.collected.items():
+            checker._collected_values[field_name].extend(values)
+        return dict(sorted(self.errors.items()))
@@ -0,0 +1,117 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from django.db import router, transaction
+
+if TYPE_CHECKING:
+    from django.db.models import Model
+
+    from .types import MultiSheetResult, RowResult, SheetResult
+
+DEFAULT_BATCH_SIZE = 1000
+
+RowBuilder = Callable[["RowResult"], dict[str, Any]]
+
+
+class PersistenceError(Exception):
+    pass
+
+
+class SheetTarget:
+    """Where and how the rows of a sheet are stored.
+
+    `build` returns the model field values of a row (by default the columns named as model fields).
+    `key` is the column that identifies the rows of a master sheet; detail sheets set `master`
+    (the index of the master sheet), the column holding the master key (`master_col`) and the name
+    of the foreign key field (`fk`).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        model: type["Model"],
+        *,
+        build: RowBuilder | None = None,
+        key: str | None = None,
+        master: int | None = None,
+        master_col: str | None = None,
+        fk: str | None = None,
+    ) -> None:
+        if master is not None and not (master_col and fk):
+            raise ValueError("`master_col` and `fk` are required when `master` is set")
+        self.model = model
+        self.build = build or self._default_build
+        self.key = key
+        self.master = master
+        self.master_col = master_col
+        self.fk_attname = model._meta.get_field(fk).attname if fk else None
+        self._fields = {f.name for f in model._meta.concrete_fields if not f.primary_key}
+
+    def _default_build(self, row: "RowResult") -> dict[str, Any]:
+        return {name: value for name, value in row.items() if name in self._fields}
+
+
+class BulkLoader:
+    """Store the rows of the sheets with batched `bulk_create()` in one transaction.
+
+    The pk of each row of a master sheet is indexed by its `key` while inserting, so that the
+    foreign keys of the detail sheets are set without querying the database.
+    """
+
+    def __init__(self, targets: list[SheetTarget], *, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        self.targets = targets
+        self.batch_size = batch_size
+        # sheet index -> master key -> pk
+        self.indexes: dict[int, dict[Any, Any]] = {target.master: {} for target in targets if target.master is not None}
+        self.counts: dict[int, int] = {}
+
+    def _insert(self, sheet_index: int, batch: list["Model"], keys: list[Any]) -> None:
+        target = self.targets[sheet_index]
+        objs = target.model._default_manager.bulk_create(batch)
+        if (index := self.indexes.get(sheet_index)) is not None:
+            if objs and objs[0].pk is None:
+                raise PersistenceError(f"Database does not return the pk of {target.model._meta.label} rows")
+            index.update(zip(keys, (obj.pk for obj in objs), strict=True))
+        self.counts[sheet_index] += len(objs)
+
+    def _load_sheet(self, sheet_index: int, rows: "SheetResult") -> None:
+        target = self.targets[sheet_index]
+        if (index := self.indexes.get(sheet_index)) is not None and target.key is None:
+            raise PersistenceError(f"Sheet {sheet_index} is a master sheet: `key` is required")
+        master_index = None
+        if target.master is not None:
+            if target.master not in self.counts:
+                raise PersistenceError(f"Master sheet {target.master} must be loaded before sheet {sheet_index}")
+            master_index = self.indexes[target.master]
+        self.counts[sheet_index] = 0
+        batch, keys = [], []
+        for i, row in enumerate(rows, 1):
+            values = target.build(row)
+            if master_index is not None:
+                try:
+                    values[target.fk_attname] = master_index[row[target.master_col]]
+                except KeyError:
+                    raise PersistenceError(
+                        f"Sheet {sheet_index} row {i}: '{row[target.master_col]}' not found in master"
+                    )
+            batch.append(target.model(**values))
+            if index is not None:
+                keys.append(row[target.key])
+            if len(batch) >= self.batch_size:
+                self._insert(sheet_index, batch, keys)
+                batch, keys = [], []
+        if batch:
+            self._insert(sheet_index, batch, keys)
+
+    def load(self, g: "MultiSheetResult") -> dict[int, int]:
+        """Store the sheets yielded by `g` and return the number of rows inserted per sheet index."""
+        using = router.db_for_write(self.targets[0].model)
+        with transaction.atomic(using=using):
+            for sheet_index, rows in g:
+                self._load_sheet(sheet_index, rows)
+        return self.counts
+
+
+def bulk_load(
+    g: "MultiSheetResult", targets: list[SheetTarget], *, batch_size: int = DEFAULT_BATCH_SIZE
+) -> dict[int, int]:
+    return BulkLoader(targets, batch_size=batch_size).load(g)
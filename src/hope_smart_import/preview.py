@@ -0,0 +1,164 @@
+import hashlib
+import os
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from django.core.cache import caches
+from django.core.files.storage import FileSystemStorage
+
+from .cache import ParseCache
+from .csvfile import CsvFile
+from .jobs import parse_sheet, serializable_errors
+from .probe import probe_workbook
+from .readers import get_sheet_index, open_csv, open_xls
+from .shortcuts import validate_single
+from .sources import digest, open_binary
+
+if TYPE_CHECKING:
+    from django.core.files import File
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .types import RowResult
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PREVIEW_DIR = "smart_import/preview"
+PREVIEW_MAX_AGE = 24 * 60 * 60
+TOTAL_KEY = "hope_smart_import:preview:total"
+
+# previews are read by path (csv offsets index, xlsx probe and parse cache): they are kept on the local
+# filesystem (MEDIA_ROOT) even when the default storage is a remote one
+storage = FileSystemStorage()
+
+
+class PreviewRow(NamedTuple):
+    # row number in the file (header excluded)
+    number: int
+    # (value, error messages) of each column
+    cells: list[tuple[Any, list[str]]]
+    # errors not bound to a column (ie. duplicated keys, fieldset rules)
+    errors: list[str]
+
+
+class PreviewPage(NamedTuple):
+    number: int
+    page_size: int
+    columns: list[str]
+    rows: list[PreviewRow]
+    has_next: bool
+    # data rows of the sheet, None if not known
+    total: int | None
+    # True when `total` is estimated from the size of the sheet (see `probe_workbook()`)
+    estimated: bool
+
+    @property
+    def has_previous(self) -> bool:
+        return self.number > 1
+
+    @property
+    def pages(self) -> int | None:
+        return None if self.total is None else max(-(-self.total // self.page_size), 1)
+
+    @property
+    def invalid(self) -> int:
+        return sum(1 for row in self.rows if row.errors or any(messages for __, messages in row.cells))
+
+
+def store_upload(file: "File") -> str:
+    """Save an uploaded file for the preview and return its name; files are named after their content."""
+    _purge()
+    name = f"{PREVIEW_DIR}/{digest(open_binary(file))}{Path(file.name).suffix.lower()}"
+    if not storage.exists(name):
+        storage.save(name, file)
+    return name
+
+
+def _purge() -> None:
+    # previews are not stored forever, the ones older than PREVIEW_MAX_AGE are removed
+    if not storage.exists(PREVIEW_DIR):
+        return
+    limit = time.time() - PREVIEW_MAX_AGE
+    for name in storage.listdir(PREVIEW_DIR)[1]:
+        if storage.get_modified_time(f"{PREVIEW_DIR}/{name}").timestamp() < limit:
+            storage.delete(f"{PREVIEW_DIR}/{name}")
+
+
+def get_cache() -> ParseCache:
+    return ParseCache(storage.path(f"{PREVIEW_DIR}/cache"))
+
+
+def _csv_total(f: CsvFile) -> int:
+    # counting the rows indexes the whole file: it is done once per file and stored in the `default` cache
+    st = os.stat(f.filepath)
+    key = hashlib.sha256(f"{os.path.abspath(f.filepath)}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()
+    return caches["default"].get_or_set(f"{TOTAL_KEY}:{key}", lambda: max(len(f) - 1, 0), PREVIEW_MAX_AGE)
+
+
+def _csv_page(filepath: str, start: int, size: int) -> tuple[list["RowResult"], int, bool]:
+    # the offsets index of CsvFile skips the previous rows without parsing them
+    with CsvFile(filepath) as f:
+        rows = open_csv(f, has_header=True, start_at_row=start)
+        page = list(islice(rows, size + 1))
+        rows.close()
+        return page, _csv_total(f), False
+
+
+def _xls_page(filepath: str, sheet: str, start: int, size: int) -> tuple[list["RowResult"], int, bool]:
+    # the first page is streamed, the next ones are read from the parse cache:
+    # the sheet is parsed to the end once, when a page other than the first is requested
+    probes = probe_workbook(filepath)
+    probe = probes[get_sheet_index([p.name for p in probes], parse_sheet(sheet))]
+    cache = get_cache() if start else None
+    rows = open_xls(filepath, index_or_name=probe.index, start_at_row=start, cache=cache)
+    page = list(islice(rows, size + 1))
+    if cache is not None and len(page) > size and not cache.contains(digest(filepath), probe.name):
+        deque(rows, maxlen=0)
+    rows.close()
+    return page, max(probe.max_row - 1, 0), probe.estimated
+
+
+def _messages(value: list[str] | str) -> list[str]:
+    return value if isinstance(value, list) else [value]
+
+
+def _preview_row(number: int, columns: list[str], row: "RowResult", errors: dict[str, Any] | None) -> PreviewRow:
+    errors = serializable_errors(errors or {})
+    cells = [(row[column], _messages(errors.pop(column, []))) for column in columns]
+    messages = [
+        message if name in ("-", "__all__") else f"{name}: {message}"
+        for name, value in errors.items()
+        for message in _messages(value)
+    ]
+    return PreviewRow(number, cells, messages)
+
+
+def preview_page(
+    filepath: str,
+    checker: "ValidatorMixin",
+    *,
+    sheet: str = "",
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> PreviewPage:
+    """Read and validate only the rows of `page` of a csv/xlsx file (header in the first row)."""
+    start = (page - 1) * page_size
+    if Path(filepath).suffix.lower() == ".csv":
+        rows, total, estimated = _csv_page(filepath, start, page_size)
+    else:
+        rows, total, estimated = _xls_page(filepath, sheet, start, page_size)
+    has_next, rows = len(rows) > page_size, rows[:page_size]
+    errors = validate_single(rows, checker) if rows else {}
+    # extra csv values (stored under None) have no column
+    columns = [column for column in rows[0] if column is not None] if rows else []
+    return PreviewPage(
+        page,
+        page_size,
+        columns,
+        [_preview_row(start + i, columns, row, errors.get(i)) for i, row in enumerate(rows, 1)],
+        has_next,
+        total,
+        estimated,
+    )
@@ -0,0 +1,189 @@
+import posixpath
+import zipfile
+from collections.abc import Iterator
+from typing import IO, TYPE_CHECKING, Any, NamedTuple
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, range_boundaries
+
+from .sources import open_binary
+
+if TYPE_CHECKING:
+    from .types import Source
+
+MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+READ_SIZE = 16 * 1024
+# sheets without a <dimension> are read up to this size to estimate their number of rows
+ESTIMATE_SIZE = 256 * 1024
+
+
+class SheetProbe(NamedTuple):
+    index: int
+    name: str
+    # "visible", "hidden" or "veryHidden"
+    state: str
+    # the range declared in the <dimension> element (ie. "A1:F2000"), if any
+    dimension: str | None
+    max_row: int
+    max_column: int
+    # True when the sheet has no dimension and `max_row` was extrapolated from the size of its xml
+    estimated: bool
+    # first rows of the sheet: raw values, shared strings resolved, dates as serial numbers
+    rows: list[tuple[Any, ...]]
+
+    @property
+    def header(self) -> tuple[str, ...]:
+        return tuple(str(value) for value in self.rows[0]) if self.rows else ()
+
+
+class _SharedString(NamedTuple):
+    index: int
+
+
+def _pull(stream: IO[bytes], *tags: str) -> Iterator[tuple[Element, int]]:
+    # yield the `tags` elements as soon as they are parsed (their content is dropped afterwards)
+    # and the number of bytes read so far
+    parser = XMLPullParser(events=("end",))
+    read = 0
+    while chunk := stream.read(READ_SIZE):
+        read += len(chunk)
+        parser.feed(chunk)
+        for __, element in parser.read_events():
+            if element.tag in tags:
+                yield element, read
+                element.clear()
+
+
+def _root(archive: zipfile.ZipFile, part: str) -> Element:
+    # small parts are parsed in one go
+    parser = XMLPullParser(events=("start",))
+    with archive.open(part) as f:
+        parser.feed(f.read())
+    return next(parser.read_events())[1]
+
+
+def _sheets(archive: zipfile.ZipFile) -> list[tuple[str, str, str]]:
+    # (name, state, part) of the worksheets in workbook order, without parsing the sheets
+    rels = _root(archive, "xl/_rels/workbook.xml.rels")
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{PKG_REL}Relationship")}
+    sheets = []
+    for sheet in _root(archive, "xl/workbook.xml").iter(f"{MAIN}sheet"):
+        target = targets[sheet.get(f"{REL}id")]
+        part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        sheets.append((sheet.get("name"), sheet.get("state", "visible"), part))
+    return sheets
+
+
+def _value(cell: Element) -> Any:
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{MAIN}t"))
+    if (v := cell.find(f"{MAIN}v")) is None or v.text is None:
+        return None
+    match kind:
+        case "s":
+            return _SharedString(int(v.text))
+        case "b":
+            return v.text == "1"
+        case "n":
+            return int(v.text) if v.text.lstrip("-").isdigit() else float(v.text)
+        case _:
+            return v.text
+
+
+def _row_values(row: Element) -> tuple[Any, ...]:
+    values: dict[int, Any] = {}
+    for i, cell in enumerate(row.iter(f"{MAIN}c"), 1):
+        # cells can omit their reference (ie. files written by some libraries)
+        column = i if (ref := cell.get("r")) is None else column_index_from_string(coordinate_from_string(ref)[0])
+        values[column] = _value(cell)
+    return tuple(values.get(i) for i in range(1, max(values, default=0) + 1))
+
+
+def _read_rows(stream: IO[bytes], nrows: int) -> tuple[str | None, dict[int, tuple[Any, ...]], int, int]:
+    # return the dimension, the first `nrows` rows, the last row number found and, if the sheet
+    # was not read to the end, the bytes holding the rows up to it (0 otherwise)
+    dimension = None
+    rows: dict[int, tuple[Any, ...]] = {}
+    last_row = window = 0
+    for element, read in _pull(stream, f"{MAIN}dimension", f"{MAIN}row"):
+        if element.tag == f"{MAIN}dimension":
+            dimension = element.get("ref")
+            continue
+        if window and read > window:
+            # all the rows of the estimate window have been counted
+            return dimension, rows, last_row, window
+        last_row = int(element.get("r", last_row + 1))
+        if last_row <= nrows:
+            rows[last_row] = _row_values(element)
+        if not window and last_row >= nrows:
+            if dimension is not None:
+                return dimension, rows, last_row, read
+            if read >= ESTIMATE_SIZE:
+                window = read
+    return dimension, rows, last_row, 0
+
+
+def _probe_sheet(archive: zipfile.ZipFile, part: str, nrows: int) -> SheetProbe:
+    # index, name and state are set by the caller, shared strings are left unresolved
+    with archive.open(part) as stream:
+        dimension, rows, max_row, read = _read_rows(stream, nrows)
+    max_column, estimated = max((len(values) for values in rows.values()), default=0), False
+    if dimension is not None:
+        __, __, declared_column, max_row = range_boundaries(
+            dimension if ":" in dimension else f"{dimension}:{dimension}"
+        )
+        max_column = max(max_column, declared_column)
+    elif read:
+        max_row, estimated = max(max_row, round(max_row * archive.getinfo(part).file_size / read)), True
+    # missing rows and cells are filled with None, as `iter_rows()` does
+    probed = [rows.get(i, ()) for i in range(1, max(rows, default=0) + 1)]
+    probed = [(*values, *(None,) * (max_column - len(values))) for values in probed]
+    return SheetProbe(0, "", "", dimension, max_row, max_column, estimated, probed)
+
+
+def _shared_strings(archive: zipfile.ZipFile, indexes: set[int]) -> dict[int, str]:
+    # shared strings are read up to the last index used by the probed rows
+    found: dict[int, str] = {}
+    if not indexes or "xl/sharedStrings.xml" not in archive.namelist():
+        return found
+    last = max(indexes)
+    with archive.open("xl/sharedStrings.xml") as stream:
+        for i, (element, __) in enumerate(_pull(stream, f"{MAIN}si")):
+            if i in indexes:
+                # plain (<t>) or rich text (<r><t>), phonetic runs (<rPh>) are not part of the text
+                texts = element.findall(f"{MAIN}t") + element.findall(f"{MAIN}r/{MAIN}t")
+                found[i] = "".join(t.text or "" for t in texts)
+            if i >= last:
+                break
+    return found
+
+
+def _resolve(rows: list[tuple[Any, ...]], strings: dict[int, str]) -> list[tuple[Any, ...]]:
+    return [tuple(strings.get(v.index) if isinstance(v, _SharedString) else v for v in values) for values in rows]
+
+
+def probe_workbook(source: "Source", *, rows: int = 1) -> list[SheetProbe]:
+    """Return names, sizes and first `rows` rows of the sheets of an xlsx file, without loading the workbook.
+
+    Only the workbook part, the beginning of each sheet part and of the shared strings are read:
+    `max_row` comes from the <dimension> element, or is estimated when the sheet does not declare it.
+    """
+    filepath = open_binary(source)
+    try:
+        with zipfile.ZipFile(filepath) as archive:
+            probes = [
+                _probe_sheet(archive, part, rows)._replace(index=index, name=name, state=state)
+                for index, (name, state, part) in enumerate(_sheets(archive))
+            ]
+            indexes = {
+                v.index for probe in probes for values in probe.rows for v in values if isinstance(v, _SharedString)
+            }
+            strings = _shared_strings(archive, indexes)
+    finally:
+        # streams copied to a spooled file are closed, caller files are left open
+        if filepath is not source and not isinstance(filepath, str):
+            filepath.close()
+    return [probe._replace(rows=_resolve(probe.rows, strings)) for probe in probes]
@@ -0,0 +1,165 @@
+import random
+import time
+from contextlib import contextmanager
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .csvfile import CsvFile
+from .probe import probe_workbook
+from .readers import Header, _build_rows, _dict_rows, _Workbook, get_sheet_index, identity
+from .validation import SheetValidator
+
+if TYPE_CHECKING:
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .types import RowResult, ValueMapper
+
+DEFAULT_SAMPLE = 200
+DEFAULT_TIME_BUDGET = 2.0
+# rows skipped between two checks of the time budget
+SKIP_CHECK = 1000
+
+
+class QuickCheck(NamedTuple):
+    # checker fields missing from the header and header columns unknown to the checker
+    missing: list[str]
+    unknown: list[str]
+    # number of data rows in the file (None when not known without reading the whole sheet)
+    total: int | None
+    sampled: int
+    # errors of the sampled rows, keyed by data row number as `validate_single()` does
+    errors: dict[int, Any]
+    # False when the time budget expired before the whole sample was validated
+    complete: bool
+
+    @property
+    def error_rate(self) -> float:
+        return len(self.errors) / self.sampled if self.sampled else 0.0
+
+
+def sample_rows(total: int, size: int, seed: int | None = None) -> list[int]:
+    """Return up to `size` sorted row indexes: the first and last quarter of the sample and random ones in between."""
+    if total <= size:
+        return list(range(total))
+    edge = size // 4
+    middle = random.Random(seed).sample(range(edge, total - edge), size - 2 * edge)  # noqa: S311
+    return [*range(edge), *sorted(middle), *range(total - edge, total)]
+
+
+Sample = tuple[list[str], int | None, Iterator[tuple[int, "RowResult"]]]
+
+
+def _csv_rows(f: CsvFile, header: list[str], indexes: list[int], value_mapper: "ValueMapper") -> Iterator[Any]:
+    for i in indexes:
+        # the index of the file gives direct access to any row
+        for row in _dict_rows(header, [f.row(i + 1)], value_mapper):
+            yield i + 1, row
+
+
+@contextmanager
+def _csv_sample(  # noqa: PLR0913
+    filepath: str, size: int, seed: int | None, encoding: str, value_mapper: "ValueMapper", *, deadline: float
+) -> Iterator[Sample]:
+    with CsvFile(filepath, encoding=encoding) as f:
+        try:
+            header = f.row(0)
+        except IndexError:
+            yield [], 0, iter(())
+            return
+        # the file is indexed one block at a time: when the time is over only the rows indexed so far are sampled
+        more = True
+        while more and time.monotonic() <= deadline:
+            more = f.index_block()
+        known = f.indexed - 1
+        yield header, None if more else known, _csv_rows(f, header, sample_rows(known, size, seed), value_mapper)
+
+
+def _xls_rows(
+    values: Iterator[tuple[Any, ...]],
+    header: Header,
+    indexes: list[int],
+    value_mapper: "ValueMapper",
+    *,
+    deadline: float,
+) -> Iterator[Any]:
+    # the rows between the sampled ones are skipped without being built, up to the last sampled row
+    wanted = set(indexes)
+    last = indexes[-1] if indexes else -1
+    for i, values_row in enumerate(values):
+        if i > last or (i % SKIP_CHECK == 0 and time.monotonic() > deadline):
+            return
+        if i in wanted:
+            for row in _build_rows(header, [values_row], value_mapper, False):
+                yield i + 1, row
+
+
+@contextmanager
+def _xls_sample(  # noqa: PLR0913
+    filepath: str,
+    size: int,
+    seed: int | None,
+    index_or_name: int | str,
+    value_mapper: "ValueMapper",
+    *,
+    deadline: float,
+) -> Iterator[Sample]:
+    # worksheets are streamed: the sampled rows are chosen from the size declared by the sheet (see `probe_workbook()`)
+    probes = probe_workbook(filepath)
+    probe = probes[get_sheet_index([p.name for p in probes], index_or_name)]
+    total = max(probe.max_row - 1, 0)
+    wb = _Workbook(filepath)
+    try:
+        values = wb.values(probe.index)
+        header = [str(value) for value in next(values, ())]
+        rows = _xls_rows(values, Header(header), sample_rows(total, size, seed), value_mapper, deadline=deadline)
+        yield header, None if probe.estimated else total, rows
+    finally:
+        wb.close()
+
+
+def quick_check(  # noqa: PLR0913
+    filepath: str,
+    checker: "ValidatorMixin",
+    *,
+    sample: int = DEFAULT_SAMPLE,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    seed: int | None = None,
+    index_or_name: int | str = 0,
+    encoding: str = "utf-8",
+    value_mapper: "ValueMapper" = identity,
+    fail_if_alien: bool = False,
+) -> QuickCheck:
+    """Compare the header with the checker fields and validate a sample of rows within `time_budget` seconds.
+
+    The sample holds the first, last and random rows: csv files are sampled through their row index, workbook
+    sheets are streamed up to the last sampled row of the size they declare (`total` is None when it is estimated).
+    Csv files too big to be indexed within the time budget are sampled in the part indexed so far (`total` is None).
+    Rows are validated one by one: primary keys and master/detail relations are not checked.
+    """
+    deadline = time.monotonic() + time_budget
+    if Path(filepath).suffix.lower() == ".csv":
+        reader = _csv_sample(filepath, sample, seed, encoding, value_mapper, deadline=deadline)
+    else:
+        reader = _xls_sample(filepath, sample, seed, index_or_name, value_mapper, deadline=deadline)
+    validator = SheetValidator(checker, fail_if_alien=fail_if_alien)
+    errors, sampled, complete = {}, 0, True
+    with reader as (header, total, rows):
+        for row_number, row in rows:
+            if time.monotonic() > deadline:
+                complete = False
+                break
+            outcome = validator.clean_row(row)
+            if row_errors := validator.merge_errors(outcome, [outcome.alien] if outcome.alien else []):
+                errors[row_number] = row_errors
+            sampled += 1
+    # the rows of a workbook also end when the time is over while skipping to the next sampled row
+    complete = complete and time.monotonic() <= deadline
+    return QuickCheck(
+        missing=sorted(validator.known_fields.difference(header)),
+        unknown=sorted(set(header).difference(validator.known_fields)),
+        total=total,
+        sampled=sampled,
+        errors=errors,
+        complete=complete,
+    )
@@ -1,15 +1,24 @@
 import csv
-from collections.abc import Callable
-from itertools import islice
-from typing import TYPE_CHECKING, Any, Iterable
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from functools import lru_cache
+from itertools import chain, islice, zip_longest
+from typing import IO, TYPE_CHECKING, Any, Iterable, NamedTuple
 
 import openpyxl
 
+from .csvfile import DEFAULT_BLOCK_SIZE, CsvFile, is_ascii_compatible
+from .mappers import column_mappers, compile_mapper, identity
+from .sources import digest, get_path, open_binary, open_text, size
+
 if TYPE_CHECKING:
     from openpyxl.workbook.workbook import Workbook
-    from openpyxl.worksheet.worksheet import Worksheet
 
-    from .types import MultiSheetResult, SheetResult, ValueMapper
+    from .cache import ParseCache
+    from .instrumentation import Instrument
+    from .interning import DictionaryEncoder
+    from .types import BatchResult, MultiSheetResult, RowResult, SheetResult, Source, ValueMapper
+
+DEFAULT_BATCH_SIZE = 1000
 
 
 class SheetNotError(Exception):
@@ -17,102 +26,483 @@ class SheetNotError(Exception):
         super().__init__(index_or_name)
 
 
-def identity(x: Any) -> Any:
-    return x
+class Header:
+    __slots__ = ("index", "names")
 
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
 
-def _read_worksheet(
-    sheet: "Worksheet",
-    start_at_row: int,
-    has_header: bool,
-    value_mapper: Callable[[Any], Any] = identity,
-) -> Iterable[dict[str, Any]]:
-    rows = sheet.rows
-
-    field_names = None
-    generate_field_names = False
-    if has_header:
-        field_names = [str(cell.value) for cell in next(rows)]
-    else:
-        generate_field_names = True
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"Header({self.names!r})"
+
+
+class Row(Mapping[str, Any]):
+    """Read-only mapping that stores the values in a tuple and shares the Header of its sheet."""
+
+    __slots__ = ("_header", "_values")
+
+    def __init__(self, header: Header, values: tuple[Any, ...]) -> None:
+        self._header = header
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._header.index[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._header.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._header.index)
+
+    def __len__(self) -> int:
+        return len(self._header.index)
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+
+class RecordBatch(NamedTuple):
+    header: tuple[str, ...]
+    columns: list[list[Any]]
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def _values(self) -> Iterator[tuple[Any, ...]]:
+        # extra values are stored in a trailing None column, rows without them do not get the None key
+        if self.header[-1:] != (None,):
+            yield from zip(*self.columns, strict=True)
+            return
+        width = len(self.header) - 1
+        for values in zip(*self.columns, strict=True):
+            yield values if values[width] is not None else values[:width]
+
+    def rows(self, compact: bool = False) -> Iterator["RowResult"]:
+        if compact:
+            headers = {len(self.header): Header(self.header), len(self.header) - 1: Header(self.header[:-1])}
+            for values in self._values():
+                yield Row(headers[len(values)], values)
+        else:
+            for values in self._values():
+                yield dict(zip(self.header, values, strict=False))
+
+
+def rows_from_batches(batches: "BatchResult", compact: bool = False) -> "SheetResult":
+    for batch in batches:
+        yield from batch.rows(compact)
+
+
+@lru_cache(maxsize=64)
+def _generated_header(width: int) -> Header:
+    return Header(f"column{d + 1}" for d in range(width))
 
-    rows = islice(rows, start_at_row, None)
-    for row in rows:
-        if generate_field_names:
-            field_names = [f"column{d + 1}" for d in range(len(row))]
 
-        yield dict(zip(field_names, (value_mapper(cell.value) for cell in row), strict=True))
+def _compile(
+    value_mapper: "ValueMapper", names: tuple[str, ...], dictionary: "DictionaryEncoder | None", sheet: str | None
+) -> Callable[[tuple[Any, ...]], tuple[Any, ...]] | None:
+    # values are mapped first, then encoded
+    apply = compile_mapper(value_mapper, names)
+    if dictionary is None:
+        return apply
+    encode = dictionary.compile(sheet, names)
+    return encode if apply is None else lambda values: encode(apply(values))
 
 
-def open_xls(
-    filepath: str,
+def _split(row: Sequence[Any], width: int) -> tuple[tuple[Any, ...], list[Any] | None]:
+    # same rules of csv.DictReader: missing values are None, extra ones are kept (as read) under None
+    if len(row) > width:
+        return tuple(row[:width]), list(row[width:])
+    # short rows are padded (ie. read-only worksheets without a <dimension> element)
+    return (*row, *(None,) * (width - len(row))), None
+
+
+def _build_rows(  # noqa: PLR0913
+    header: Header | None,
+    rows: Iterable[Iterable[Any]],
+    value_mapper: "ValueMapper",
+    compact: bool,
     *,
-    index_or_name: int | str = 0,
-    start_at_row: int = 0,
-    has_header: bool = True,
-    value_mapper: "ValueMapper" = identity,
+    dictionary: "DictionaryEncoder | None" = None,
+    sheet: str | None = None,
 ) -> "SheetResult":
-    wb: "Workbook" = openpyxl.load_workbook(filepath)
+    width = len(header) if header is not None else 0
+    # the mapper is compiled once per header (headerless rows can have different widths)
+    apply = _compile(value_mapper, header.names, dictionary, sheet) if header is not None else None
+    extended = Header((*header.names, None)) if header is not None else None
+    compiled: dict[int, Any] = {}
+    for row in rows:
+        extra = None
+        if header is None:
+            row_header, values = _generated_header(len(row)), tuple(row)
+            if len(row) not in compiled:
+                compiled[len(row)] = _compile(value_mapper, row_header.names, dictionary, sheet)
+            apply = compiled[len(row)]
+        else:
+            row_header, values, extra = header, *_split(row, width)
+        if apply is not None:
+            values = apply(values)
+        if extra is not None:
+            row_header, values = extended, (*values, extra)
+        if compact:
+            yield Row(row_header, values)
+        else:
+            yield dict(zip(row_header.names, values, strict=True))
+
+
+def _iter_batches(  # noqa: PLR0913
+    header: tuple[str, ...] | None,
+    rows: Iterator[tuple[Any, ...]],
+    batch_size: int,
+    value_mapper: "ValueMapper",
+    *,
+    dictionary: "DictionaryEncoder | None" = None,
+    sheet: str | None = None,
+) -> "BatchResult":
+    if header is None:
+        if (first := next(rows, None)) is None:
+            return
+        header = _generated_header(len(first)).names
+        rows = chain([first], rows)
+    width = len(header)
+    mappers = column_mappers(value_mapper, header)
+    encoders = [] if dictionary is None else dictionary.columns(sheet, header)
+    while chunk := list(islice(rows, batch_size)):
+        columns = [list(values) for values in zip_longest(*chunk)]
+        extra = None
+        if len(columns) > width:
+            # same rules of `open_csv`: extra values are kept (as read) under None
+            extra = [list(row[width:]) if len(row) > width else None for row in chunk]
+            del columns[width:]
+        columns.extend([None] * len(chunk) for __ in range(width - len(columns)))
+        for i, mapper in mappers:
+            columns[i] = list(map(mapper, columns[i]))
+        for i, encode in enumerate(encoders):
+            columns[i] = list(map(encode, columns[i]))
+        if extra is None:
+            yield RecordBatch(header, columns)
+        else:
+            yield RecordBatch((*header, None), [*columns, extra])
+
+
+def _read_values(  # noqa: PLR0913
+    rows: Iterator[tuple[Any, ...]],
+    start_at_row: int,
+    has_header: bool,
+    value_mapper: "ValueMapper" = identity,
+    compact: bool = False,
+    *,
+    dictionary: "DictionaryEncoder | None" = None,
+    sheet: str | None = None,
+) -> Iterable["RowResult"]:
+    header = Header(str(value) for value in next(rows)) if has_header else None
+    rows = islice(rows, start_at_row, None)
+    yield from _build_rows(header, rows, value_mapper, compact, dictionary=dictionary, sheet=sheet)
+
+
+def _load_workbook(filepath: str | IO[bytes], read_only: bool) -> "Workbook":
+    return openpyxl.load_workbook(filepath, read_only=read_only)
+
+
+def get_sheet_index(sheetnames: list[str], index_or_name: int | str) -> int:
+    """Return the position of a sheet given by index or name, raise SheetNotError if there is no such sheet."""
     match index_or_name:
         case int():
             sheet_index = index_or_name
         case str():
             try:
-                sheet_index = wb.sheetnames.index(index_or_name)
+                sheet_index = sheetnames.index(index_or_name)
             except ValueError:
                 raise SheetNotError(index_or_name)
         case _:
             raise SheetNotError(index_or_name)
     try:
-        sh: "Worksheet" = wb.worksheets[sheet_index]
+        sheetnames[sheet_index]
     except IndexError:
         raise SheetNotError(sheet_index)
-    yield from _read_worksheet(sh, start_at_row=start_at_row, has_header=has_header, value_mapper=value_mapper)
+    return sheet_index
+
+
+def _mapper(instrument: "Instrument | None", value_mapper: "ValueMapper", sheet: str | None) -> "ValueMapper":
+    if instrument is None or value_mapper is identity:
+        return value_mapper
+    if isinstance(value_mapper, Mapping):
+        return {name: instrument.mapper(mapper, sheet) for name, mapper in value_mapper.items()}
+    return instrument.mapper(value_mapper, sheet)
 
 
-def open_xls_multi(
-    filepath: str,
+class _Workbook:
+    # workbook opened on demand: sheets found in the ParseCache do not need it at all
+    def __init__(
+        self,
+        filepath: "Source",
+        read_only: bool = True,
+        cache: "ParseCache | None" = None,
+        instrument: "Instrument | None" = None,
+    ) -> None:
+        self.filepath = open_binary(filepath)
+        # streams copied to a spooled file are closed with the workbook, caller files are left open
+        self._spooled = self.filepath is not filepath and not isinstance(self.filepath, str)
+        self.read_only = read_only
+        self.cache = cache
+        self.instrument = instrument
+        self._wb: Workbook | None = None
+        self.digest = digest(self.filepath) if cache else None
+        self.sheetnames = cache.get_sheetnames(self.digest) if cache else None
+        if self.sheetnames is None:
+            self.sheetnames = self.workbook.sheetnames
+            if cache:
+                cache.set_sheetnames(self.digest, self.sheetnames)
+
+    @property
+    def workbook(self) -> "Workbook":
+        if self._wb is None:
+            if self.instrument is None:
+                self._wb = _load_workbook(self.filepath, self.read_only)
+            else:
+                with self.instrument.measure("load") as phase:
+                    self._wb = _load_workbook(self.filepath, self.read_only)
+                    phase.bytes += size(self.filepath)
+        return self._wb
+
+    def index(self, index_or_name: int | str) -> int:
+        return get_sheet_index(self.sheetnames, index_or_name)
+
+    def values(self, index: int) -> Iterator[tuple[Any, ...]]:
+        rows = self._values(index)
+        if self.instrument is None:
+            return rows
+        return self.instrument.iterate("parse", rows, self.sheetnames[index])
+
+    def _values(self, index: int) -> Iterator[tuple[Any, ...]]:
+        if self.cache is None:
+            return self.workbook.worksheets[index].iter_rows(values_only=True)
+        name = self.sheetnames[index]
+        if (rows := self.cache.read(self.digest, name)) is not None:
+            return rows
+        return self.cache.write(self.digest, name, self.workbook.worksheets[index].iter_rows(values_only=True))
+
+    def close(self) -> None:
+        if self._wb is not None:
+            self._wb.close()
+        if self._spooled:
+            self.filepath.close()
+
+
+def open_xls(  # noqa: PLR0913
+    filepath: "Source",
+    *,
+    index_or_name: int | str = 0,
+    start_at_row: int = 0,
+    has_header: bool = True,
+    value_mapper: "ValueMapper" = identity,
+    read_only: bool = True,
+    compact: bool = False,
+    cache: "ParseCache | None" = None,
+    instrument: "Instrument | None" = None,
+    dictionary: "DictionaryEncoder | None" = None,
+) -> "SheetResult":
+    wb = _Workbook(filepath, read_only, cache, instrument)
+    try:
+        index = wb.index(index_or_name)
+        sheet = wb.sheetnames[index]
+        value_mapper = _mapper(instrument, value_mapper, sheet)
+        rows = wb.values(index)
+        yield from _read_values(
+            rows, start_at_row, has_header, value_mapper, compact, dictionary=dictionary, sheet=sheet
+        )
+    finally:
+        wb.close()
+
+
+def open_xls_batches(  # noqa: PLR0913
+    filepath: "Source",
+    *,
+    index_or_name: int | str = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_at_row: int = 0,
+    has_header: bool = True,
+    value_mapper: "ValueMapper" = identity,
+    read_only: bool = True,
+    cache: "ParseCache | None" = None,
+    dictionary: "DictionaryEncoder | None" = None,
+) -> "BatchResult":
+    wb = _Workbook(filepath, read_only, cache)
+    try:
+        index = wb.index(index_or_name)
+        rows = wb.values(index)
+        header = tuple(str(value) for value in next(rows)) if has_header else None
+        rows = islice(rows, start_at_row, None)
+        yield from _iter_batches(
+            header, rows, batch_size, value_mapper, dictionary=dictionary, sheet=wb.sheetnames[index]
+        )
+    finally:
+        wb.close()
+
+
+def open_xls_multi(  # noqa: PLR0913
+    filepath: "Source",
     indices_or_names: list[int | str] = (0,),
     start_at_row: list[int] | int = 0,
     has_header: list[bool] | bool = True,
     value_mapper: "ValueMapper" = identity,
+    *,
+    read_only: bool = True,
+    compact: bool = False,
+    cache: "ParseCache | None" = None,
+    instrument: "Instrument | None" = None,
+    dictionary: "DictionaryEncoder | None" = None,
 ) -> "MultiSheetResult":
-    wb: "Workbook" = openpyxl.load_workbook(filepath)
-    indices = []
-    for i in indices_or_names:
-        try:
-            indices.append(i if isinstance(i, int) else wb.sheetnames.index(i))
-        except ValueError:
-            raise SheetNotError(i)
-    for si in indices:
-        try:
-            sh: "Worksheet" = wb.worksheets[si]
-        except IndexError:
-            raise SheetNotError(si)
-        start_at_row = start_at_row if isinstance(start_at_row, int) else start_at_row[si]
-        has_header = has_header if isinstance(has_header, bool) else has_header[si]
-        yield (
-            si,
-            _read_worksheet(sh, start_at_row=start_at_row, has_header=has_header, value_mapper=value_mapper),
-        )
+    # sheets share the workbook: each one must be consumed before moving to the next,
+    # the workbook is closed as soon as this generator is exhausted or closed
+    wb = _Workbook(filepath, read_only, cache, instrument)
+    try:
+        indices = [wb.index(i) for i in indices_or_names]
+        for si in indices:
+            sheet_start_at_row = start_at_row if isinstance(start_at_row, int) else start_at_row[si]
+            sheet_has_header = has_header if isinstance(has_header, bool) else has_header[si]
+            sheet = wb.sheetnames[si]
+            sheet_value_mapper = _mapper(instrument, value_mapper, sheet)
+            yield (
+                si,
+                _read_values(
+                    wb.values(si),
+                    sheet_start_at_row,
+                    sheet_has_header,
+                    sheet_value_mapper,
+                    compact,
+                    dictionary=dictionary,
+                    sheet=sheet,
+                ),
+            )
+    finally:
+        wb.close()
+
+
+def _dict_rows(
+    header: list[str],
+    rows: Iterable[list[str]],
+    value_mapper: "ValueMapper",
+    dictionary: "DictionaryEncoder | None" = None,
+) -> "SheetResult":
+    # same rules of csv.DictReader: blank rows are skipped, missing values are None, extra ones go under None
+    width = len(header)
+    # a single mapper is applied to all the values of the header columns, a dict only to its own columns
+    mappers = None
+    if isinstance(value_mapper, Mapping):
+        mappers = [(name, mapper) for name in header if (mapper := value_mapper.get(name, identity)) is not identity]
+    encoders = [] if dictionary is None else list(zip(header, dictionary.columns(None, header), strict=True))
+    for row in rows:
+        if not row:
+            continue
+        values = dict(zip(header, row, strict=False))
+        if width > len(row):
+            values.update(dict.fromkeys(header[len(row) :]))
+        if mappers is None:
+            values = {k: value_mapper(v) for k, v in values.items()}
+        else:
+            for name, mapper in mappers:
+                values[name] = mapper(values[name])
+        for name, encode in encoders:
+            values[name] = encode(values[name])
+        if width < len(row):
+            values[None] = row[width:]
+        yield values
+
+
+def _csv_rows(f: CsvFile, start: int, instrument: "Instrument | None", block_size: int) -> Iterator[list[str]]:
+    rows = f.rows(start, block_size=block_size)
+    return rows if instrument is None else instrument.iterate("parse", rows)
+
+
+def _open_csv_rows(  # noqa: PLR0913
+    filepath: "Source | CsvFile",
+    has_header: bool,
+    start_at_row: int,
+    encoding: str,
+    instrument: "Instrument | None",
+    *,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Iterator[tuple[list[str] | None, Iterator[list[str]]]]:
+    # yields the header and the rows once, then closes the file (unless it has been opened by the caller)
+    if isinstance(filepath, CsvFile):
+        yield from _csv_file_rows(filepath, has_header, start_at_row, instrument, block_size)
+        return
+    if (path := get_path(filepath)) is not None and not is_ascii_compatible(encoding):
+        # CsvFile cannot index encodings like UTF-16: these files are read as streams
+        with open(path, "rb") as f:
+            yield from _open_csv_rows(f, has_header, start_at_row, encoding, instrument, block_size=block_size)
+        return
+    if path is None:
+        # file-like objects and chunk iterators are decoded and parsed while they are read,
+        # blank lines are skipped as CsvFile does
+        with open_text(filepath, encoding) as text:
+            rows = filter(None, csv.reader(text))
+            header = next(rows, None) if has_header else None
+            if not has_header or header is not None:
+                rows = islice(rows, start_at_row, None)
+                yield header, rows if instrument is None else instrument.iterate("parse", rows)
+        return
+    if instrument is None:
+        f = CsvFile(path, encoding=encoding)
+    else:
+        with instrument.measure("load") as phase:
+            f = CsvFile(path, encoding=encoding)
+            phase.bytes += f.size
+    with f:
+        yield from _csv_file_rows(f, has_header, start_at_row, instrument, block_size)
 
 
-def open_csv(
-    filepath: str,
+def _csv_file_rows(
+    f: CsvFile, has_header: bool, start_at_row: int, instrument: "Instrument | None", block_size: int
+) -> Iterator[tuple[list[str] | None, Iterator[list[str]]]]:
+    if not has_header:
+        yield None, _csv_rows(f, start_at_row, instrument, block_size)
+        return
+    try:
+        header = f.row(0)
+    except IndexError:
+        return
+    yield header, _csv_rows(f, 1 + start_at_row, instrument, block_size)
+
+
+def open_csv(  # noqa: PLR0913
+    filepath: "Source | CsvFile",
     *,
     start_at_row: int = 0,
     has_header: bool = False,
     value_mapper: "ValueMapper" = identity,
+    compact: bool = False,
+    encoding: str = "utf-8",
+    instrument: "Instrument | None" = None,
+    dictionary: "DictionaryEncoder | None" = None,
 ) -> "SheetResult":
-    with open(filepath) as f:
-        if has_header:
-            reader = csv.DictReader(f)
-            reader = islice(reader, start_at_row, None)
-            for row in reader:
-                yield {k: value_mapper(v) for k, v in row.items()}
+    if instrument is not None:
+        value_mapper = _mapper(instrument, value_mapper, None)
+    for header, rows in _open_csv_rows(filepath, has_header, start_at_row, encoding, instrument):
+        if header is None:
+            yield from _build_rows(None, rows, value_mapper, compact, dictionary=dictionary)
+        elif compact:
+            yield from _build_rows(Header(header), rows, value_mapper, compact, dictionary=dictionary)
         else:
-            reader = csv.reader(f)
-            reader = islice(reader, start_at_row, None)
-            for row in reader:
-                field_names = [f"column{d + 1}" for d in range(len(row))]
-                yield dict(zip(field_names, map(value_mapper, row), strict=True))
+            yield from _dict_rows(header, rows, value_mapper, dictionary)
+
+
+def open_csv_batches(  # noqa: PLR0913
+    filepath: "Source",
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_at_row: int = 0,
+    has_header: bool = False,
+    value_mapper: "ValueMapper" = identity,
+    encoding: str = "utf-8",
+    dictionary: "DictionaryEncoder | None" = None,
+) -> "BatchResult":
+    for header, rows in _open_csv_rows(filepath, has_header, start_at_row, encoding, None, block_size=batch_size):
+        yield from _iter_batches(
+            None if header is None else tuple(header), rows, batch_size, value_mapper, dictionary=dictionary
+        )
@@ -0,0 +1,181 @@
+import os
+import threading
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+from django.db.models.signals import post_delete, post_save
+
+from .generation import get_generation, next_generation
+from .readers import open_csv
+
+if TYPE_CHECKING:
+    from django.db.models import Model, QuerySet
+
+    from .types import RowResult, Source
+
+# each dataset has its own generation: "hsi:reference:generation:<name>"
+GENERATION_KEY = "hsi:reference:generation"
+EMPTY = (None, "")
+
+_loaders: dict[str, tuple[Callable[[], "ReferenceIndex"], Callable[[], Any] | None]] = {}
+_models: dict[str, "type[Model]"] = {}
+_indexes: dict[str, tuple[Any, "ReferenceIndex"]] = {}
+_lock = threading.Lock()
+
+
+class ReferenceIndex:
+    """Hierarchy of reference codes (ie. ADMIN0 > ADMIN1 > ADMIN2 > ADMIN3).
+
+    Each level maps its codes to the code of the parent level, so that membership and
+    parent/child checks are dictionary lookups.
+    """
+
+    def __init__(self, levels: Sequence[str]) -> None:
+        self.levels = tuple(levels)
+        self.parents: dict[str, dict[Any, Any]] = {level: {} for level in self.levels}
+
+    def __len__(self) -> int:
+        return sum(len(codes) for codes in self.parents.values())
+
+    def add(self, row: "RowResult") -> None:
+        parent = None
+        for level in self.levels:
+            if (code := row.get(level)) in EMPTY:
+                break
+            if self.parents[level].setdefault(code, parent) != parent:
+                raise ValueError(f"{level} '{code}' has two parents: '{self.parents[level][code]}' and '{parent}'")
+            parent = code
+
+    @classmethod
+    def from_rows(cls, levels: Sequence[str], rows: Iterable["RowResult"]) -> "ReferenceIndex":
+        index = cls(levels)
+        for row in rows:
+            index.add(row)
+        return index
+
+    @classmethod
+    def from_csv(cls, source: "Source", levels: Sequence[str], *, encoding: str = "utf-8") -> "ReferenceIndex":
+        return cls.from_rows(levels, open_csv(source, has_header=True, encoding=encoding))
+
+    @classmethod
+    def from_queryset(cls, queryset: "QuerySet[Any]", levels: Sequence[str]) -> "ReferenceIndex":
+        return cls.from_rows(levels, queryset.values(*levels).iterator())
+
+    def contains(self, level: str, code: Any) -> bool:
+        return code in self.parents[level]
+
+    def ancestor(self, level: str, code: Any, ancestor_level: str) -> Any:
+        """Return the code of `ancestor_level` that contains `code`."""
+        for i in range(self.levels.index(level), self.levels.index(ancestor_level), -1):
+            code = self.parents[self.levels[i]].get(code)
+        return code
+
+
+def _generation_key(name: str) -> str:
+    return f"{GENERATION_KEY}:{name}"
+
+
+def _version(name: str) -> Any:
+    __, version = _loaders[name]
+    return get_generation(_generation_key(name)), version() if version else None
+
+
+def register(name: str, loader: Callable[[], ReferenceIndex], *, version: Callable[[], Any] | None = None) -> None:
+    """Register the reference dataset `name`: `loader` builds the index, which is rebuilt when `version()` changes."""
+    with _lock:
+        _loaders[name] = loader, version
+        _indexes.pop(name, None)
+        _models.pop(name, None)
+
+
+def register_csv(name: str, filepath: str, levels: Sequence[str], *, encoding: str = "utf-8") -> None:
+    """Register a csv file, reloaded when it changes on disk."""
+
+    def version() -> tuple[int, int]:
+        st = os.stat(filepath)
+        return st.st_mtime_ns, st.st_size
+
+    register(name, lambda: ReferenceIndex.from_csv(filepath, levels, encoding=encoding), version=version)
+
+
+def register_model(name: str, model: "type[Model]", levels: Sequence[str]) -> None:
+    """Register a model, reloaded (in every process) when any of its records is saved or deleted."""
+    register(name, lambda: ReferenceIndex.from_queryset(model._default_manager.all(), levels))
+    _models[name] = model
+    post_save.connect(_invalidate_model, sender=model, dispatch_uid=f"hsi-reference-save-{model._meta.label}")
+    post_delete.connect(_invalidate_model, sender=model, dispatch_uid=f"hsi-reference-delete-{model._meta.label}")
+
+
+def get_reference(name: str) -> ReferenceIndex:
+    """Return the index of the reference dataset `name`, built once per process and version."""
+    if name not in _loaders:
+        raise KeyError(f"Unknown reference dataset '{name}'")
+    version = _version(name)
+    with _lock:
+        cached = _indexes.get(name)
+        if cached is None or cached[0] != version:
+            loader, __ = _loaders[name]
+            cached = _indexes[name] = version, loader()
+    return cached[1]
+
+
+def invalidate(name: str | None = None) -> None:
+    """Reload the dataset `name` (all of them by default) in every process."""
+    with _lock:
+        for dataset in list(_loaders) if name is None else [name]:
+            _indexes.pop(dataset, None)
+            next_generation(_generation_key(dataset))
+
+
+def _invalidate_model(sender: "type[Model]", **kwargs: Any) -> None:
+    # only the datasets built from the saved/deleted model
+    for name in [name for name, model in _models.items() if model is sender]:
+        invalidate(name)
+
+
+class ReferenceValidator:
+    """Check that the codes in the `columns` (`{level: column}`) exist and belong to the codes of the parent columns.
+
+    `reference` is an index or the name of a registered dataset, resolved again by `setup()` at each validation.
+    """
+
+    def __init__(self, reference: ReferenceIndex | str, columns: Mapping[str, str]) -> None:
+        self.reference = reference
+        self.columns = dict(columns)
+        self.index = reference if isinstance(reference, ReferenceIndex) else None
+
+    def setup(self) -> None:
+        if isinstance(self.reference, str):
+            self.index = get_reference(self.reference)
+
+    def _checks(self, index: ReferenceIndex) -> list[tuple[str, str, str | None, str | None]]:
+        # (level, column, nearest checked ancestor level, its column) from the top of the hierarchy
+        checks, parent = [], (None, None)
+        for level in index.levels:
+            if (column := self.columns.get(level)) is not None:
+                checks.append((level, column, *parent))
+                parent = level, column
+        return checks
+
+    def validate_batch(self, rows: Sequence["RowResult"]) -> list[dict[str, list[str]] | None]:
+        if self.index is None:
+            self.setup()
+        index = self.index
+        results: list[dict[str, list[str]] | None] = [None] * len(rows)
+        for level, column, parent_level, parent_column in self._checks(index):
+            codes = index.parents[level]
+            values = [row.get(column) for row in rows]
+            parents = [row.get(parent_column) for row in rows] if parent_column else [None] * len(rows)
+            for i, (code, parent) in enumerate(zip(values, parents, strict=True)):
+                if code in EMPTY:
+                    continue
+                if code not in codes:
+                    message = f"'{code}' is not a valid {level}"
+                elif parent not in EMPTY and index.ancestor(level, code, parent_level) != parent:
+                    message = f"'{code}' does not belong to {parent_level} '{parent}'"
+                else:
+                    continue
+                if results[i] is None:
+                    results[i] = {}
+                results[i].setdefault(column, []).append(message)
+        return results
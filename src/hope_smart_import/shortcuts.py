@@ -1,35 +1,277 @@
 from typing import TYPE_CHECKING, Any
-from collections.abc import Generator
+from collections.abc import Generator, Iterator, Mapping, Sequence
+from contextlib import nullcontext
+from functools import partial
 
 from hope_flex_fields.models import DataChecker, Fieldset
 from hope_flex_fields.models.base import ValidatorMixin
 
+from .parallel import DEFAULT_CHUNK_SIZE, ChunkedValidator, SheetScheduler
+from .validation import SheetValidator
+
 if TYPE_CHECKING:
-    from .types import MultiSheetResult, SheetResult
+    from .instrumentation import Instrument
+    from .keyindex import KeyIndexFactory
+    from .memo import ValidationMemo
+    from .reference import ReferenceValidator
+    from .sinks import ErrorSink
+    from .types import BatchResult, MultiSheetResult, SheetResult
+
+
+def _count(instrument: "Instrument", g: "SheetResult", label: str) -> "SheetResult":
+    # single rows (dicts) are accepted as well, leave them alone
+    if isinstance(g, list | tuple | Generator):
+        return instrument.count(instrument.get("validate", label), g)
+    return g
+
+
+def _check_workers(workers: int, **options: Any) -> None:
+    # options only supported by the validation in the current process
+    for name, value in options.items():
+        if workers and value not in (None, False):
+            raise ValueError(f"`{name}` cannot be used with `workers`")
+
+
+def _check_sink(sink: "ErrorSink | None", include_success: bool) -> None:
+    if sink is not None and include_success:
+        raise ValueError("`include_success` cannot be used with `sink`")
+
+
+def _close(g: Any) -> None:
+    # closing the reader generators closes the workbook/file they read
+    if isinstance(g, Generator):
+        g.close()
+
+
+class _ErrorBudget:
+    # errors still allowed before the validation stops, shared by all the sheets of a workbook
+    def __init__(self, max_errors: int) -> None:
+        self.remaining = max_errors
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+    def limit(self, results: Iterator[tuple[int, Any]], g: "SheetResult") -> Iterator[tuple[int, Any]]:
+        for row, errors in results:
+            yield row, errors
+            if not isinstance(errors, str):  # `include_success` marks valid rows with "Ok"
+                self.remaining -= 1
+                if self.exhausted:
+                    _close(g)
+                    return
+
+
+def _get_budget(max_errors: int | None, stop_on_first_error: bool) -> _ErrorBudget | None:
+    if stop_on_first_error:
+        max_errors = 1
+    return None if max_errors is None else _ErrorBudget(max_errors)
+
+
+class _SheetSink:
+    # forwards the errors of one sheet of a workbook to the caller sink
+    def __init__(self, sink: "ErrorSink", sheet: str) -> None:
+        self.sink = sink
+        self.sheet = sheet
+
+    def add(self, row: int, errors: dict[str, Any], sheet: str | None = None) -> None:
+        self.sink.add(row, errors, self.sheet)
+
+
+def _collect(
+    results: Iterator[tuple[int, Any]], g: Any, sink: "ErrorSink | _SheetSink | None", budget: _ErrorBudget | None
+) -> Any:
+    if budget is not None:
+        results = budget.limit(results, g)
+    if sink is None:
+        return dict(results)
+    # stream the errors, they are never collected
+    for row, row_errors in results:
+        sink.add(row, row_errors)
+    return sink
 
 
-def validate_single(
+def _validate(  # noqa: PLR0913
+    g: "SheetResult",
+    checker: ValidatorMixin,
+    *,
+    include_success: bool,
+    fail_if_alien: bool,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    memo: "ValidationMemo | None",
+    key_index: "KeyIndexFactory | None",
+    sink: "ErrorSink | _SheetSink | None",
+    budget: _ErrorBudget | None,
+    references: "Sequence[ReferenceValidator] | None",
+    columnar: bool,
+) -> Any:
+    options = (memo, key_index, sink, budget, references)
+    if not workers and (columnar or any(option is not None for option in options)):
+        validator = SheetValidator(
+            checker,
+            include_success=include_success,
+            fail_if_alien=fail_if_alien,
+            memo=memo,
+            key_index=key_index,
+            references=references or (),
+            columnar=columnar,
+        )
+        return _collect(validator.iter_results(g), g, sink, budget)
+    if workers:
+        validator = ChunkedValidator(workers, chunk_size, include_success=include_success, fail_if_alien=fail_if_alien)
+        errors = validator.run(g, checker)
+    else:
+        errors = checker.validate(g, include_success=include_success, fail_if_alien=fail_if_alien)
+    if sink is None:
+        return errors
+    for row, row_errors in errors.items():
+        sink.add(row, row_errors)
+    return sink
+
+
+def validate_single(  # noqa: PLR0913
     g: "SheetResult",
     checker: ValidatorMixin,
     *,
     include_success: bool = False,
     fail_if_alien: bool = False,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    memo: "ValidationMemo | None" = None,
+    instrument: "Instrument | None" = None,
+    key_index: "KeyIndexFactory | None" = None,
+    sink: "ErrorSink | None" = None,
+    max_errors: int | None = None,
+    stop_on_first_error: bool = False,
+    references: "Sequence[ReferenceValidator] | None" = None,
+    columnar: bool = False,
 ) -> Generator[dict[str, Any]]:
-    return checker.validate(g, include_success=include_success, fail_if_alien=fail_if_alien)
+    _check_workers(
+        workers,
+        memo=memo,
+        key_index=key_index,
+        max_errors=1 if stop_on_first_error else max_errors,
+        references=references,
+        columnar=columnar,
+    )
+    _check_sink(sink, include_success)
+    validate = partial(
+        _validate,
+        checker=checker,
+        include_success=include_success,
+        fail_if_alien=fail_if_alien,
+        workers=workers,
+        chunk_size=chunk_size,
+        memo=memo,
+        key_index=key_index,
+        sink=sink,
+        budget=_get_budget(max_errors, stop_on_first_error),
+        references=references,
+        columnar=columnar,
+    )
+    if instrument is None:
+        return validate(g)
+    with instrument.measure("validate", checker.name):
+        errors = validate(_count(instrument, g, checker.name))
+    instrument.flush()
+    return errors
+
+
+def validate_batches(  # noqa: PLR0913
+    batches: "BatchResult",
+    checker: ValidatorMixin,
+    *,
+    include_success: bool = False,
+    fail_if_alien: bool = False,
+    memo: "ValidationMemo | None" = None,
+    key_index: "KeyIndexFactory | None" = None,
+    sink: "ErrorSink | None" = None,
+    max_errors: int | None = None,
+    stop_on_first_error: bool = False,
+    references: "Sequence[ReferenceValidator] | None" = None,
+    columnar: bool = False,
+) -> Any:
+    """Validate the `RecordBatch`es of `open_csv_batches`/`open_xls_batches`, one `validate_batch()` per batch."""
+    _check_sink(sink, include_success)
+    validator = SheetValidator(
+        checker,
+        include_success=include_success,
+        fail_if_alien=fail_if_alien,
+        memo=memo,
+        key_index=key_index,
+        references=references or (),
+        columnar=columnar,
+    )
+    budget = _get_budget(max_errors, stop_on_first_error)
+    return _collect(validator.iter_batch_results(batches), batches, sink, budget)
 
 
-def validate_xls_multi(
+def validate_xls_multi(  # noqa: PLR0913
     g: "MultiSheetResult",
     checkers: list[DataChecker | Fieldset],
     include_success: bool = False,
     fail_if_alien: bool = False,
+    *,
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    memo: "ValidationMemo | None" = None,
+    instrument: "Instrument | None" = None,
+    key_index: "KeyIndexFactory | None" = None,
+    sink: "ErrorSink | None" = None,
+    max_errors: int | None = None,
+    stop_on_first_error: bool = False,
+    references: "Mapping[int, Sequence[ReferenceValidator]] | None" = None,
+    columnar: bool = False,
 ) -> dict[str, list[dict[str, Any]]]:
+    _check_workers(
+        workers,
+        memo=memo,
+        key_index=key_index,
+        max_errors=1 if stop_on_first_error else max_errors,
+        references=references,
+        columnar=columnar,
+    )
+    _check_sink(sink, include_success)
+    if workers:
+        scheduler = SheetScheduler(workers, chunk_size, include_success=include_success, fail_if_alien=fail_if_alien)
+        if instrument is None:
+            errors = scheduler.run(g, checkers)
+        else:
+            with instrument.measure("validate"):
+                errors = scheduler.run(g, checkers)
+            instrument.flush()
+        if sink is None:
+            return errors
+        for label, sheet_errors in errors.items():
+            for row, row_errors in sheet_errors.items():
+                sink.add(row, row_errors, label)
+        return sink
+    budget = _get_budget(max_errors, stop_on_first_error)
     errors = {}
     for sheet_index, sheet_generator in g:
         checker = checkers[sheet_index]
-        errors[f"{sheet_index + 1}:{checker.name}"] = checker.validate(
-            sheet_generator,
-            include_success=include_success,
-            fail_if_alien=fail_if_alien,
-        )
-    return errors
+        label = f"{sheet_index + 1}:{checker.name}"
+        if instrument is None:
+            rows, measure = sheet_generator, nullcontext()
+        else:
+            rows, measure = _count(instrument, sheet_generator, label), instrument.measure("validate", label)
+        with measure:
+            errors[label] = _validate(
+                rows,
+                checker,
+                include_success=include_success,
+                fail_if_alien=fail_if_alien,
+                memo=memo,
+                key_index=key_index,
+                sink=None if sink is None else _SheetSink(sink, label),
+                budget=budget,
+                references=None if references is None else references.get(sheet_index),
+                columnar=columnar,
+            )
+        if budget is not None and budget.exhausted:
+            _close(g)
+            break
+    if instrument is not None:
+        instrument.flush()
+    return errors if sink is None else sink
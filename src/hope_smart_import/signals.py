@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from hope_flex_fields.models import DataChecker, DataCheckerFieldset, FieldDefinition, Fieldset, FlexField
+
+from .compiled import invalidate
+from .models import Configuration
+
+INVALIDATING_MODELS = (Configuration, DataChecker, DataCheckerFieldset, Fieldset, FlexField, FieldDefinition)
+
+
+def connect() -> None:
+    for model in INVALIDATING_MODELS:
+        post_save.connect(invalidate, sender=model, dispatch_uid=f"hsi-compiled-save-{model._meta.label}")
+        post_delete.connect(invalidate, sender=model, dispatch_uid=f"hsi-compiled-delete-{model._meta.label}")
@@ -0,0 +1,140 @@
+import abc
+import json
+from pathlib import Path
+from typing import IO, Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+DEFAULT_SAMPLES = 5
+
+
+def _messages(messages: Any) -> list[str]:
+    # form ErrorLists are lists of messages, parent/child fields errors are plain strings
+    return list(messages) if isinstance(messages, list) else [messages]
+
+
+class ErrorSink(abc.ABC):
+    """Receives the errors of the invalid rows as they are found.
+
+    At most `max_errors` entries are kept: the others are only counted and `truncated` is set.
+    Subclasses implement `store()` and `result()`.
+    """
+
+    def __init__(self, *, max_errors: int | None = None) -> None:
+        self.max_errors = max_errors
+        self.total = 0
+        self.stored = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > self.stored
+
+    def _full(self) -> bool:
+        return self.max_errors is not None and self.stored >= self.max_errors
+
+    def add(self, row: int, errors: dict[str, Any], sheet: str | None = None) -> None:
+        self.total += 1
+        if not self._full() and self.store(row, errors, sheet):
+            self.stored += 1
+
+    @abc.abstractmethod
+    def store(self, row: int, errors: dict[str, Any], sheet: str | None) -> bool:
+        """Keep the errors of `row`, returning False if they have been discarded."""
+
+    @abc.abstractmethod
+    def result(self) -> Any:
+        """Return what has been collected."""
+
+    def close(self) -> None:  # noqa: B027 optional hook
+        pass
+
+
+class DictSink(ErrorSink):
+    """The errors as returned by the shortcuts: `{row: errors}`, or `{sheet: {row: errors}}` for many sheets."""
+
+    def __init__(self, *, max_errors: int | None = None) -> None:
+        super().__init__(max_errors=max_errors)
+        self.errors: dict[str | None, dict[int, Any]] = {}
+
+    def store(self, row: int, errors: dict[str, Any], sheet: str | None) -> bool:
+        self.errors.setdefault(sheet, {})[row] = errors
+        return True
+
+    def result(self) -> dict[Any, Any]:
+        if list(self.errors) == [None]:
+            return self.errors[None]
+        return self.errors
+
+
+class JsonLinesSink(ErrorSink):
+    """Write one `{"sheet": ..., "row": ..., "errors": {...}}` json object per line."""
+
+    def __init__(self, file: str | Path | IO[str], *, max_errors: int | None = None) -> None:
+        super().__init__(max_errors=max_errors)
+        self._owned = isinstance(file, str | Path)
+        self.file = open(file, "w", encoding="utf-8") if self._owned else file  # noqa: SIM115
+
+    def __enter__(self) -> "JsonLinesSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def store(self, row: int, errors: dict[str, Any], sheet: str | None) -> bool:
+        errors = {name: _messages(messages) for name, messages in errors.items()}
+        self.file.write(json.dumps({"sheet": sheet, "row": row, "errors": errors}, cls=DjangoJSONEncoder))
+        self.file.write("\n")
+        return True
+
+    def result(self) -> dict[str, Any]:
+        return {"rows": self.total, "written": self.stored, "truncated": self.truncated}
+
+    def close(self) -> None:
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class AggregateSink(ErrorSink):
+    """Group the errors by sheet, column and message keeping the count and a few sample rows.
+
+    `max_errors` limits the number of groups, messages that would start a new group over the limit
+    are only counted in `overflow`.
+    """
+
+    def __init__(self, *, samples: int = DEFAULT_SAMPLES, max_errors: int | None = None) -> None:
+        super().__init__(max_errors=max_errors)
+        self.samples = samples
+        self.groups: dict[tuple[str | None, str, str], list[Any]] = {}
+        self.overflow = 0
+
+    def add(self, row: int, errors: dict[str, Any], sheet: str | None = None) -> None:
+        # `max_errors` is checked for each new group, not for each row
+        self.total += 1
+        self.store(row, errors, sheet)
+
+    def store(self, row: int, errors: dict[str, Any], sheet: str | None) -> bool:
+        for column, messages in errors.items():
+            for message in _messages(messages):
+                key = (sheet, column, message)
+                if (group := self.groups.get(key)) is None:
+                    if self._full():
+                        self.overflow += 1
+                        continue
+                    group = self.groups[key] = [0, []]
+                    self.stored += 1
+                group[0] += 1
+                if len(group[1]) < self.samples:
+                    group[1].append(row)
+        return True
+
+    @property
+    def truncated(self) -> bool:
+        return self.overflow > 0
+
+    def result(self) -> list[dict[str, Any]]:
+        return [
+            {"sheet": sheet, "column": column, "message": message, "count": count, "rows": rows}
+            for (sheet, column, message), (count, rows) in sorted(self.groups.items(), key=lambda g: -g[1][0])
+        ]
@@ -0,0 +1,106 @@
+import codecs
+import hashlib
+import io
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+from functools import partial
+from typing import IO, TYPE_CHECKING, Any
+
+from .cache import file_digest
+
+if TYPE_CHECKING:
+    from .types import Source
+
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+
+
+class ChunkStream(io.RawIOBase):
+    """Read-only binary stream over an iterable of bytes chunks (ie. `UploadedFile.chunks()`)."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            if (chunk := next(self._chunks, None)) is None:
+                return 0
+            self._pending = bytes(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def get_path(source: "Source") -> str | None:
+    """Return the filesystem path of `source`, if it has one (paths and Django temporary uploads)."""
+    if isinstance(source, str | os.PathLike):
+        return os.fspath(source)
+    if callable(getattr(source, "temporary_file_path", None)):
+        return source.temporary_file_path()
+    return None
+
+
+def _seekable(source: Any) -> bool:
+    try:
+        return bool(source.seekable())
+    except (AttributeError, ValueError, OSError):
+        return False
+
+
+def iter_chunks(source: "Source") -> Iterator[bytes]:
+    if hasattr(source, "read"):
+        return iter(partial(source.read, CHUNK_SIZE), b"")
+    return iter(source)
+
+
+def open_binary(source: "Source") -> str | IO[bytes]:
+    """Return a path or a seekable binary file for `source`, as required by zip based formats.
+
+    Paths and seekable files (ie. in-memory uploads) are used as they are; streams and chunk iterators
+    are copied to a spooled temporary file, kept in memory up to `SPOOL_MAX_SIZE` bytes.
+    """
+    if (path := get_path(source)) is not None:
+        return path
+    if _seekable(source):
+        source.seek(0)
+        return source
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)  # noqa: SIM115
+    for chunk in iter_chunks(source):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def open_text(source: "Source", encoding: str = "utf-8") -> IO[str]:
+    """Return a text stream decoding `source` incrementally, as the chunks arrive. A UTF-8 BOM is skipped."""
+    if codecs.lookup(encoding).name == "utf-8":
+        encoding = "utf-8-sig"
+    return io.TextIOWrapper(io.BufferedReader(ChunkStream(iter_chunks(source)), CHUNK_SIZE), encoding, newline="")
+
+
+def digest(source: str | IO[bytes]) -> str:
+    """Return the sha256 of the content of a path or of a seekable binary file (its position is restored)."""
+    if isinstance(source, str):
+        return file_digest(source)
+    position = source.tell()
+    source.seek(0)
+    h = hashlib.sha256()
+    for chunk in iter(partial(source.read, CHUNK_SIZE), b""):
+        h.update(chunk)
+    source.seek(position)
+    return h.hexdigest()
+
+
+def size(source: str | IO[bytes]) -> int:
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    position = source.tell()
+    end = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return end
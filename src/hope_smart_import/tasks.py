@@ -0,0 +1,15 @@
+from typing import Any
+
+from celery import shared_task
+
+from .models import ImportJob
+
+
+@shared_task(bind=True)
+def import_job(self: Any, pk: int) -> dict:
+    job = ImportJob.objects.get(pk=pk)
+
+    def on_progress(progress: dict[str, Any]) -> None:
+        self.update_state(state="PROGRESS", meta=progress)
+
+    return job.run(on_progress=on_progress)
@@ -1,7 +1,13 @@
-from collections.abc import Callable, Iterable
-from typing import Any
+import os
+from collections.abc import Callable, Iterable, Mapping
+from typing import IO, Any
 
-RowResult = dict[str, str]
+from .readers import RecordBatch
+
+RowResult = Mapping[str, Any]
 SheetResult = Iterable[RowResult]
 MultiSheetResult = Iterable[tuple[int, SheetResult]]
-ValueMapper = Callable[[Any], Any]
+ColumnMapper = Callable[[Any], Any]
+ValueMapper = ColumnMapper | Mapping[str, ColumnMapper]
+BatchResult = Iterable[RecordBatch]
+Source = str | os.PathLike[str] | IO[bytes] | Iterable[bytes]
@@ -0,0 +1,254 @@
+import hashlib
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from hope_flex_fields.fields import IdentityField
+from hope_flex_fields.models import DataChecker, Fieldset
+
+from .columnar import ColumnarCleaner
+from .keyindex import add_many, contains_many
+
+if TYPE_CHECKING:
+    from hope_flex_fields.forms import FlexForm
+    from hope_flex_fields.models.base import ValidatorMixin
+
+    from .keyindex import KeyIndexFactory
+    from .memo import ValidationMemo
+    from .reference import ReferenceValidator
+    from .types import BatchResult, RowResult
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class RowOutcome(NamedTuple):
+    """The part of a row validation that does not depend on the other rows."""
+
+    # form errors followed by the errors added by parent/child fields
+    errors: dict[str, list[str] | str]
+    # number of leading `errors` entries produced by the form
+    form_errors: int
+    alien: str | None
+    cleaned_data: dict[str, Any]
+
+
+def _fieldset_parts(fs: Fieldset) -> list[tuple[Any, ...]]:
+    parts = []
+    while fs is not None:
+        parts.append(("fieldset", fs.pk, fs.last_modified))
+        fs = fs.extends
+    return parts
+
+
+def checker_fingerprint(checker: "ValidatorMixin") -> str:
+    """Return a digest that changes whenever the checker, its fieldsets or its fields are edited."""
+    parts: list[tuple[Any, ...]] = [(checker._meta.label, checker.pk, checker.last_modified)]
+    if isinstance(checker, DataChecker):
+        for member in checker.members.select_related("fieldset").order_by("pk"):
+            parts.append(("member", member.pk, member.last_modified, member.prefix, member.order))
+            parts.extend(_fieldset_parts(member.fieldset))
+        fields = [field for __, field in checker.get_fields()]
+    else:
+        parts.extend(_fieldset_parts(checker))
+        fields = list(checker.get_fields())
+    for field in fields:
+        parts.append(("field", field.pk, field.last_modified, field.master_id))
+        parts.append(("definition", field.definition_id, field.definition.last_modified))
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def row_digest(row: "RowResult") -> str:
+    items = sorted(row.items(), key=lambda item: str(item[0]))
+    return hashlib.blake2b(repr(items).encode(), digest_size=16).hexdigest()
+
+
+def _merge(errors: dict[str, Any] | None, more: dict[str, list[str]]) -> dict[str, Any]:
+    if errors is None:
+        return more
+    for name, messages in more.items():
+        if isinstance(current := errors.get(name, []), str):
+            current = [current]
+        errors[name] = [*current, *messages]
+    return errors
+
+
+class SheetValidator:
+    """Row by row validation equivalent to `ValidatorMixin.validate()`.
+
+    The form cleaning of each row is isolated in `clean_row()` so that its outcome can be reused
+    (see `ValidationMemo`); duplicates, foreign keys and collected values are always evaluated.
+    With `key_index` the primary keys are stored in a `KeyIndex` and checked in batches of `batch_size` rows,
+    `references` (see `ReferenceValidator`) are applied to batches of rows as well.
+    With `columnar` the forms of each batch are cleaned column by column (see `ColumnarCleaner`).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        checker: "ValidatorMixin",
+        *,
+        include_success: bool = False,
+        fail_if_alien: bool = False,
+        memo: "ValidationMemo | None" = None,
+        key_index: "KeyIndexFactory | None" = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        references: "Sequence[ReferenceValidator]" = (),
+        columnar: bool = False,
+    ) -> None:
+        if columnar and memo is not None:
+            raise ValueError("`memo` cannot be used with `columnar`")
+        self.checker = checker
+        self.include_success = include_success
+        self.fail_if_alien = fail_if_alien
+        self.memo = memo
+        self.key_index = key_index
+        self.batch_size = batch_size
+        self.references = references
+        self.form_class: type[FlexForm] = checker.get_form_class()
+        self.known_fields = set(self.form_class.declared_fields.keys())
+        self.fingerprint = f"{checker_fingerprint(checker)}:{int(fail_if_alien)}" if memo is not None else ""
+        self.columnar = ColumnarCleaner(checker, self.form_class, fail_if_alien=fail_if_alien) if columnar else None
+
+    def clean_row(self, row: "RowResult") -> RowOutcome:
+        checker = self.checker
+        checker.form = form = self.form_class(data=row, initial=row)
+        alien = None
+        if self.fail_if_alien and (diff := set(row.keys()).difference(self.known_fields)):
+            alien = f"Alien values found {diff}"
+        errors = {} if form.is_valid() else {name: list(messages) for name, messages in form.errors.items()}
+        form_errors = len(errors)
+        checker.validate_parent_child(errors, row)
+        return RowOutcome(errors, form_errors, alien, form.cleaned_data)
+
+    def get_outcome(self, row: "RowResult") -> RowOutcome:
+        if self.memo is None:
+            return self.clean_row(row)
+        key = f"{self.fingerprint}:{row_digest(row)}"
+        if (outcome := self.memo.get(key)) is None:
+            outcome = self.clean_row(row)
+            self.memo.set(key, outcome)
+        return outcome
+
+    def get_outcomes(self, rows: list["RowResult"]) -> list[RowOutcome]:
+        if self.columnar is not None:
+            return self.columnar.clean_batch(rows)
+        return [self.get_outcome(row) for row in rows]
+
+    def setup(self) -> None:
+        """Reset the primary keys of the checker: called once before validating the first row of a sheet."""
+        checker = self.checker
+        checker.primary_keys = set() if self.key_index is None else self.key_index()
+        if not checker._primary_key_field_name:
+            for field_name, field_instance in self.form_class.declared_fields.items():
+                if isinstance(field_instance, IdentityField):
+                    checker.set_primary_key_col(field_name)
+                    break
+        for reference in self.references:
+            reference.setup()
+
+    def merge_errors(self, outcome: RowOutcome, row_errors: list[str]) -> dict[str, Any] | None:
+        """Return the errors of a row: the ones of its `outcome` plus the row level `row_errors` (under "-")."""
+        if not (outcome.errors or row_errors):
+            return None
+        # copy the outcome (it can be shared by other rows) keeping the order `validate()` uses
+        items = [(name, list(msg) if isinstance(msg, list) else msg) for name, msg in outcome.errors.items()]
+        errors = dict(items[: outcome.form_errors])
+        if row_errors:
+            errors["-"] = row_errors
+        errors.update(items[outcome.form_errors :])
+        return errors
+
+    def validate_row(self, row: "RowResult") -> dict[str, Any] | None:
+        checker = self.checker
+        outcome = self.get_outcome(row)
+        cleaned_data = outcome.cleaned_data
+        row_errors = [outcome.alien] if outcome.alien else []
+        if pk_col := checker._primary_key_field_name:
+            pk = cleaned_data[pk_col]
+            if pk in checker.primary_keys:
+                row_errors.append(f"{pk} duplicated")
+            else:
+                checker.primary_keys.add(pk)
+        if (master := checker._master_fieldset) and (fk := cleaned_data[checker._master_fieldset_col]) not in (
+            master.primary_keys
+        ):
+            row_errors.append(f"'{fk}' not found in master")
+        for field_name, values in checker._collected_values.items():
+            values.append(cleaned_data[field_name])
+        return self.merge_errors(outcome, row_errors)
+
+    def validate_batch(self, rows: list["RowResult"]) -> list[dict[str, Any] | None]:
+        """Validate `rows` checking their primary and foreign keys with one index operation each."""
+        checker = self.checker
+        outcomes = self.get_outcomes(rows)
+        pks = duplicated = fks = found = None
+        if pk_col := checker._primary_key_field_name:
+            pks = [outcome.cleaned_data[pk_col] for outcome in outcomes]
+            duplicated = add_many(checker.primary_keys, pks)
+        if master := checker._master_fieldset:
+            fks = [outcome.cleaned_data[checker._master_fieldset_col] for outcome in outcomes]
+            found = contains_many(master.primary_keys, fks)
+        for field_name, values in checker._collected_values.items():
+            values.extend(outcome.cleaned_data[field_name] for outcome in outcomes)
+
+        results = []
+        for i, outcome in enumerate(outcomes):
+            row_errors = [outcome.alien] if outcome.alien else []
+            if duplicated and duplicated[i]:
+                row_errors.append(f"{pks[i]} duplicated")
+            if found and not found[i]:
+                row_errors.append(f"'{fks[i]}' not found in master")
+            results.append(self.merge_errors(outcome, row_errors))
+        return results
+
+    def validate_rows(self, rows: list["RowResult"]) -> list[dict[str, Any] | None]:
+        """Validate consecutive rows of the sheet, in one batch with `key_index` or `columnar`."""
+        if self.key_index is None and self.columnar is None:
+            results = [self.validate_row(row) for row in rows]
+        else:
+            results = self.validate_batch(rows)
+        return self._check_references(rows, results)
+
+    def _check_references(
+        self, rows: list["RowResult"], results: list[dict[str, Any] | None]
+    ) -> list[dict[str, Any] | None]:
+        for reference in self.references:
+            for i, reference_errors in enumerate(reference.validate_batch(rows)):
+                if reference_errors:
+                    results[i] = _merge(results[i], reference_errors)
+        return results
+
+    def iter_results(self, data: Iterable["RowResult"]) -> Iterator[tuple[int, Any]]:
+        """Yield the `(row, errors)` pairs of `validate()` as soon as each row is checked."""
+        if not isinstance(data, list | tuple | Generator):
+            data = [data]
+        self.setup()
+        if self.key_index is None and self.columnar is None and not self.references:
+            results = map(self.validate_row, data)
+        else:
+            it = iter(data)
+            batches = iter(lambda: list(islice(it, self.batch_size)), [])
+            results = chain.from_iterable(map(self.validate_rows, batches))
+        yield from self._number(results)
+
+    def iter_batch_results(self, batches: "BatchResult") -> Iterator[tuple[int, Any]]:
+        """Yield the `(row, errors)` pairs of the rows of `RecordBatch`es, validating each batch at once.
+
+        Rows are compact views of the batch columns, no dict is built.
+        """
+        self.setup()
+        offset = 0
+        for batch in batches:
+            rows = list(batch.rows(compact=True))
+            yield from self._number(self._check_references(rows, self.validate_batch(rows)), offset)
+            offset += len(rows)
+
+    def _number(self, results: Iterable[dict[str, Any] | None], offset: int = 0) -> Iterator[tuple[int, Any]]:
+        for i, errors in enumerate(results, offset + 1):
+            if errors:
+                yield i, errors
+            elif self.include_success:
+                yield i, "Ok"
+
+    def validate(self, data: Iterable["RowResult"]) -> dict[int, Any]:
+        return dict(self.iter_results(data))
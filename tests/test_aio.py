@@ -0,0 +1,111 @@
+# mypy: disable-error-code="no-untyped-def"
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.aio import aopen_csv, aopen_xls, aopen_xls_multi, avalidate_single, avalidate_xls_multi
+from hope_smart_import.keyindex import CompactKeyIndex, SqliteKeyIndex
+from hope_smart_import.readers import open_csv, open_xls, open_xls_multi
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="age", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.IntegerField))
+    fs.set_primary_key_col("id")
+    return fs
+
+
+@pytest.fixture
+def people_csv(tmp_path: Path) -> str:
+    path = tmp_path / "people.csv"
+    path.write_text("id,age\n" + "".join(f"{i % 900},{'x' if i % 10 == 0 else i}\n" for i in range(1, 1001)))
+    return str(path)
+
+
+async def _collect(it: Any) -> list[Any]:
+    return [item async for item in it]
+
+
+def test_aopen(people_csv: str):
+    rows = async_to_sync(_collect)(aopen_csv(people_csv, has_header=True, block_size=100))
+    assert rows == list(open_csv(people_csv, has_header=True))
+
+    filepath = str(DATA / "rdi1.xlsx")
+    rows = async_to_sync(_collect)(aopen_xls(filepath, index_or_name=1))
+    assert rows == list(open_xls(filepath, index_or_name=1))
+
+
+def test_avalidate_single(validator: Fieldset, people_csv: str):
+    expected = validate_single(open_csv(people_csv, has_header=True), validator)
+    results = async_to_sync(_collect)(avalidate_single(aopen_csv(people_csv, has_header=True), validator))
+    assert dict(results) == expected
+    # plain iterables are read in the executor
+    results = async_to_sync(_collect)(avalidate_single(open_csv(people_csv, has_header=True), validator))
+    assert dict(results) == expected
+
+
+def test_avalidate_max_errors(validator: Fieldset, people_csv: str):
+    rows = aopen_csv(people_csv, has_header=True, block_size=50)
+    results = async_to_sync(_collect)(avalidate_single(rows, validator, max_errors=2, block_size=50))
+    assert [row for row, __ in results] == [10, 20]
+    assert rows.ag_frame is None
+
+
+def test_avalidate_concurrent(validator: Fieldset, people_csv: str):
+    expected = validate_single(open_csv(people_csv, has_header=True), validator)
+    # one checker instance per upload: the validation state is stored in the checker
+    checkers = [Fieldset.objects.get(pk=validator.pk) for __ in range(3)]
+    for checker in checkers:
+        checker.set_primary_key_col("id")
+    executor = ThreadPoolExecutor(1)
+
+    async def run() -> list[Any]:
+        uploads = [
+            _collect(
+                avalidate_single(aopen_csv(people_csv, has_header=True, executor=executor), checker, executor=executor)
+            )
+            for checker in checkers
+        ]
+        return await asyncio.gather(*uploads)
+
+    assert [dict(results) for results in async_to_sync(run)()] == [expected] * 3
+
+
+def test_avalidate_xls_multi(validator: Fieldset):
+    hh = FieldsetFactory(name="household")
+    FlexFieldFactory(name="household_id", fieldset=hh)
+    ind = FieldsetFactory(name="individual")
+    FlexFieldFactory(name="household_id", fieldset=ind)
+    hh.set_primary_key_col("household_id")
+    ind.set_master(hh, "household_id")
+    filepath = str(DATA / "missing_master.xlsx")
+
+    expected = validate_xls_multi(open_xls_multi(filepath, [0, 1]), [hh, ind])
+    results = async_to_sync(_collect)(avalidate_xls_multi(aopen_xls_multi(filepath, [0, 1]), [hh, ind]))
+    assert results == [
+        (label, row, errors) for label, sheet_errors in expected.items() for row, errors in sheet_errors.items()
+    ]
+    assert results == [("2:individual", 2, {"-": ["'missing' not found in master"]})]
+
+
+@pytest.mark.parametrize("factory", [CompactKeyIndex, SqliteKeyIndex])
+def test_avalidate_key_index_threads(validator: Fieldset, people_csv: str, factory: Any):
+    expected = validate_single(open_csv(people_csv, has_header=True), validator)
+    # setup and blocks run in different threads of the pool
+    with ThreadPoolExecutor(4) as executor:
+        rows = aopen_csv(people_csv, has_header=True, block_size=50, executor=executor)
+        results = avalidate_single(rows, validator, key_index=factory, block_size=50, executor=executor)
+        assert dict(async_to_sync(_collect)(results)) == expected
+    assert any(message.endswith("duplicated") for errors in expected.values() for message in errors.get("-", []))
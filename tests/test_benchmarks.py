@@ -0,0 +1,35 @@
+# mypy: disable-error-code="no-untyped-def"
+from pathlib import Path
+
+from benchmarks.generator import HOUSEHOLD_COLUMNS, INDIVIDUAL_COLUMNS, generate, get_dataset
+from benchmarks.runner import compare
+
+from hope_smart_import.readers import open_csv, open_xls_multi
+
+
+def test_generate():
+    rows = list(generate(20))
+    assert rows == list(generate(20))
+    assert rows != list(generate(20, seed=1))
+    households = [row for kind, row in rows if kind == "household"]
+    individuals = [row for kind, row in rows if kind == "individual"]
+    assert [row[0] for row in households] == list(range(1, 21))
+    assert len(individuals) == sum(row[6] for row in households)
+    assert all(len(row) == len(INDIVIDUAL_COLUMNS) for row in individuals)
+
+
+def test_get_dataset(tmp_path: Path):
+    dataset = get_dataset(tmp_path, 10)
+    (__, households), (__, individuals) = [(i, list(rows)) for i, rows in open_xls_multi(str(dataset["xlsx"]), [0, 1])]
+    assert len(households) == 10
+    assert list(households[0]) == list(HOUSEHOLD_COLUMNS)
+    assert len(list(open_csv(str(dataset["individuals_csv"]), has_header=True))) == len(individuals)
+
+
+def test_compare():
+    base = {"results": [{"households": 10, "case": "open_csv", "rows_per_second": 100.0, "peak_rss_kb": 10}]}
+    faster = {"results": [{"households": 10, "case": "open_csv", "rows_per_second": 120.0, "peak_rss_kb": 10}]}
+    slower = {"results": [{"households": 10, "case": "open_csv", "rows_per_second": 80.0, "peak_rss_kb": 10}]}
+    assert compare(base, faster) == []
+    assert compare(base, slower) == ["10:open_csv"]
+    assert compare(base, slower, threshold=0.3) == []
@@ -0,0 +1,76 @@
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from hope_smart_import import readers
+from hope_smart_import.cache import file_digest, ParseCache
+from hope_smart_import.readers import open_xls, open_xls_batches, open_xls_multi, rows_from_batches, SheetNotError
+
+
+@pytest.fixture
+def xls(tmp_path: Path) -> str:
+    target = tmp_path / "r1.xlsx"
+    shutil.copy(Path(__file__).parent / "data" / "r1.xlsx", target)
+    return str(target)
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ParseCache:
+    return ParseCache(tmp_path / "cache")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"start_at_row": 1}, {"has_header": False}, {"index_or_name": "Sheet1", "value_mapper": str.upper}],
+)
+def test_cache_hit(xls: str, cache: ParseCache, monkeypatch: pytest.MonkeyPatch, kwargs: dict[str, Any]) -> None:
+    expected = list(open_xls(xls, **kwargs))
+    assert list(open_xls(xls, cache=cache, **kwargs)) == expected
+    monkeypatch.setattr(readers, "_load_workbook", None)
+    assert list(open_xls(xls, cache=cache, **kwargs)) == expected
+
+
+def test_cache_options_share_entry(xls: str, cache: ParseCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    list(open_xls(xls, cache=cache))
+    monkeypatch.setattr(readers, "_load_workbook", None)
+    assert list(open_xls(xls, cache=cache, start_at_row=1, has_header=False)) == [
+        {"column1": "John", "column2": "Doe", "column3": "M"},
+        {"column1": "Jane", "column2": "Doe", "column3": "F"},
+    ]
+
+
+def test_cache_multi(xls: str, cache: ParseCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = [(i, list(sheet)) for i, sheet in open_xls_multi(xls, [0, "Sheet1"])]
+    assert [(i, list(sheet)) for i, sheet in open_xls_multi(xls, [0, "Sheet1"], cache=cache)] == expected
+    monkeypatch.setattr(readers, "_load_workbook", None)
+    assert [(i, list(sheet)) for i, sheet in open_xls_multi(xls, [0, "Sheet1"], cache=cache)] == expected
+    assert list(rows_from_batches(open_xls_batches(xls, index_or_name=1, cache=cache))) == expected[1][1]
+    with pytest.raises(SheetNotError):
+        list(open_xls(xls, index_or_name="foo", cache=cache))
+
+
+def test_cache_partial_read_not_stored(xls: str, cache: ParseCache) -> None:
+    g = open_xls(xls, cache=cache)
+    next(g)
+    g.close()
+    assert cache.read(file_digest(xls), "f1") is None
+    assert not list(cache.directory.glob("*.tmp"))
+
+
+def test_cache_content_change(xls: str, cache: ParseCache) -> None:
+    list(open_xls(xls, cache=cache))
+    shutil.copy(Path(__file__).parent / "data" / "simple2.xlsx", xls)
+    assert list(open_xls(xls, cache=cache)) == list(open_xls(xls))
+
+
+def test_cache_eviction(xls: str, tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "small", max_size=1)
+    list(open_xls(xls, cache=cache))
+    assert cache.size() <= 1
+    cache = ParseCache(tmp_path / "large")
+    list(open_xls(xls, cache=cache))
+    assert cache.size() > 0
+    cache.clear()
+    assert cache.size() == 0
@@ -0,0 +1,93 @@
+# mypy: disable-error-code="no-untyped-def"
+from typing import Any
+
+import pytest
+from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.columnar import ColumnarCleaner, ColumnCleaner
+from hope_smart_import.memo import ValidationMemo
+from hope_smart_import.validation import SheetValidator
+
+ROWS = [
+    {"id": "1", "age": "10", "born": "2000-01-01", "active": "true", "gender": "M"},
+    {"id": "2", "age": "x", "born": "2000-13-01", "active": "", "gender": "X"},
+    {"id": "1", "age": 10, "born": None, "active": "false", "gender": "F"},
+    {"id": "3", "age": "10", "born": "2000-01-01", "active": "true", "gender": "M", "other": 1},
+]
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="age", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.IntegerField))
+    FlexFieldFactory(name="born", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.DateField))
+    FlexFieldFactory(name="active", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.BooleanField))
+    FlexFieldFactory(
+        name="gender",
+        fieldset=fs,
+        definition=FieldDefinitionFactory(field_type=forms.ChoiceField),
+        attrs={"choices": [["M", "M"], ["F", "F"]]},
+    )
+    fs.set_primary_key_col("id")
+    return fs
+
+
+def test_columns(validator: Fieldset):
+    cleaner = ColumnarCleaner(validator, validator.get_form_class())
+    assert sorted(cleaner.columns) == ["age", "born", "gender", "id"]
+    # checkbox values are not read as they are
+    assert list(cleaner.fallback_class.base_fields) == ["active"]
+
+
+def test_validate(validator: Fieldset):
+    expected = validator.validate(ROWS, fail_if_alien=True)
+    assert SheetValidator(validator, fail_if_alien=True, columnar=True, batch_size=3).validate(ROWS) == expected
+    assert list(expected) == [2, 3, 4]
+
+
+def test_validate_rules(validator: Fieldset):
+    validator.validation = "if (data.age > 5) { return {age: 'too old'} }"
+    validator.save()
+    cleaner = ColumnarCleaner(validator, validator.get_form_class())
+    assert cleaner.columns == {}
+
+    expected = validator.validate(ROWS)
+    assert SheetValidator(validator, columnar=True).validate(ROWS) == expected
+    assert expected[1] == {"age": ["too old"]}
+
+
+def test_column_cleaner():
+    calls = []
+
+    class Field(forms.IntegerField):
+        def clean(self, value: Any) -> Any:
+            calls.append(value)
+            return super().clean(value)
+
+    column = ColumnCleaner("age", Field(), max_distinct=2)
+    assert column.clean(["1", "x", "1", "x", "3", "3", ["a"]]) == [
+        (1, None),
+        (None, ["Enter a whole number."]),
+        (1, None),
+        (None, ["Enter a whole number."]),
+        (3, None),
+        (3, None),
+        (None, ["Enter a whole number."]),
+    ]
+    assert calls == ["1", "x", "3", "3", ["a"]]
+
+
+def test_column_cleaner_mixed_types():
+    # 1 == 1.0 == True, but a CharField cleans them to different strings
+    values = [1, True, 1.0, 0, False, 1, False]
+    column = ColumnCleaner("name", forms.CharField())
+    assert [cleaned for cleaned, __ in column.clean(values)] == ["1", "True", "1.0", "0", "False", "1", "False"]
+    assert [cleaned for cleaned, __ in column.clean(values)] == [forms.CharField().clean(v) for v in values]
+
+
+def test_memo(validator: Fieldset):
+    with pytest.raises(ValueError, match="memo"):
+        SheetValidator(validator, columnar=True, memo=ValidationMemo())
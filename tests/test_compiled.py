@@ -0,0 +1,95 @@
+# mypy: disable-error-code="no-untyped-def"
+from typing import Any
+
+import pytest
+from demo.factories import ConfigurationFactory, DataCheckerFactory, FieldsetFactory, FlexFieldFactory
+from django.core.cache import cache
+from hope_flex_fields.models import DataCheckerFieldset
+
+from hope_smart_import import checks, compiled
+from hope_smart_import.models import Configuration
+from hope_smart_import.shortcuts import validate_single
+
+ROWS = [{"hh_id": "1", "hh_name": "a"}, {"hh_id": "1", "hh_name": "b"}, {"hh_id": "2", "hh_nam": "c"}]
+
+
+@pytest.fixture
+def configuration(db: Any) -> Configuration:
+    compiled.invalidate()
+    fs = FieldsetFactory(name="household")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="name", fieldset=fs)
+    dc = DataCheckerFactory(name="households")
+    DataCheckerFieldset.objects.create(checker=dc, fieldset=fs, prefix="hh_")
+    return ConfigurationFactory(checker=dc)
+
+
+def test_compiled_checker(configuration: Configuration, django_assert_num_queries: Any):
+    expected = configuration.checker.validate(ROWS, fail_if_alien=True)
+    assert expected
+
+    configuration = Configuration.objects.get(pk=configuration.pk)
+    configuration.get_compiled_checker()
+    for __ in range(3):
+        with django_assert_num_queries(0):
+            checker = configuration.get_compiled_checker()
+            checker.set_primary_key_col("hh_id")
+            assert validate_single(ROWS, checker, fail_if_alien=True) == {
+                **expected,
+                2: {"-": ["1 duplicated"]},
+            }
+
+
+def test_compiled_checker_state(configuration: Configuration):
+    c1 = configuration.get_compiled_checker()
+    c2 = configuration.get_compiled_checker()
+    assert c1 is not c2
+    # the compiled form class is shared, each checker gets its own binding
+    assert c1.get_form_class().__bases__ == c2.get_form_class().__bases__
+    assert (c1.get_form_class().validator, c1.get_form_class().datachecker) == (c1, c1)
+    assert c1.get_form_class()().validator is c1
+    assert c2.get_form_class().validator is c2
+    c1.set_primary_key_col("hh_id")
+    c1.validate(ROWS)
+    assert c1.primary_keys == {"1", "2"}
+    assert c2.primary_keys == set()
+    assert c2._primary_key_field_name is None
+
+
+@pytest.mark.parametrize("action", ["field", "fieldset", "checker", "member", "delete"])
+def test_compiled_checker_invalidation(configuration: Configuration, action: str):
+    form_class = configuration.get_compiled_checker().get_form_class()
+    member = configuration.checker.members.get()
+    if action == "field":
+        FlexFieldFactory(name="age", fieldset=member.fieldset)
+    elif action == "fieldset":
+        member.fieldset.save()
+    elif action == "checker":
+        configuration.checker.save()
+    elif action == "member":
+        member.prefix = "h_"
+        member.save()
+    else:
+        member.fieldset.fields.get(name="name").delete()
+    new_form_class = configuration.get_compiled_checker().get_form_class()
+    assert new_form_class is not form_class
+    if action == "field":
+        assert "hh_age" in new_form_class.declared_fields
+    elif action == "member":
+        assert "h_id" in new_form_class.declared_fields
+    elif action == "delete":
+        assert "hh_name" not in new_form_class.declared_fields
+
+
+def test_compiled_checker_generation(configuration: Configuration):
+    form_class = configuration.get_compiled_checker().get_form_class()
+    # another process invalidated the configurations
+    cache.incr(compiled.GENERATION_KEY)
+    assert configuration.get_compiled_checker().get_form_class() is not form_class
+
+
+def test_check_shared_cache(settings: Any):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    assert [w.id for w in checks.check_shared_cache()] == ["hope_smart_import.W001"]
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+    assert checks.check_shared_cache() == []
@@ -0,0 +1,130 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from hope_smart_import.csvfile import CsvFile, read_range
+
+
+@pytest.fixture
+def locations() -> str:
+    return str((Path(__file__).parent / "data" / "locations.csv").absolute())
+
+
+@pytest.fixture
+def quoted(tmp_path: Path) -> str:
+    target = tmp_path / "quoted.csv"
+    target.write_text('name,note\n"Doe, John","line1\nline2"\n\n"say ""hi""",x\nlast,row', newline="")
+    return str(target)
+
+
+def _expected(filepath: str) -> list[list[str]]:
+    with open(filepath, encoding="utf-8-sig", newline="") as f:
+        return [row for row in csv.reader(f) if row]
+
+
+def test_bom(locations: str) -> None:
+    with CsvFile(locations) as f:
+        assert f.row(0)[0] == "Country"
+        assert list(f.rows()) == _expected(locations)
+        assert len(f) == 571
+
+
+def test_quoted_values(quoted: str) -> None:
+    with CsvFile(quoted) as f:
+        assert list(f.rows(block_size=2)) == _expected(quoted)
+        assert f.row(1) == ["Doe, John", "line1\nline2"]
+        # blank lines are not rows
+        assert f.row(2) == ['say "hi"', "x"]
+        assert len(f) == 4
+
+
+@pytest.mark.parametrize(("start", "stop"), [(0, None), (3, None), (560, 565), (600, None)])
+def test_rows_slice(locations: str, start: int, stop: int | None) -> None:
+    with CsvFile(locations) as f:
+        assert list(f.rows(start, stop, block_size=7)) == _expected(locations)[start:stop]
+
+
+def test_random_access(locations: str) -> None:
+    expected = _expected(locations)
+    with CsvFile(locations) as f:
+        assert f.row(570) == expected[570]
+        assert f.row(10) == expected[10]
+        with pytest.raises(IndexError):
+            f.row(571)
+
+
+@pytest.mark.parametrize("parts", [1, 3, 1000])
+def test_ranges(locations: str, parts: int) -> None:
+    with CsvFile(locations) as f:
+        ranges = f.ranges(parts)
+    assert len(ranges) == min(parts, 571)
+    assert [row for start, end in ranges for row in read_range(locations, start, end)] == _expected(locations)
+
+
+def test_empty(tmp_path: Path) -> None:
+    (tmp_path / "empty.csv").write_text("")
+    with CsvFile(str(tmp_path / "empty.csv")) as f:
+        assert list(f.rows()) == []
+        assert len(f) == 0
+
+
+@pytest.mark.parametrize("window", [4, 1 << 20])
+def test_blank_lines(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, window: int) -> None:
+    monkeypatch.setattr("hope_smart_import.csvfile.SCAN_WINDOW", window)
+    (tmp_path / "blank.csv").write_bytes(b'\r\na,b\r\n\r\n1,2\n\n\n"3\n\n",4\n\n5,6\n\n')
+    with CsvFile(str(tmp_path / "blank.csv")) as f:
+        assert len(f) == 4
+        assert list(f.rows(1)) == [["1", "2"], ["3\n\n", "4"], ["5", "6"]]
+        assert f.row(3) == ["5", "6"]
+        assert [row for start, end in f.ranges(4) for row in read_range(f.filepath, start, end)] == list(f.rows())
+
+
+def test_quotechar(tmp_path: Path) -> None:
+    (tmp_path / "pipes.csv").write_text("a,b\n|x\ny|,1\n")
+    with CsvFile(str(tmp_path / "pipes.csv")) as f:
+        assert len(f) == 3
+    csv.register_dialect("pipes", quotechar="|")
+    try:
+        with CsvFile(str(tmp_path / "pipes.csv"), dialect="pipes") as f:
+            assert list(f.rows()) == [["a", "b"], ["x\ny", "1"]]
+    finally:
+        csv.unregister_dialect("pipes")
+
+
+@pytest.mark.parametrize("window", [4, 1 << 20])
+@pytest.mark.parametrize(
+    "content",
+    [
+        'a,b\n5" tv,1\nx,2\ny,3\nz,4\n',
+        'a,b\n"5"" tv,\n""x""",1\n"y"z",2\nw,"3"\n',
+        'a, "b\nc",d\n"x",y\n',
+    ],
+)
+def test_literal_quotes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, content: str, window: int) -> None:
+    # quote chars open a quoted value only at the start of a field
+    monkeypatch.setattr("hope_smart_import.csvfile.SCAN_WINDOW", window)
+    (tmp_path / "inches.csv").write_text(content, newline="")
+    expected = _expected(str(tmp_path / "inches.csv"))
+    with CsvFile(str(tmp_path / "inches.csv")) as f:
+        assert len(f) == len(expected)
+        assert list(f.rows(block_size=2)) == expected
+        assert [f.row(i) for i in range(len(f))] == expected
+
+
+@pytest.mark.parametrize("encoding", ["utf-16", "utf-32"])
+def test_unsupported_encoding(tmp_path: Path, encoding: str) -> None:
+    (tmp_path / "wide.csv").write_text("a,b\n1,2\n", encoding=encoding)
+    with pytest.raises(ValueError, match="ASCII compatible"):
+        CsvFile(str(tmp_path / "wide.csv"), encoding=encoding)
+
+
+def test_index_block(locations: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("hope_smart_import.csvfile.DEFAULT_BLOCK_SIZE", 100)
+    with CsvFile(locations) as f:
+        assert f.indexed == 0
+        assert f.index_block()
+        assert f.indexed == 99
+        while f.index_block():
+            pass
+        assert f.indexed == len(f) == 571
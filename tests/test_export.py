@@ -0,0 +1,96 @@
+# mypy: disable-error-code="no-untyped-def"
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+import pytest
+from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.export import ERROR_FILL, export_errors, read_errors
+from hope_smart_import.readers import open_xls, open_xls_multi
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+from hope_smart_import.sinks import JsonLinesSink
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="age", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.IntegerField))
+    fs.set_primary_key_col("id")
+    return fs
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> str:
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "people"
+    for row in [("id", "age"), ("1", 10), ("2", "x"), ("1", 30), ("3", 40)]:
+        ws.append(row)
+    ws = wb.create_sheet("others")
+    for row in [("id", "age"), ("1", "y"), ("2", 20)]:
+        ws.append(row)
+    wb.save(path := str(tmp_path / "source.xlsx"))
+    return path
+
+
+def _read(path: Path) -> dict[str, list[tuple[Any, ...]]]:
+    wb = openpyxl.load_workbook(path)
+    return {ws.title: [tuple(cell.value for cell in row) for row in ws.iter_rows()] for ws in wb.worksheets}
+
+
+def test_export_single(validator: Fieldset, source: str, tmp_path: Path):
+    errors = validate_single(open_xls(source), validator, include_success=True)
+    export_errors(source, target := tmp_path / "errors.xlsx", errors)
+
+    sheets = _read(target)
+    assert sheets["people"] == [
+        ("id", "age", "Errors"),
+        ("1", 10, None),
+        ("2", "x", "age: Enter a whole number."),
+        ("1", 30, "1 duplicated"),
+        ("3", 40, None),
+    ]
+    assert sheets["others"] == [("id", "age"), ("1", "y"), ("2", 20)]
+    ws = openpyxl.load_workbook(target)["people"]
+    assert ws["B3"].fill.start_color.rgb == ERROR_FILL.start_color.rgb
+    assert ws["A3"].fill.fill_type is None
+
+
+def test_export_multi_stream(validator: Fieldset, source: str, tmp_path: Path):
+    with JsonLinesSink(tmp_path / "errors.jsonl") as sink:
+        validate_xls_multi(open_xls_multi(source, [0, 1]), [validator, validator], sink=sink)
+    export_errors(source, target := tmp_path / "errors.xlsx", read_errors(tmp_path / "errors.jsonl"))
+
+    sheets = _read(target)
+    assert sheets["people"][2][2] == "age: Enter a whole number."
+    assert sheets["others"][1] == ("1", "y", "age: Enter a whole number.")
+
+
+def test_export_start_at_row(validator: Fieldset, source: str, tmp_path: Path):
+    errors = validate_single(open_xls(source, start_at_row=2), validator)
+    assert errors == {}
+    export_errors(source, target := tmp_path / "errors.xlsx", {"people": {1: {"-": ["check"]}}}, start_at_row=2)
+    assert _read(target)["people"][3] == ("1", 30, "check")
+
+
+def test_export_unsorted(source: str, tmp_path: Path):
+    with pytest.raises(ValueError, match="sorted"):
+        export_errors(source, tmp_path / "errors.xlsx", [(0, 2, {"-": ["a"]}), (0, 1, {"-": ["b"]})])
+
+
+@pytest.mark.parametrize("index_or_name", [1, "others"])
+def test_export_single_other_sheet(validator: Fieldset, source: str, tmp_path: Path, index_or_name: int | str):
+    errors = validate_single(open_xls(source, index_or_name=index_or_name), validator)
+    export_errors(source, target := tmp_path / "errors.xlsx", errors, index_or_name=index_or_name)
+    sheets = _read(target)
+    assert sheets["people"] == [("id", "age"), ("1", 10), ("2", "x"), ("1", 30), ("3", 40)]
+    assert sheets["others"] == [("id", "age", "Errors"), ("1", "y", "age: Enter a whole number."), ("2", 20, None)]
+
+    with JsonLinesSink(tmp_path / "errors.jsonl") as sink:
+        validate_single(open_xls(source, index_or_name=index_or_name), validator, sink=sink)
+    export_errors(source, target, read_errors(tmp_path / "errors.jsonl"), index_or_name=index_or_name)
+    assert _read(target) == sheets
@@ -0,0 +1,105 @@
+# mypy: disable-error-code="no-untyped-def"
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.factories import FieldsetFactory, FlexFieldFactory
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.instrumentation import Instrument, LoggingObserver, Phase, PrometheusObserver
+from hope_smart_import.readers import open_csv, open_xls, open_xls_multi
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+
+DATA = Path(__file__).parent / "data"
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.phases: dict[tuple[str, str | None], Phase] = {}
+
+    def record(self, phase: Phase) -> None:
+        self.phases[phase.name, phase.sheet] = phase
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="name", fieldset=fs)
+    FlexFieldFactory(name="last_name", fieldset=fs)
+    FlexFieldFactory(name="gender", fieldset=fs)
+    return fs
+
+
+def test_nested_phases():
+    instrument = Instrument()
+    with instrument.measure("outer") as outer:
+        for __ in instrument.iterate("inner", [1, 2]):
+            pass
+        with instrument.measure("inner"):
+            time.sleep(0.01)
+    inner = instrument.get("inner")
+    assert inner.rows == 2
+    assert inner.wall >= 0.01
+    assert outer.wall < 0.01
+
+
+def test_open_xls(validator: Fieldset):
+    recorder = Recorder()
+    instrument = Instrument(recorder)
+    rows = open_xls(str(DATA / "r1.xlsx"), value_mapper=str.upper, instrument=instrument)
+    assert validate_single(rows, validator, instrument=instrument) == {}
+
+    assert set(recorder.phases) == {("load", None), ("parse", "f1"), ("map", "f1"), ("validate", "people")}
+    assert recorder.phases["load", None].bytes == (DATA / "r1.xlsx").stat().st_size
+    assert recorder.phases["parse", "f1"].rows == 3
+    assert recorder.phases["validate", "people"].rows == 2
+    assert all(p.wall >= 0 for p in recorder.phases.values())
+    assert instrument.phases == {}
+
+
+def test_open_csv(validator: Fieldset):
+    recorder = Recorder()
+    instrument = Instrument(recorder)
+    rows = open_csv(str(DATA / "r1.csv"), has_header=True, instrument=instrument)
+    assert validate_single(rows, validator, instrument=instrument) == {}
+
+    assert set(recorder.phases) == {("load", None), ("parse", None), ("validate", "people")}
+    assert recorder.phases["load", None].bytes == (DATA / "r1.csv").stat().st_size
+    assert recorder.phases["parse", None].rows == 2
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_xls_multi(validator: Fieldset, workers: int):
+    recorder = Recorder()
+    instrument = Instrument(recorder)
+    g = open_xls_multi(str(DATA / "r1.xlsx"), [0, 1], instrument=instrument)
+    errors = validate_xls_multi(g, [validator, validator], workers=workers, instrument=instrument)
+    assert list(errors) == ["1:people", "2:people"]
+    assert recorder.phases["parse", "f1"].rows == 3
+    assert ("parse", "Sheet1") in recorder.phases
+    if not workers:
+        assert recorder.phases["validate", "1:people"].rows == 2
+
+
+def test_logging_observer(caplog: Any):
+    phase = Phase("parse", "f1")
+    phase.rows = 10
+    phase.wall = 2.0
+    with caplog.at_level(logging.INFO):
+        LoggingObserver().record(phase)
+    assert "phase=parse sheet=f1 wall=2.0000s cpu=0.0000s rows=10 rows/s=5.0 bytes=0" in caplog.text
+
+
+def test_prometheus_observer():
+    observer = PrometheusObserver()
+    phase = Phase("parse", 'a "b"')
+    phase.rows = 10
+    phase.wall = 0.5
+    observer.record(phase)
+    observer.record(phase)
+    text = observer.render()
+    assert "# TYPE hope_smart_import_phase_rows_total counter" in text
+    assert 'hope_smart_import_phase_rows_total{phase="parse",sheet="a \\"b\\""} 20' in text
+    assert 'hope_smart_import_phase_seconds_total{phase="parse",sheet="a \\"b\\""} 1' in text
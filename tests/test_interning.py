@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import pytest
+
+from hope_smart_import.interning import ColumnDictionary, ColumnStats, DictionaryEncoder
+from hope_smart_import.readers import open_csv, open_csv_batches, open_xls, open_xls_multi, rows_from_batches
+
+
+@pytest.fixture
+def repeated(tmp_path: Path) -> str:
+    path = tmp_path / "repeated.csv"
+    path.write_text("household_id,country,name\n" + "".join(f"HH-{i // 3},AFG,name {i}\n" for i in range(30)))
+    return str(path)
+
+
+def test_column_dictionary() -> None:
+    d = ColumnDictionary(max_distinct=2)
+    first = str(1234)
+    assert str(1234) is not first
+    assert d(first) is first
+    assert d(str(1234)) is first
+    assert d(1) == 1
+    assert d(1.0) == 1.0
+    assert type(d(1.0)) is float
+    assert d(None) is None
+    d("c")
+    d("x")
+    assert d.stats() == ColumnStats(2, d.bytes, 1, True)
+    assert d.bytes > 0
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_read_csv_dictionary(repeated: str, compact: bool) -> None:
+    encoder = DictionaryEncoder(max_distinct=5)
+    rows = list(open_csv(repeated, has_header=True, compact=compact, dictionary=encoder))
+    assert rows == list(open_csv(repeated, has_header=True, compact=compact))
+    assert len({id(row["country"]) for row in rows}) == 1
+    assert rows[0]["household_id"] is rows[2]["household_id"]
+    stats = encoder.stats()[None]
+    assert stats["country"] == ColumnStats(1, stats["country"].bytes, 29, False)
+    assert stats["household_id"].distinct == 5
+    assert stats["household_id"].saturated
+    assert stats["name"].hits == 0
+
+
+def test_read_dictionary_with_mapper(repeated: str) -> None:
+    encoder = DictionaryEncoder()
+    rows = list(open_csv(repeated, has_header=True, value_mapper={"country": str.lower}, dictionary=encoder))
+    assert {row["country"] for row in rows} == {"afg"}
+    assert encoder.stats()[None]["country"].distinct == 1
+
+
+def test_read_batches_dictionary(repeated: str) -> None:
+    encoder = DictionaryEncoder()
+    batches = list(open_csv_batches(repeated, has_header=True, batch_size=7, dictionary=encoder))
+    assert len({id(value) for batch in batches for value in batch.columns[1]}) == 1
+    assert list(rows_from_batches(batches)) == list(open_csv(repeated, has_header=True))
+    assert encoder.stats()[None]["household_id"].distinct == 10
+
+
+def test_read_xls_dictionary() -> None:
+    xls = str(Path(__file__).parent / "data" / "r1.xlsx")
+    encoder = DictionaryEncoder()
+    rows = list(open_xls(xls, dictionary=encoder))
+    assert rows[0]["last_name"] is rows[1]["last_name"]
+    for __, sheet in open_xls_multi(xls, [0, 1], dictionary=encoder):
+        list(sheet)
+    # dictionaries are kept per sheet
+    stats = encoder.stats()
+    assert list(stats) == ["f1", "Sheet1"]
+    assert stats["f1"]["last_name"].hits == 3
+    assert stats["Sheet1"]["last_name"].hits == 1
+    assert stats["Sheet1"]["gender"].distinct == 2
+    encoder.clear()
+    assert encoder.stats() == {}
@@ -0,0 +1,173 @@
+# mypy: disable-error-code="no-untyped-def"
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.factories import (
+    ConfigurationFactory,
+    DataCheckerFactory,
+    FieldDefinitionFactory,
+    FieldsetFactory,
+    FlexFieldFactory,
+)
+from django import forms
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+from django.urls import reverse
+from hope_flex_fields.models import DataCheckerFieldset
+
+from hope_smart_import import compiled
+from hope_smart_import.jobs import Progress, count_rows, run_import
+from hope_smart_import.models import Configuration, ImportJob
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.fixture(autouse=True)
+def media(settings: Any, tmp_path: Path) -> None:
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def configuration(db: Any) -> Configuration:
+    compiled.invalidate()
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="name", fieldset=fs)
+    FlexFieldFactory(name="last_name", fieldset=fs)
+    FlexFieldFactory(
+        name="gender",
+        fieldset=fs,
+        definition=FieldDefinitionFactory(field_type=forms.ChoiceField),
+        attrs={"choices": [["F", "F"], ["M", "M"]]},
+    )
+    dc = DataCheckerFactory()
+    DataCheckerFieldset.objects.create(checker=dc, fieldset=fs)
+    return ConfigurationFactory(checker=dc)
+
+
+def csv_job(configuration: Configuration, rows: int) -> ImportJob:
+    content = "name,last_name,gender\n" + "".join(f"n{i},l{i},{'FMX'[i % 3]}\n" for i in range(rows))
+    job = ImportJob(configuration=configuration)
+    job.file.save("people.csv", ContentFile(content.encode()))
+    return job
+
+
+def test_progress():
+    progress = Progress(50, 200, 2.0)
+    assert progress.as_dict() == {"rows": 50, "total": 200, "elapsed": 2.0, "rate": 25.0, "eta": 6.0}
+    assert Progress(50, None, 2.0).eta is None
+
+
+def test_count_rows():
+    assert count_rows(str(DATA / "r1.csv")) == 2
+    assert count_rows(str(DATA / "r1.xlsx")) == 2
+    assert count_rows(str(DATA / "rdi1.xlsx"), "0") == 102
+
+
+def test_run_import(configuration: Configuration):
+    job = csv_job(configuration, 25)
+    reports = []
+    result = run_import(job, every=10, on_progress=reports.append)
+
+    assert [p["rows"] for p in reports] == [10, 20]
+    assert reports[0]["total"] == 25
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.SUCCESS
+    assert job.progress["rows"] == 25
+    assert job.result == result
+    assert result["rows"] == 25
+    assert result["invalid"] == 8
+    assert result["valid"] == 17
+    assert result["errors"]["3"] == {"gender": ["Select a valid choice. X is not one of the available choices."]}
+    assert job.started <= job.finished
+
+
+def test_run_import_xlsx(configuration: Configuration):
+    job = ImportJob(configuration=configuration, sheet="f1")
+    job.file.save("r1.xlsx", ContentFile((DATA / "r1.xlsx").read_bytes()))
+    assert job.run() == {
+        "rows": 2,
+        "valid": 2,
+        "invalid": 0,
+        "elapsed": job.result["elapsed"],
+        "errors": {},
+        "truncated": False,
+    }
+
+
+def test_run_import_remote_storage(configuration: Configuration, settings: Any, monkeypatch: Any):
+    settings.STORAGES = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+    csv = csv_job(configuration, 25)
+    xlsx = ImportJob(configuration=configuration, sheet="f1")
+    xlsx.file.save("r1.xlsx", ContentFile((DATA / "r1.xlsx").read_bytes()))
+
+    def path(self: FieldFile) -> str:
+        raise NotImplementedError("This backend doesn't support absolute paths.")
+
+    # files of remote storages (ie. S3) have no path: they are streamed
+    monkeypatch.setattr(FieldFile, "path", property(path))
+    reports = []
+    result = run_import(csv, every=10, on_progress=reports.append)
+    assert (result["rows"], result["invalid"]) == (25, 8)
+    assert reports[0]["total"] is None
+    assert xlsx.run()["rows"] == 2
+
+
+def test_run_import_failure(configuration: Configuration):
+    job = ImportJob(configuration=configuration, sheet="missing")
+    job.file.save("r1.xlsx", ContentFile((DATA / "r1.xlsx").read_bytes()))
+    with pytest.raises(Exception, match="missing"):
+        job.run()
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILURE
+    assert "missing" in job.result["error"]
+
+
+def test_admin_import_file(django_app: Any, admin_user: Any, configuration: Configuration, monkeypatch: Any):
+    monkeypatch.setattr(ImportJob, "queue", lambda job: job.run())
+    url = reverse("admin:hope_smart_import_configuration_import_file", args=[configuration.pk])
+    res = django_app.get(url, user=admin_user)
+    form = res.forms["import-form"]
+    form["file"] = ("people.csv", b"name,last_name,gender\na,b,F\nc,d,X\n")
+    res = form.submit().follow()
+    job = configuration.jobs.get()
+    assert res.request.path == reverse("admin:hope_smart_import_importjob_change", args=[job.pk])
+    assert job.status == ImportJob.Status.SUCCESS
+    assert job.result["invalid"] == 1
+
+    res = django_app.get(
+        reverse("admin:hope_smart_import_configuration_jobs", args=[configuration.pk]), user=admin_user
+    )
+    assert res.follow().status_code == 200
+
+
+def test_run_import_truncated(configuration: Configuration, monkeypatch: Any):
+    monkeypatch.setattr("hope_smart_import.jobs.MAX_STORED_ERRORS", 3)
+    result = csv_job(configuration, 25).run()
+    assert (result["invalid"], result["valid"], result["truncated"]) == (8, 17, True)
+    assert list(result["errors"]) == ["3", "6", "9"]
+
+
+def test_admin_import_file_without_celery(
+    django_app: Any, admin_user: Any, configuration: Configuration, monkeypatch: Any
+):
+    # celery is an optional dependency
+    monkeypatch.setitem(sys.modules, "hope_smart_import.tasks", None)
+    with pytest.raises(ImportError, match="celery is required"):
+        ImportJob(configuration=configuration).queue()
+    url = reverse("admin:hope_smart_import_configuration_import_file", args=[configuration.pk])
+    form = django_app.get(url, user=admin_user).forms["import-form"]
+    form["file"] = ("people.csv", b"name,last_name,gender\na,b,F\n")
+    res = form.submit()
+    assert res.status_code == 200
+    assert "celery is required to queue import jobs" in res.text
+    assert not configuration.jobs.exists()
+
+    job = csv_job(configuration, 1)
+    job.status = ImportJob.Status.FAILURE
+    job.save()
+    res = django_app.get(reverse("admin:hope_smart_import_importjob_requeue", args=[job.pk]), user=admin_user)
+    assert "celery is required to queue import jobs" in res.follow().text
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.FAILURE
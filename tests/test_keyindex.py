@@ -0,0 +1,116 @@
+# mypy: disable-error-code="no-untyped-def"
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.factories import FieldsetFactory, FlexFieldFactory
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import import keyindex
+from hope_smart_import.keyindex import CompactKeyIndex, SqliteKeyIndex
+from hope_smart_import.validation import SheetValidator
+
+
+@pytest.fixture(params=["compact", "sqlite"])
+def index(request: Any, monkeypatch: Any) -> Any:
+    monkeypatch.setattr(keyindex, "MIN_PENDING", 4)
+    if request.param == "compact":
+        yield CompactKeyIndex()
+    else:
+        idx = SqliteKeyIndex()
+        yield idx
+        idx.close()
+        assert not Path(idx.path).exists()
+
+
+def test_index(index: Any):
+    assert index.add_many(["a", "b", "a", 1]) == [False, False, True, False]
+    assert index.add_many(["b", "c"]) == [True, False]
+    index.add("d")
+    assert len(index) == 5
+    assert "a" in index
+    assert "x" not in index
+    assert index.contains_many(["a", "x", 1, "1", "d"]) == [True, False, True, False, True]
+    keys = [f"k{i}" for i in range(100)]
+    assert not any(index.add_many(keys))
+    assert all(index.contains_many(keys))
+    assert len(index) == 105
+
+
+def test_compact_index_merge(monkeypatch: Any):
+    monkeypatch.setattr(keyindex, "MIN_PENDING", 4)
+    index = CompactKeyIndex(range(10))
+    assert len(index._sorted) + len(index._pending) == 10
+    assert len(index._sorted) > 0
+    assert list(index._sorted) == sorted(index._sorted)
+    assert all(i in index for i in range(10))
+    assert 10 not in index
+    # the hashes of the new keys are interleaved with the merged ones
+    index.add_many([f"k{i}" for i in range(50)])
+    assert index._sorted.typecode == "q"
+    assert list(index._sorted) == sorted(index._sorted)
+    assert len(index) == 60
+    assert all(f"k{i}" in index for i in range(50))
+
+
+def test_sqlite_index_path(tmp_path: Path):
+    path = str(tmp_path / "keys.db")
+    index = SqliteKeyIndex(path)
+    index.add_many(["a", None, ("x", 1)])
+    index.close()
+    index = SqliteKeyIndex(path, reuse=True)
+    assert index.contains_many(["a", None, ("x", 1), "b"]) == [True, True, True, False]
+    index.close()
+    assert Path(path).exists()
+    # keys of previous runs are removed by default
+    index = SqliteKeyIndex(path)
+    assert len(index) == 0
+    assert "a" not in index
+    index.close()
+
+
+def test_index_key_types(index: Any):
+    assert index.add_many([None, "None", -1, -2, ("a", 1), "('a', 1)", 1]) == [False] * 7
+    assert index.add_many([1.0, True, "1", 2**70, 2**70 + 1, 2**70]) == [True, True, False, False, False, True]
+    assert index.contains_many(["None", None, -2, -3]) == [True, True, True, False]
+
+
+def test_key_hash():
+    assert keyindex.key_hash(-1) != keyindex.key_hash(-2)
+    assert keyindex.key_hash(1) == keyindex.key_hash(1.0) == keyindex.key_hash(True)
+    assert keyindex.key_hash("None") != keyindex.key_hash(None)
+    assert keyindex.key_hash("abc") == keyindex.key_hash(str("abc"))
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="name", fieldset=fs)
+    fs.set_primary_key_col("id")
+    return fs
+
+
+@pytest.mark.parametrize("factory", [CompactKeyIndex, SqliteKeyIndex])
+def test_validate_batches(validator: Fieldset, factory: Any):
+    rows = [{"id": str(i % 7), "name": "a", "alien": 1 if i == 3 else None} for i in range(10)]
+    expected = validator.validate(rows, fail_if_alien=True)
+    primary_keys = validator.primary_keys
+    sv = SheetValidator(validator, fail_if_alien=True, key_index=factory, batch_size=4)
+    assert sv.validate(rows) == expected
+    assert isinstance(validator.primary_keys, factory)
+    assert all(pk in validator.primary_keys for pk in primary_keys)
+
+
+def test_validate_batches_master(validator: Fieldset):
+    detail = FieldsetFactory(name="detail")
+    FlexFieldFactory(name="person", fieldset=detail)
+    SheetValidator(validator, key_index=partial(SqliteKeyIndex)).validate([{"id": "1"}, {"id": "2"}])
+    detail.set_master(validator, "person")
+    rows = [{"person": "1"}, {"person": "3"}, {"person": "2"}]
+    assert SheetValidator(detail, key_index=CompactKeyIndex, batch_size=2).validate(rows) == {
+        2: {"-": ["'3' not found in master"]}
+    }
+    # a plain validation can use the index of the master
+    assert detail.validate(rows) == {2: {"-": ["'3' not found in master"]}}
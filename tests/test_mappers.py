@@ -0,0 +1,87 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from hope_smart_import.instrumentation import Instrument
+from hope_smart_import.mappers import column_mappers, compile_mapper, identity, memoize, MemoizedMapper
+from hope_smart_import.readers import open_csv, open_csv_batches, open_xls, open_xls_multi, rows_from_batches
+
+SPEC = {"gender": str.lower, "name": str.upper}
+
+
+@pytest.fixture
+def xls() -> str:
+    return str((Path(__file__).parent / "data" / "r1.xlsx").absolute())
+
+
+@pytest.fixture
+def csv() -> str:
+    return str((Path(__file__).parent / "data" / "r1.csv").absolute())
+
+
+def test_column_mappers() -> None:
+    assert column_mappers(identity, ["a", "b"]) == []
+    assert column_mappers(str.upper, ["a", "b"]) == [(0, str.upper), (1, str.upper)]
+    assert column_mappers({"b": str.upper, "c": str.lower, "a": identity}, ["a", "b"]) == [(1, str.upper)]
+
+
+def test_compile_mapper() -> None:
+    assert compile_mapper(identity, ["a"]) is None
+    assert compile_mapper({"c": str.upper}, ["a", "b"]) is None
+    assert compile_mapper(str.upper, ["a", "b"])(("x", "y")) == ("X", "Y")
+    assert compile_mapper({"b": str.upper}, ["a", "b"])(("x", "y")) == ("x", "Y")
+
+
+def test_memoize() -> None:
+    calls = []
+
+    def mapper(value: Any) -> Any:
+        calls.append(value)
+        return str(value).upper()
+
+    memoized = memoize(mapper, maxsize=2)
+    assert isinstance(memoized, MemoizedMapper)
+    assert memoize(memoized) is memoized
+    assert [memoized(v) for v in ["m", "f", "m", "x", "x", "f"]] == ["M", "F", "M", "X", "X", "F"]
+    # "x" does not fit in the cache
+    assert calls == ["m", "f", "x", "x"]
+    assert memoized([1]) == "[1]"
+
+
+def test_memoize_mixed_types() -> None:
+    # 1 == 1.0 == True but str() maps them differently
+    memoized = memoize(str)
+    values = [1, True, 1.0, 0, False, 1, False]
+    assert [memoized(v) for v in values] == ["1", "True", "1.0", "0", "False", "1", "False"]
+    assert len(memoized.cache) == 5
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_read_column_mappers(xls: str, csv: str, compact: bool) -> None:
+    expected = [
+        {"name": "JOHN", "last_name": "Doe", "gender": "m"},
+        {"name": "JANE", "last_name": "Doe", "gender": "f"},
+    ]
+    assert [dict(r) for r in open_csv(csv, has_header=True, value_mapper=SPEC, compact=compact)] == expected
+    assert [dict(r) for r in open_xls(xls, value_mapper=SPEC, compact=compact)] == expected
+    sheets = [list(sheet) for __, sheet in open_xls_multi(xls, [0, 1], value_mapper=SPEC, compact=compact)]
+    assert [dict(r) for r in sheets[0]] == expected
+    assert sheets[1][0]["name"] == "JOHN1"
+    assert sheets[1][0]["last_name"] == "Doe1"
+
+
+def test_read_column_mappers_batches(csv: str) -> None:
+    batches = open_csv_batches(csv, has_header=True, value_mapper=SPEC)
+    assert list(rows_from_batches(batches)) == list(open_csv(csv, has_header=True, value_mapper=SPEC))
+    # generated names can be used for headerless files
+    rows = list(open_csv(csv, value_mapper={"column3": str.lower}))
+    assert [row["column3"] for row in rows] == ["gender", "m", "f"]
+    assert list(rows_from_batches(open_csv_batches(csv, value_mapper={"column3": str.lower}))) == rows
+
+
+def test_read_column_mappers_instrument(csv: str) -> None:
+    instrument = Instrument()
+    rows = list(open_csv(csv, has_header=True, value_mapper={"gender": memoize(str.lower)}, instrument=instrument))
+    assert [row["gender"] for row in rows] == ["m", "f"]
+    assert ("map", None) in instrument.phases
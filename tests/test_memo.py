@@ -0,0 +1,117 @@
+# mypy: disable-error-code="no-untyped-def"
+from typing import Any
+
+import pytest
+from demo.factories import DataCheckerFactory, FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import DataCheckerFieldset, Fieldset
+
+from hope_smart_import.memo import DjangoCacheStore, ValidationMemo
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+from hope_smart_import.validation import checker_fingerprint
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="name", fieldset=fs)
+    FlexFieldFactory(
+        name="gender",
+        fieldset=fs,
+        definition=FieldDefinitionFactory(field_type=forms.ChoiceField),
+        attrs={"choices": [["F", "F"], ["M", "M"]]},
+    )
+    fs.set_primary_key_col("id")
+    return fs
+
+
+@pytest.fixture
+def rows() -> list[dict[str, Any]]:
+    return [
+        {"id": "1", "name": "Jane", "gender": "F"},
+        {"id": "2", "name": "John", "gender": "X"},
+        {"id": "1", "name": "Jane", "gender": "F"},
+        {"id": "2", "name": "John", "gender": "X", "age": 3},
+        {"name": "John", "gender": "X", "id": "2"},
+    ]
+
+
+def test_memo(validator: Fieldset, rows: list[dict[str, Any]]):
+    expected = validator.validate(rows, include_success=True, fail_if_alien=True)
+    memo = ValidationMemo()
+
+    errors = validate_single(rows, validator, include_success=True, fail_if_alien=True, memo=memo)
+    assert errors == expected
+    assert errors[3] == {"-": ["1 duplicated"]}
+    assert memo.stats == {"hits": 2, "store_hits": 0, "misses": 3, "size": 3}
+
+    # repeated upload: duplicates are detected again, form cleaning is not
+    assert validate_single(rows, validator, include_success=True, fail_if_alien=True, memo=memo) == expected
+    assert memo.stats == {"hits": 7, "store_hits": 0, "misses": 3, "size": 3}
+
+
+def test_memo_lru(validator: Fieldset, rows: list[dict[str, Any]]):
+    memo = ValidationMemo(maxsize=1)
+    validate_single(rows, validator, memo=memo)
+    assert len(memo) == 1
+    assert memo.hits == 0
+
+
+def test_memo_store(validator: Fieldset, rows: list[dict[str, Any]]):
+    store = DjangoCacheStore()
+    validate_single(rows, validator, memo=ValidationMemo(store=store))
+
+    memo = ValidationMemo(store=store)
+    assert validate_single(rows, validator, memo=memo) == validator.validate(rows)
+    assert memo.stats == {"hits": 2, "store_hits": 3, "misses": 0, "size": 3}
+
+
+def test_fingerprint(validator: Fieldset, rows: list[dict[str, Any]]):
+    fingerprint = checker_fingerprint(validator)
+    memo = ValidationMemo()
+    validate_single(rows, validator, memo=memo)
+    assert checker_fingerprint(Fieldset.objects.get(pk=validator.pk)) == fingerprint
+
+    field = validator.fields.get(name="gender")
+    field.attrs = {"choices": [["F", "F"], ["M", "M"], ["X", "X"]]}
+    field.save()
+    validator = Fieldset.objects.get(pk=validator.pk)
+    validator.set_primary_key_col("id")
+    assert checker_fingerprint(validator) != fingerprint
+
+    assert validate_single(rows, validator, memo=memo) == {
+        3: {"-": ["1 duplicated"]},
+        4: {"-": ["2 duplicated"]},
+        5: {"-": ["2 duplicated"]},
+    }
+    assert memo.misses == 6
+
+
+def test_fingerprint_datachecker(validator: Fieldset):
+    dc = DataCheckerFactory()
+    empty = checker_fingerprint(dc)
+    member = DataCheckerFieldset.objects.create(checker=dc, fieldset=validator, prefix="p")
+    fingerprint = checker_fingerprint(dc)
+    assert fingerprint != empty
+
+    member.prefix = "q"
+    member.save()
+    assert checker_fingerprint(dc) != fingerprint
+
+
+def test_memo_workers(validator: Fieldset, rows: list[dict[str, Any]]):
+    with pytest.raises(ValueError, match="memo"):
+        validate_single(rows, validator, workers=2, memo=ValidationMemo())
+
+
+def test_memo_multi(validator: Fieldset, rows: list[dict[str, Any]]):
+    detail = FieldsetFactory(name="detail")
+    FlexFieldFactory(name="person", fieldset=detail)
+    detail.set_master(validator, "person")
+    memo = ValidationMemo()
+    errors = validate_xls_multi(
+        [(0, rows), (1, [{"person": "1"}, {"person": "3"}, {"person": "1"}])], [validator, detail], memo=memo
+    )
+    assert errors["2:detail"] == {2: {"-": ["'3' not found in master"]}}
+    assert memo.hits == 3
@@ -0,0 +1,74 @@
+# mypy: disable-error-code="no-untyped-def"
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.models import Household, Individual
+
+from hope_smart_import.persistence import BulkLoader, PersistenceError, SheetTarget, bulk_load
+from hope_smart_import.readers import open_xls_multi
+
+
+def households(n: int) -> list[dict[str, Any]]:
+    return [{"household_id": f"h{i}", "name": f"Household {i}"} for i in range(n)]
+
+
+def individuals(n: int) -> list[dict[str, Any]]:
+    return [{"household_id": f"h{i // 3}", "full_name": f"Name {i}"} for i in range(n)]
+
+
+@pytest.fixture
+def targets() -> list[SheetTarget]:
+    return [
+        SheetTarget(Household, key="household_id", build=lambda row: {"name": row["name"], "data": dict(row)}),
+        SheetTarget(
+            Individual,
+            master=0,
+            master_col="household_id",
+            fk="household",
+            build=lambda row: {"data": dict(row)},
+        ),
+    ]
+
+
+def test_bulk_load(db: Any, targets: list[SheetTarget], django_assert_num_queries: Any):
+    # 3 + 6 inserts and the transaction savepoint
+    with django_assert_num_queries(11):
+        counts = bulk_load([(0, households(25)), (1, individuals(60))], targets, batch_size=10)
+    assert counts == {0: 25, 1: 60}
+    assert Household.objects.count() == 25
+    ind = Individual.objects.select_related("household").get(data__full_name="Name 59")
+    assert ind.household.name == "Household 19"
+    assert ind.household.data == {"household_id": "h19", "name": "Household 19"}
+
+
+def test_bulk_load_missing_master(db: Any, targets: list[SheetTarget]):
+    with pytest.raises(PersistenceError, match="row 4: 'missing' not found in master"):
+        bulk_load([(0, households(2)), (1, [*individuals(3), {"household_id": "missing"}])], targets)
+    # the whole import is rolled back
+    assert not Household.objects.exists()
+
+
+def test_bulk_load_order(db: Any, targets: list[SheetTarget]):
+    with pytest.raises(PersistenceError, match="must be loaded before"):
+        bulk_load([(1, individuals(3)), (0, households(2))], targets)
+
+
+def test_sheet_target():
+    with pytest.raises(ValueError, match="required"):
+        SheetTarget(Individual, master=0)
+    target = SheetTarget(Household)
+    assert target.build({"name": "a", "other": 1}) == {"name": "a"}
+
+
+def test_bulk_load_xls(db: Any):
+    xls = Path(__file__).parent / "data" / "rdi1.xlsx"
+    targets = [
+        SheetTarget(Household, key="household_id", build=lambda row: {"name": str(row["household_id"])}),
+        SheetTarget(Individual, master=0, master_col="household_id", fk="household", build=lambda row: {}),
+    ]
+    loader = BulkLoader(targets, batch_size=50)
+    counts = loader.load(open_xls_multi(str(xls), [0, 1]))
+    assert counts == {0: 102, 1: 370}
+    assert len(loader.indexes[0]) == 102
+    assert Individual.objects.filter(household__name="1").count() == 5
@@ -0,0 +1,150 @@
+# mypy: disable-error-code="no-untyped-def"
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+import pytest
+from demo.factories import (
+    ConfigurationFactory,
+    DataCheckerFactory,
+    FieldDefinitionFactory,
+    FieldsetFactory,
+    FlexFieldFactory,
+)
+from django import forms
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from hope_flex_fields.models import DataCheckerFieldset
+
+from hope_smart_import import compiled, preview
+from hope_smart_import.csvfile import CsvFile
+from hope_smart_import.models import Configuration
+from hope_smart_import.preview import preview_page
+
+ROWS = 120
+
+
+@pytest.fixture(autouse=True)
+def media(settings: Any, tmp_path: Path) -> None:
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def configuration(db: Any) -> Configuration:
+    compiled.invalidate()
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="name", fieldset=fs)
+    FlexFieldFactory(name="last_name", fieldset=fs)
+    FlexFieldFactory(
+        name="gender",
+        fieldset=fs,
+        definition=FieldDefinitionFactory(field_type=forms.ChoiceField),
+        attrs={"choices": [["F", "F"], ["M", "M"]]},
+    )
+    dc = DataCheckerFactory()
+    DataCheckerFieldset.objects.create(checker=dc, fieldset=fs)
+    return ConfigurationFactory(checker=dc)
+
+
+def _rows() -> list[list[str]]:
+    return [["name", "last_name", "gender"]] + [[f"n{i}", f"l{i}", "FMX"[i % 3]] for i in range(1, ROWS + 1)]
+
+
+@pytest.fixture
+def people_csv(tmp_path: Path) -> str:
+    path = tmp_path / "people.csv"
+    path.write_text("".join(",".join(row) + "\n" for row in _rows()))
+    return str(path)
+
+
+@pytest.fixture
+def people_xlsx(tmp_path: Path) -> str:
+    wb = openpyxl.Workbook()
+    for row in _rows():
+        wb.active.append(row)
+    path = tmp_path / "people.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("fixture", ["people_csv", "people_xlsx"])
+def test_preview_page(configuration: Configuration, request: Any, fixture: str) -> None:
+    filepath = request.getfixturevalue(fixture)
+    checker = configuration.get_compiled_checker()
+    first = preview_page(filepath, checker, page_size=50)
+    assert (first.number, first.total, first.pages, first.has_previous, first.has_next) == (1, ROWS, 3, False, True)
+    assert first.columns == ["name", "last_name", "gender"]
+    assert first.rows[0].cells == [("n1", []), ("l1", []), ("M", [])]
+    assert first.rows[1].cells[2][1] == ["Select a valid choice. X is not one of the available choices."]
+    assert first.invalid == 17
+
+    last = preview_page(filepath, checker, page=3, page_size=50)
+    assert [row.number for row in last.rows] == list(range(101, ROWS + 1))
+    assert last.rows[0].cells[0] == ("n101", [])
+    assert (last.has_previous, last.has_next) == (True, False)
+    assert preview_page(filepath, checker, page=9, page_size=50).rows == []
+
+
+def test_preview_page_uses_cache(configuration: Configuration, people_xlsx: str, monkeypatch: Any) -> None:
+    checker = configuration.get_compiled_checker()
+    second = preview_page(people_xlsx, checker, page=2, page_size=10)
+    # the whole sheet has been stored in the parse cache: next pages do not parse the workbook
+    monkeypatch.setattr("hope_smart_import.readers._load_workbook", None)
+    assert preview_page(people_xlsx, checker, page=2, page_size=10) == second
+    assert preview_page(people_xlsx, checker, page=12, page_size=10).rows[-1].number == ROWS
+
+
+def test_preview_csv_total_cache(configuration: Configuration, people_csv: str, monkeypatch: Any) -> None:
+    checker = configuration.get_compiled_checker()
+    assert preview_page(people_csv, checker, page_size=50).total == ROWS
+    # the other pages only index the rows up to their own
+    monkeypatch.setattr(CsvFile, "__len__", None)
+    assert preview_page(people_csv, checker, page=2, page_size=50).total == ROWS
+    # the count of a changed file is not reused
+    Path(people_csv).write_text(Path(people_csv).read_text() + "n,l,F\n")
+    monkeypatch.undo()
+    assert preview_page(people_csv, checker, page=2, page_size=50).total == ROWS + 1
+
+
+def test_store_upload(people_csv: str, tmp_path: Path) -> None:
+    upload = SimpleUploadedFile("People.CSV", Path(people_csv).read_bytes())
+    name = preview.store_upload(upload)
+    assert name.startswith(f"{preview.PREVIEW_DIR}/")
+    assert name.endswith(".csv")
+    assert (tmp_path / name).read_bytes() == Path(people_csv).read_bytes()
+    # same content, same file
+    assert preview.store_upload(SimpleUploadedFile("copy.csv", Path(people_csv).read_bytes())) == name
+
+
+def test_preview_csv_index_once(configuration: Configuration, people_csv: str, monkeypatch: Any) -> None:
+    opened = []
+    monkeypatch.setattr(preview, "CsvFile", lambda path: opened.append(path) or CsvFile(path))
+    page = preview_page(people_csv, configuration.get_compiled_checker(), page=2, page_size=50)
+    assert (page.rows[0].number, page.total) == (51, ROWS)
+    assert opened == [people_csv]
+
+
+def test_admin_test_file(django_app: Any, admin_user: Any, configuration: Configuration, settings: Any) -> None:
+    # previews are read by path: they do not go to the (possibly remote) default storage
+    settings.STORAGES = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+    url = reverse("admin:hope_smart_import_configuration_test_file", args=[configuration.pk])
+    res = django_app.get(url, user=admin_user)
+    form = res.forms["test-form"]
+    form["file"] = ("people.csv", "".join(",".join(row) + "\n" for row in _rows()).encode())
+    form["page_size"] = 50
+    res = form.submit().follow()
+    assert res.text.count('<tr id="row-') == 50
+    assert 'id="row-1"' in res.text
+    assert "not one of the available choices" in res.text
+    assert "Page 1 / 3" in res.text
+
+    res = res.click(href="page=2")
+    assert 'id="row-51"' in res.text
+    assert 'id="row-50"' not in res.text
+    res = res.click(href="page=3")
+    assert res.text.count('<tr id="row-') == 20
+    assert 'class="next"' not in res.text
+
+    res = django_app.get(f"{url}?preview=tampered", user=admin_user)
+    assert "Invalid preview" in res.text
+    assert 'id="preview"' not in res.text
@@ -0,0 +1,62 @@
+import io
+from pathlib import Path
+
+import openpyxl
+import pytest
+
+from hope_smart_import.probe import probe_workbook, SheetProbe
+from hope_smart_import.readers import open_xls
+
+
+@pytest.fixture
+def xls() -> str:
+    return str((Path(__file__).parent / "data" / "r1.xlsx").absolute())
+
+
+@pytest.fixture
+def streamed(tmp_path: Path) -> str:
+    # write-only workbooks do not declare the <dimension> of their sheets
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Individuals")
+    ws.append(["household_id", "full_name_i_c", "age", "disability_i_c"])
+    for i in range(500):
+        ws.append([f"HH-{i // 4}", f"Name {i}", i % 90, i % 2 == 0])
+    wb.create_sheet("Hidden").sheet_state = "hidden"
+    path = tmp_path / "streamed.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def test_probe_workbook(xls: str) -> None:
+    probes = probe_workbook(xls, rows=2)
+    assert [p.name for p in probes] == openpyxl.load_workbook(xls, read_only=True).sheetnames
+    assert probes[0] == SheetProbe(
+        0, "f1", "visible", "A1:C3", 3, 3, False, [("name", "last_name", "gender"), ("John", "Doe", "M")]
+    )
+    assert probes[1].header == ("name", "last_name", "gender")
+    assert probes[1].rows[1] == tuple(next(open_xls(xls, index_or_name=1)).values())
+
+
+def test_probe_workbook_stream(xls: str) -> None:
+    with open(xls, "rb") as f:
+        stream = io.BytesIO(f.read())
+    assert probe_workbook(stream) == probe_workbook(xls)
+    assert not stream.closed
+
+
+def test_probe_workbook_estimate(streamed: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    individuals, hidden = probe_workbook(streamed, rows=3)
+    assert individuals.dimension is None
+    # the whole sheet fits in the estimate window: rows are counted
+    assert (individuals.max_row, individuals.max_column, individuals.estimated) == (501, 4, False)
+    assert individuals.rows == [
+        ("household_id", "full_name_i_c", "age", "disability_i_c"),
+        ("HH-0", "Name 0", 0, True),
+        ("HH-0", "Name 1", 1, False),
+    ]
+    assert (hidden.state, hidden.max_row, hidden.rows, hidden.header) == ("hidden", 0, [], ())
+
+    monkeypatch.setattr("hope_smart_import.probe.ESTIMATE_SIZE", 1)
+    individuals = probe_workbook(streamed, rows=3)[0]
+    assert individuals.estimated
+    assert 400 < individuals.max_row < 600
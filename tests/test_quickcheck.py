@@ -0,0 +1,133 @@
+# mypy: disable-error-code="no-untyped-def"
+from itertools import chain, repeat
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import openpyxl
+import pytest
+from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.quickcheck import quick_check, sample_rows
+from hope_smart_import.readers import open_csv, open_xls_multi
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+from hope_smart_import.sinks import DictSink
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="age", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.IntegerField))
+    return fs
+
+
+@pytest.fixture
+def people_csv(tmp_path: Path) -> str:
+    path = tmp_path / "people.csv"
+    path.write_text("id,age\n" + "".join(f"{i},{'x' if i % 10 == 0 else i}\n" for i in range(1, 1001)))
+    return str(path)
+
+
+def test_max_errors(validator: Fieldset, people_csv: str):
+    rows = open_csv(people_csv, has_header=True)
+    errors = validate_single(rows, validator, max_errors=3)
+    assert list(errors) == [10, 20, 30]
+    # the reader has been closed
+    assert rows.gi_frame is None
+
+    errors = validate_single(open_csv(people_csv, has_header=True), validator, stop_on_first_error=True)
+    assert list(errors) == [10]
+
+    sink = validate_single(open_csv(people_csv, has_header=True), validator, max_errors=2, sink=DictSink())
+    assert list(sink.result()) == [10, 20]
+
+
+def test_max_errors_workers(validator: Fieldset, people_csv: str):
+    with pytest.raises(ValueError, match="max_errors"):
+        validate_single(open_csv(people_csv, has_header=True), validator, workers=2, stop_on_first_error=True)
+
+
+def test_max_errors_multi(validator: Fieldset, tmp_path: Path):
+    wb = openpyxl.Workbook()
+    for name, ages in [("first", [1, "x", "y"]), ("second", ["z", 2]), ("third", ["w"])]:
+        ws = wb.create_sheet(name)
+        ws.append(["id", "age"])
+        for i, age in enumerate(ages):
+            ws.append([str(i), age])
+    wb.save(path := str(tmp_path / "people.xlsx"))
+
+    g = open_xls_multi(path, [1, 2, 3])
+    errors = validate_xls_multi(g, [None, validator, validator, validator], max_errors=3)
+    assert {label: list(rows) for label, rows in errors.items()} == {"2:people": [2, 3], "3:people": [1]}
+    assert g.gi_frame is None
+
+
+def test_sample_rows():
+    assert sample_rows(5, 10) == [0, 1, 2, 3, 4]
+    rows = sample_rows(1000, 20, seed=1)
+    assert len(rows) == len(set(rows)) == 20
+    assert rows[:5] == [0, 1, 2, 3, 4]
+    assert rows[-5:] == [995, 996, 997, 998, 999]
+    assert rows == sorted(rows)
+    assert sample_rows(1000, 20, seed=1) == rows
+
+
+@pytest.fixture
+def people_xlsx(tmp_path: Path) -> str:
+    wb = openpyxl.Workbook()
+    wb.active.append(["id", "age"])
+    for i in range(1, 1001):
+        wb.active.append([str(i), "x" if i % 10 == 0 else i])
+    wb.save(path := str(tmp_path / "people.xlsx"))
+    return path
+
+
+@pytest.mark.parametrize("fixture", ["people_csv", "people_xlsx"])
+def test_quick_check(validator: Fieldset, request: Any, fixture: str):
+    result = quick_check(request.getfixturevalue(fixture), validator, sample=40, seed=1)
+    assert (result.missing, result.unknown) == ([], [])
+    assert (result.total, result.sampled, result.complete) == (1000, 40, True)
+    # first, last and random rows: the invalid ones are reported with their row number
+    sampled = [i + 1 for i in sample_rows(1000, 40, seed=1)]
+    assert list(result.errors) == [row for row in sampled if row % 10 == 0]
+    assert 10 in result.errors
+    assert 1000 in result.errors
+    assert result.errors[10] == {"age": ["Enter a whole number."]}
+
+
+def test_quick_check_xls(validator: Fieldset):
+    result = quick_check(str(Path(__file__).parent / "data" / "rdi1.xlsx"), validator, sample=10)
+    assert result.missing == ["age", "id"]
+    assert "household_id" in result.unknown
+    assert (result.total, result.sampled) == (102, 10)
+
+
+def test_quick_check_time_budget(validator: Fieldset, people_csv: str, people_xlsx: str):
+    for filepath in (people_csv, people_xlsx):
+        result = quick_check(filepath, validator, time_budget=0)
+        assert (result.sampled, result.complete) == (0, False)
+        assert result.error_rate == 0
+
+
+def test_quick_check_csv_index_budget(validator: Fieldset, people_csv: str, monkeypatch: Any):
+    # the header row indexes the first block of 100 rows, the time is over after 4 more blocks
+    clock = chain([0, 1, 2, 3, 4, 5], repeat(0))
+    monkeypatch.setattr("hope_smart_import.csvfile.DEFAULT_BLOCK_SIZE", 100)
+    monkeypatch.setattr("hope_smart_import.quickcheck.time", SimpleNamespace(monotonic=lambda: next(clock)))
+    result = quick_check(people_csv, validator, sample=40, seed=1, time_budget=4)
+    assert (result.total, result.sampled, result.complete) == (None, 40, True)
+    # the last rows of the sample are the last ones indexed: 499 data rows
+    assert max(result.errors) == 490
+
+
+def test_quick_check_xls_skip_budget(validator: Fieldset, people_xlsx: str, monkeypatch: Any):
+    # the time is also checked while the rows between the sampled ones are skipped
+    clock = iter(range(10000))
+    monkeypatch.setattr("hope_smart_import.quickcheck.SKIP_CHECK", 1)
+    monkeypatch.setattr("hope_smart_import.quickcheck.time", SimpleNamespace(monotonic=lambda: next(clock)))
+    result = quick_check(people_xlsx, validator, sample=40, seed=1, time_budget=100)
+    assert 0 < result.sampled < 40
+    assert not result.complete
@@ -7,6 +7,7 @@ from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFac
 from django import forms
 from hope_flex_fields.models import Fieldset
 
+from hope_smart_import.keyindex import CompactKeyIndex, SqliteKeyIndex
 from hope_smart_import.readers import open_xls, open_xls_multi
 from hope_smart_import.shortcuts import validate_single, validate_xls_multi
 
@@ -131,3 +132,109 @@ def test_validate_missing_master(
 
     assert errors["2:individual"] == {2: {"-": ["'missing' not found in master"]}}
     assert errors["1:household"] == {}
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_multi_workers(
+    xls_rdi: "MultiSheetResult", hh_validator: Fieldset, ind_validator: Fieldset, workers: int
+) -> None:
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+
+    errors = validate_xls_multi(xls_rdi, [hh_validator, ind_validator], fail_if_alien=True, workers=workers)
+    assert errors == {"1:household": {}, "2:individual": {}}
+    assert len(hh_validator.primary_keys) == 102
+
+
+def test_validate_missing_master_workers(
+    xls_missing_master: "MultiSheetResult",
+    hh_validator: Fieldset,
+    ind_validator: Fieldset,
+) -> None:
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+
+    errors = validate_xls_multi(xls_missing_master, [hh_validator, ind_validator], fail_if_alien=True, workers=2)
+
+    assert list(errors) == ["1:household", "2:individual"]
+    assert errors["2:individual"] == {2: {"-": ["'missing' not found in master"]}}
+    assert errors["1:household"] == {}
+
+
+@pytest.mark.parametrize("sheets", [[0, 1], [1, 0]])
+@pytest.mark.parametrize("filename", ["rdi1.xlsx", "missing_master.xlsx"])
+def test_validate_multi_workers_chunks(
+    hh_validator: Fieldset, ind_validator: Fieldset, filename: str, sheets: list[int]
+) -> None:
+    path = str(Path(__file__).parent / "data" / filename)
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+    expected = validate_xls_multi(open_xls_multi(path, [0, 1]), [hh_validator, ind_validator], fail_if_alien=True)
+    keys = set(hh_validator.primary_keys)
+    hh_validator.primary_keys = set()
+    # sheets are sent to the workers in chunks; detail sheets read before their master wait for it
+    errors = validate_xls_multi(
+        open_xls_multi(path, sheets), [hh_validator, ind_validator], fail_if_alien=True, workers=2, chunk_size=10
+    )
+    assert errors == {key: expected[key] for key in errors}
+    assert hh_validator.primary_keys == keys
+
+
+def test_workers_close_connections(
+    xls_rdi: "MultiSheetResult", hh_validator: Fieldset, ind_validator: Fieldset, monkeypatch: Any
+) -> None:
+    closed = []
+    monkeypatch.setattr("hope_smart_import.parallel.connections.close_all", lambda: closed.append(True))
+    assert validate_xls_multi(xls_rdi, [hh_validator, ind_validator], workers=2) == {
+        "1:household": {},
+        "2:individual": {},
+    }
+    # the workers do not share the connections of the parent
+    assert closed == [True]
+
+
+def test_validate_simple_workers(
+    xls_missing_master: "MultiSheetResult", hh_validator: Fieldset, ind_validator: Fieldset
+):
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+    (__, households), (__, individuals) = [(i, list(sheet)) for i, sheet in xls_missing_master]
+
+    assert validate_single(households, hh_validator, workers=2, chunk_size=10) == {}
+    errors = validate_single(individuals, ind_validator, fail_if_alien=True, workers=2, chunk_size=10)
+    assert errors == {2: {"-": ["'missing' not found in master"]}}
+
+
+@pytest.mark.parametrize("key_index", [CompactKeyIndex, SqliteKeyIndex])
+def test_validate_missing_master_key_index(
+    xls_missing_master: "MultiSheetResult", hh_validator: Fieldset, ind_validator: Fieldset, key_index: Any
+) -> None:
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+
+    errors = validate_xls_multi(
+        xls_missing_master, [hh_validator, ind_validator], fail_if_alien=True, key_index=key_index
+    )
+
+    assert errors == {"1:household": {}, "2:individual": {2: {"-": ["'missing' not found in master"]}}}
+    assert isinstance(hh_validator.primary_keys, key_index)
+
+
+def test_validate_columnar(xls_rdi: "MultiSheetResult", hh_validator: Fieldset, ind_validator: Fieldset) -> None:
+    (__, households), (__, individuals) = [(i, list(sheet)) for i, sheet in xls_rdi]
+    individuals[3] = {**individuals[3], "gender_i_c": "OTHER", "birth_date_i_c": "not a date"}
+    individuals[7] = {**individuals[7], "disability_i_c": "unknown", "alien": 1}
+    hh_validator.set_primary_key_col("household_id")
+    ind_validator.set_master(hh_validator, "household_id")
+
+    expected = {
+        "households": hh_validator.validate(households, fail_if_alien=True),
+        "individuals": ind_validator.validate(individuals, fail_if_alien=True),
+    }
+    errors = {
+        "households": validate_single(households, hh_validator, fail_if_alien=True, columnar=True),
+        "individuals": validate_single(individuals, ind_validator, fail_if_alien=True, columnar=True),
+    }
+    assert errors == expected
+    assert list(expected["individuals"]) == [4, 8]
+    assert [list(e) for e in errors["individuals"].values()] == [list(e) for e in expected["individuals"].values()]
@@ -1,10 +1,24 @@
-from collections.abc import Callable
+import io
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any, TYPE_CHECKING
 
+import openpyxl
 import pytest
-
-from hope_smart_import.readers import open_csv, open_xls, open_xls_multi, SheetNotError
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+
+from hope_smart_import import readers
+from hope_smart_import.csvfile import CsvFile
+from hope_smart_import.readers import (
+    open_csv,
+    open_csv_batches,
+    open_xls,
+    open_xls_batches,
+    open_xls_multi,
+    Row,
+    rows_from_batches,
+    SheetNotError,
+)
 
 if TYPE_CHECKING:
     from hope_smart_import.types import ValueMapper
@@ -125,3 +139,249 @@ def test_read_multi_xls_invalid_sheet_index(xls: str) -> None:
 def test_read_multi_xls_invalid_sheet_name(xls: str) -> None:
     with pytest.raises(SheetNotError):
         list(open_xls_multi(xls, indices_or_names=["foo"]))
+
+
+@pytest.mark.parametrize("read_only", [True, False])
+def test_read_xls_read_only(xls: str, read_only: bool) -> None:
+    assert list(open_xls(xls, read_only=read_only)) == XLS_DATA[0]
+    assert [list(sheet) for __, sheet in open_xls_multi(xls, [0, 1], read_only=read_only)] == XLS_DATA
+
+
+@pytest.fixture
+def workbooks(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    opened = []
+
+    def _load_workbook(filepath: str, read_only: bool) -> Any:
+        opened.append(load_workbook(filepath, read_only=read_only))
+        return opened[-1]
+
+    load_workbook = readers.openpyxl.load_workbook
+    monkeypatch.setattr(readers, "_load_workbook", _load_workbook)
+    return opened
+
+
+def test_read_xls_closes_workbook(xls: str, workbooks: list[Any]) -> None:
+    list(open_xls(xls))
+    assert workbooks[0]._archive.fp is None
+
+
+def test_read_xls_closes_abandoned_workbook(xls: str, workbooks: list[Any]) -> None:
+    g = open_xls(xls)
+    next(g)
+    assert workbooks[0]._archive.fp is not None
+    g.close()
+    assert workbooks[0]._archive.fp is None
+
+
+def test_read_multi_xls_closes_workbook(xls: str, workbooks: list[Any]) -> None:
+    for __, sheet in open_xls_multi(xls, [0, 1]):
+        list(sheet)
+        assert workbooks[0]._archive.fp is not None
+    assert workbooks[0]._archive.fp is None
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 10])
+def test_read_csv_batches(csv: str, batch_size: int) -> None:
+    batches = list(open_csv_batches(csv, has_header=True, batch_size=batch_size))
+    assert {b.header for b in batches} == {("name", "last_name", "gender")}
+    assert [b.num_rows for b in batches] == ([1, 1] if batch_size == 1 else [2])
+    assert list(rows_from_batches(batches)) == list(open_csv(csv, has_header=True))
+
+
+@pytest.mark.parametrize("start_at", [0, 1])
+def test_read_csv_batches_no_headers(csv: str, start_at: int) -> None:
+    batches = open_csv_batches(csv, start_at_row=start_at, value_mapper=str.upper)
+    assert list(rows_from_batches(batches)) == list(open_csv(csv, start_at_row=start_at, value_mapper=str.upper))
+
+
+@pytest.mark.parametrize("start_at", [0, 1])
+def test_read_xls_batches(xls: str, start_at: int) -> None:
+    (batch,) = open_xls_batches(xls, index_or_name="Sheet1", start_at_row=start_at)
+    assert batch.header == ("name", "last_name", "gender")
+    assert batch.columns[0] == ["John1", "Jane1"][start_at:]
+    assert list(batch.rows()) == XLS_DATA[1][start_at:]
+
+
+def test_read_xls_batches_invalid_sheet(xls: str) -> None:
+    with pytest.raises(SheetNotError):
+        list(open_xls_batches(xls, index_or_name="foo"))
+
+
+@pytest.mark.parametrize("has_header", [True, False])
+@pytest.mark.parametrize("start_at", [0, 1])
+def test_read_compact(xls: str, csv: str, has_header: bool, start_at: int) -> None:
+    kwargs = {"has_header": has_header, "start_at_row": start_at, "value_mapper": str.upper}
+    compact = list(open_xls(xls, compact=True, **kwargs))
+    assert all(isinstance(row, Row) for row in compact)
+    assert compact == list(open_xls(xls, **kwargs))
+    assert len({id(row._header) for row in compact}) == 1
+
+    compact = list(open_csv(csv, compact=True, **kwargs))
+    assert all(isinstance(row, Row) for row in compact)
+    assert compact == list(open_csv(csv, **kwargs))
+
+    for __, sheet in open_xls_multi(xls, [0, 1], compact=True):
+        assert all(isinstance(row, Row) for row in sheet)
+
+
+def test_compact_row(xls: str) -> None:
+    row = next(open_xls(xls, compact=True))
+    assert row["name"] == "John"
+    assert row.get("missing") is None
+    assert "gender" in row
+    assert "missing" not in row
+    assert list(row.keys()) == ["name", "last_name", "gender"]
+    assert list(row.items()) == [("name", "John"), ("last_name", "Doe"), ("gender", "M")]
+    assert len(row) == 3
+    assert dict(row) == XLS_DATA[0][0]
+    with pytest.raises(KeyError):
+        row["missing"]
+
+
+def test_compact_batches(csv: str) -> None:
+    rows = list(rows_from_batches(open_csv_batches(csv, has_header=True), compact=True))
+    assert all(isinstance(row, Row) for row in rows)
+    assert rows == list(open_csv(csv, has_header=True))
+
+
+def test_read_csv_bom() -> None:
+    locations = str((Path(__file__).parent / "data" / "locations.csv").absolute())
+    rows = list(open_csv(locations, has_header=True, start_at_row=568))
+    assert len(rows) == 2
+    assert list(rows[0])[:2] == ["Country", "Departement"]
+    assert list(open_csv(locations, has_header=True, compact=True, start_at_row=568)) == rows
+
+
+def test_read_csv_short_and_long_rows(tmp_path: Path) -> None:
+    (tmp_path / "ragged.csv").write_text("a,b\n1\n\n1,2,3\n")
+    assert list(open_csv(str(tmp_path / "ragged.csv"), has_header=True)) == [
+        {"a": "1", "b": None},
+        {"a": "1", "b": "2", None: ["3"]},
+    ]
+
+
+def _chunks(path: str, size: int = 7) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+@pytest.mark.parametrize("has_header", [True, False])
+def test_read_csv_streams(csv: str, has_header: bool) -> None:
+    expected = list(open_csv(csv, has_header=has_header, start_at_row=1))
+    with open(csv, "rb") as f:
+        assert list(open_csv(f, has_header=has_header, start_at_row=1)) == expected
+        assert not f.closed
+    assert list(open_csv(_chunks(csv), has_header=has_header, start_at_row=1)) == expected
+    assert list(open_csv(Path(csv), has_header=has_header, start_at_row=1)) == expected
+
+
+def test_read_csv_file(csv: str) -> None:
+    # an open CsvFile is read through its index and left open for the caller
+    with CsvFile(csv) as f:
+        assert list(open_csv(f, has_header=True, start_at_row=1)) == list(
+            open_csv(csv, has_header=True, start_at_row=1)
+        )
+        assert f.indexed == len(f) == 3
+        assert list(open_csv(f)) == list(open_csv(csv))
+
+
+def test_read_csv_stream_bom() -> None:
+    locations = str((Path(__file__).parent / "data" / "locations.csv").absolute())
+    rows = list(open_csv(_chunks(locations, 1000), has_header=True, start_at_row=568))
+    assert rows == list(open_csv(locations, has_header=True, start_at_row=568))
+
+
+def test_read_csv_stream_incremental() -> None:
+    received = []
+
+    def upload() -> Iterator[bytes]:
+        for chunk in [b"a,b\n1,", b"2\n3,4\n", b"5,6\n"]:
+            received.append(chunk)
+            yield chunk
+
+    rows = open_csv(upload(), has_header=True)
+    assert next(rows) == {"a": "1", "b": "2"}
+    assert len(received) < 3
+
+
+def test_read_xls_streams(xls: str) -> None:
+    expected = list(open_xls(xls, index_or_name=1))
+    with open(xls, "rb") as f:
+        assert list(open_xls(f, index_or_name=1)) == expected
+        assert not f.closed
+    assert list(open_xls(io.BytesIO(Path(xls).read_bytes()), index_or_name=1)) == expected
+    assert list(open_xls(_chunks(xls, 1024), index_or_name=1)) == expected
+    sheets = [list(rows) for __, rows in open_xls_multi(_chunks(xls, 1024), [0, 1])]
+    assert sheets == XLS_DATA
+
+
+def test_read_uploaded_files(xls: str, csv: str) -> None:
+    content = Path(xls).read_bytes()
+    assert list(open_xls(SimpleUploadedFile("r1.xlsx", content))) == XLS_DATA[0]
+    upload = TemporaryUploadedFile("r1.csv", "text/csv", 0, "utf-8")
+    upload.write(Path(csv).read_bytes())
+    upload.flush()
+    assert list(open_csv(upload, has_header=True)) == list(open_csv(csv, has_header=True))
+    upload.close()
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_read_long_rows(tmp_path: Path, compact: bool) -> None:
+    (tmp_path / "ragged.csv").write_text("a,b\nx\nx,y,z\n")
+    rows = list(open_csv(str(tmp_path / "ragged.csv"), has_header=True, compact=compact))
+    assert [dict(row) for row in rows] == [{"a": "x", "b": None}, {"a": "x", "b": "y", None: ["z"]}]
+    assert rows[1][None] == ["z"]
+    # extra values are kept as read
+    rows = open_csv(
+        str(tmp_path / "ragged.csv"), has_header=True, compact=compact, start_at_row=1, value_mapper=str.upper
+    )
+    assert [dict(row) for row in rows] == [{"a": "X", "b": "Y", None: ["z"]}]
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for row in [["a", "b"], [1], [1, 2, 3, 4]]:
+        ws.append(row)
+    wb.save(tmp_path / "ragged.xlsx")
+    rows = list(open_xls(str(tmp_path / "ragged.xlsx"), compact=compact))
+    assert [dict(row) for row in rows] == [{"a": 1, "b": None}, {"a": 1, "b": 2, None: [3, 4]}]
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_read_batches_long_rows(tmp_path: Path, compact: bool) -> None:
+    (tmp_path / "ragged.csv").write_text("a,b\nx\nx,y,z,w\nx,y\n")
+    batches = list(open_csv_batches(str(tmp_path / "ragged.csv"), has_header=True, batch_size=2))
+    assert [batch.header for batch in batches] == [("a", "b", None), ("a", "b")]
+    assert batches[0].columns[2] == [None, ["z", "w"]]
+    rows = rows_from_batches(batches, compact=compact)
+    assert [dict(row) for row in rows] == list(open_csv(str(tmp_path / "ragged.csv"), has_header=True))
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_read_csv_blank_lines(tmp_path: Path, compact: bool) -> None:
+    (tmp_path / "blank.csv").write_text("\na,b\n\n1,2\n\n3,4\n")
+    rows = open_csv(str(tmp_path / "blank.csv"), has_header=True, start_at_row=1, compact=compact)
+    assert [dict(row) for row in rows] == [{"a": "3", "b": "4"}]
+    rows = open_csv(str(tmp_path / "blank.csv"), start_at_row=1, compact=compact)
+    assert [dict(row) for row in rows] == [{"column1": "1", "column2": "2"}, {"column1": "3", "column2": "4"}]
+    with open(tmp_path / "blank.csv", "rb") as f:
+        assert [dict(row) for row in open_csv(f, start_at_row=1, compact=compact)] == [
+            {"column1": "1", "column2": "2"},
+            {"column1": "3", "column2": "4"},
+        ]
+
+
+def test_read_csv_literal_quotes(tmp_path: Path) -> None:
+    (tmp_path / "inches.csv").write_text('a,b\n5" tv,1\nx,2\ny,3\nz,4\n')
+    rows = list(open_csv(str(tmp_path / "inches.csv"), has_header=True, start_at_row=1))
+    assert rows == [{"a": "x", "b": "2"}, {"a": "y", "b": "3"}, {"a": "z", "b": "4"}]
+    with open(tmp_path / "inches.csv", "rb") as f:
+        assert list(open_csv(f, has_header=True, start_at_row=1)) == rows
+
+
+def test_read_csv_utf16(tmp_path: Path, csv: str) -> None:
+    (tmp_path / "utf16.csv").write_text(Path(csv).read_text(), encoding="utf-16")
+    expected = list(open_csv(csv, has_header=True))
+    assert list(open_csv(str(tmp_path / "utf16.csv"), has_header=True, encoding="utf-16")) == expected
+    batches = open_csv_batches(str(tmp_path / "utf16.csv"), has_header=True, encoding="utf-16")
+    assert list(rows_from_batches(batches)) == expected
@@ -0,0 +1,140 @@
+# mypy: disable-error-code="no-untyped-def"
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.factories import FieldsetFactory, FlexFieldFactory
+from demo.models import Household
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import import reference
+from hope_smart_import.generation import next_generation
+from hope_smart_import.reference import (
+    ReferenceIndex,
+    ReferenceValidator,
+    get_reference,
+    register_csv,
+    register_model,
+)
+from hope_smart_import.shortcuts import validate_single
+
+LOCATIONS = Path(__file__).parent / "data" / "locations.csv"
+LEVELS = ["ADMIN0", "ADMIN1", "ADMIN2", "ADMIN3"]
+COLUMNS = {"ADMIN0": "country_h_c", "ADMIN1": "admin1_h_c", "ADMIN2": "admin2_h_c"}
+
+
+@pytest.fixture
+def locations() -> ReferenceIndex:
+    return ReferenceIndex.from_csv(LOCATIONS, LEVELS)
+
+
+@pytest.fixture
+def registry(monkeypatch: Any) -> None:
+    monkeypatch.setattr(reference, "_loaders", {})
+    monkeypatch.setattr(reference, "_indexes", {})
+    monkeypatch.setattr(reference, "_models", {})
+
+
+def test_index(locations: ReferenceIndex):
+    assert list(locations.parents["ADMIN0"]) == ["HT"]
+    assert locations.contains("ADMIN2", "HT0131")
+    assert not locations.contains("ADMIN1", "HT0131")
+    assert locations.ancestor("ADMIN3", "HT0131-10", "ADMIN1") == "HT01"
+    assert locations.ancestor("ADMIN2", "HT0131", "ADMIN2") == "HT0131"
+
+
+def test_index_conflict():
+    with pytest.raises(ValueError, match="two parents"):
+        ReferenceIndex.from_rows(["a", "b"], [{"a": "1", "b": "x"}, {"a": "2", "b": "x"}])
+
+
+def test_validator(locations: ReferenceIndex):
+    rows = [
+        {"country_h_c": "HT", "admin1_h_c": "HT01", "admin2_h_c": "HT0131"},
+        {"country_h_c": "HT", "admin1_h_c": "HT07", "admin2_h_c": "HT0131"},
+        {"country_h_c": "XX", "admin1_h_c": "", "admin2_h_c": "HT9999"},
+        {"country_h_c": "HT", "admin1_h_c": None, "admin2_h_c": "HT0731"},
+    ]
+    assert ReferenceValidator(locations, COLUMNS).validate_batch(rows) == [
+        None,
+        {"admin2_h_c": ["'HT0131' does not belong to ADMIN1 'HT07'"]},
+        {"country_h_c": ["'XX' is not a valid ADMIN0"], "admin2_h_c": ["'HT9999' is not a valid ADMIN2"]},
+        None,
+    ]
+    # without the intermediate column the nearest ancestor is checked
+    columns = {"ADMIN0": "country_h_c", "ADMIN2": "admin2_h_c"}
+    assert ReferenceValidator(locations, columns).validate_batch([{"country_h_c": "DO", "admin2_h_c": "HT0131"}]) == [
+        {"country_h_c": ["'DO' is not a valid ADMIN0"], "admin2_h_c": ["'HT0131' does not belong to ADMIN0 'DO'"]}
+    ]
+
+
+@pytest.fixture
+def hh_validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="household")
+    for name in ["household_id", "country_h_c", "admin1_h_c", "admin2_h_c"]:
+        FlexFieldFactory(name=name, fieldset=fs)
+    fs.set_primary_key_col("household_id")
+    return fs
+
+
+def test_validate_single(hh_validator: Fieldset, locations: ReferenceIndex):
+    rows = [
+        {"household_id": "1", "country_h_c": "HT", "admin1_h_c": "HT01", "admin2_h_c": "HT0131"},
+        {"household_id": "1", "country_h_c": "HT", "admin1_h_c": "HT07", "admin2_h_c": "HT0131"},
+    ]
+    references = [ReferenceValidator(locations, COLUMNS)]
+    assert validate_single(rows, hh_validator, references=references) == {
+        2: {"-": ["1 duplicated"], "admin2_h_c": ["'HT0131' does not belong to ADMIN1 'HT07'"]}
+    }
+    with pytest.raises(ValueError, match="references"):
+        validate_single(rows, hh_validator, references=references, workers=2)
+
+
+def test_register_csv(registry: None, tmp_path: Path):
+    filepath = str(tmp_path / "locations.csv")
+    shutil.copy(LOCATIONS, filepath)
+    register_csv("locations", filepath, LEVELS)
+
+    index = get_reference("locations")
+    assert get_reference("locations") is index
+
+    with open(filepath, "a") as f:
+        f.write("Dominican Republic,,,,DO,DO01,,\n")
+    os.utime(filepath, ns=(1, 1))
+    assert get_reference("locations").contains("ADMIN1", "DO01")
+
+    reference.invalidate()
+    assert get_reference("locations") is not index
+
+    with pytest.raises(KeyError):
+        get_reference("missing")
+
+
+def test_register_model(registry: None, db: Any):
+    register_model("households", Household, ["name"])
+    validator = ReferenceValidator("households", {"name": "household"})
+    assert validator.validate_batch([{"household": "h1"}]) == [{"household": ["'h1' is not a valid name"]}]
+
+    Household.objects.create(name="h1")
+    validator.setup()
+    assert validator.validate_batch([{"household": "h1"}]) == [None]
+
+
+def test_invalidate_per_dataset(registry: None, db: Any):
+    register_model("households", Household, ["name"])
+    register_csv("locations", str(LOCATIONS), LEVELS)
+    households, locations = get_reference("households"), get_reference("locations")
+    # saving a record reloads only the datasets of its model
+    Household.objects.create(name="h1")
+    assert get_reference("households") is not households
+    assert get_reference("locations") is locations
+
+    households = get_reference("households")
+    reference.invalidate("locations")
+    assert get_reference("locations") is not locations
+    assert get_reference("households") is households
+    # another process invalidated the dataset
+    next_generation(f"{reference.GENERATION_KEY}:households")
+    assert get_reference("households") is not households
@@ -0,0 +1,100 @@
+# mypy: disable-error-code="no-untyped-def"
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from demo.factories import FieldDefinitionFactory, FieldsetFactory, FlexFieldFactory
+from django import forms
+from hope_flex_fields.models import Fieldset
+
+from hope_smart_import.readers import open_xls_multi
+from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+from hope_smart_import.sinks import AggregateSink, DictSink, ErrorSink, JsonLinesSink
+
+ROWS = [
+    {"id": "1", "age": "1"},
+    {"id": "2", "age": "x"},
+    {"id": "1", "age": "2"},
+    {"id": "3", "age": "y"},
+    {"id": "4", "age": "3"},
+]
+
+
+@pytest.fixture
+def validator(db: Any) -> Fieldset:
+    fs = FieldsetFactory(name="people")
+    FlexFieldFactory(name="id", fieldset=fs)
+    FlexFieldFactory(name="age", fieldset=fs, definition=FieldDefinitionFactory(field_type=forms.IntegerField))
+    fs.set_primary_key_col("id")
+    return fs
+
+
+def test_dict_sink(validator: Fieldset):
+    expected = validator.validate(ROWS)
+    assert validate_single(ROWS, validator, sink=DictSink()).result() == expected
+
+    sink = validate_single(ROWS, validator, sink=DictSink(max_errors=2))
+    assert sink.result() == {2: expected[2], 3: expected[3]}
+    assert (sink.total, sink.stored, sink.truncated) == (3, 2, True)
+
+
+def test_jsonlines_sink(validator: Fieldset, tmp_path: Path):
+    with JsonLinesSink(tmp_path / "errors.jsonl") as sink:
+        validate_single(ROWS, validator, sink=sink)
+    lines = [json.loads(line) for line in (tmp_path / "errors.jsonl").read_text().splitlines()]
+    assert [line["row"] for line in lines] == [2, 3, 4]
+    assert lines[1] == {"sheet": None, "row": 3, "errors": {"-": ["1 duplicated"]}}
+
+    buffer = io.StringIO()
+    sink = validate_single(ROWS, validator, sink=JsonLinesSink(buffer, max_errors=1))
+    assert len(buffer.getvalue().splitlines()) == 1
+    assert sink.result() == {"rows": 3, "written": 1, "truncated": True}
+
+
+def test_aggregate_sink(validator: Fieldset):
+    sink = validate_single(ROWS * 2, validator, sink=AggregateSink(samples=2))
+    groups = sink.result()
+    assert groups[0] == {
+        "sheet": None,
+        "column": "age",
+        "message": "Enter a whole number.",
+        "count": 4,
+        "rows": [2, 4],
+    }
+    assert {g["message"] for g in groups[1:]} == {"1 duplicated", "2 duplicated", "3 duplicated", "4 duplicated"}
+
+    sink = validate_single(ROWS * 2, validator, sink=AggregateSink(max_errors=2))
+    assert len(sink.result()) == 2
+    assert sink.truncated
+    assert sink.overflow == 3
+
+
+def test_sink_include_success(validator: Fieldset):
+    with pytest.raises(ValueError, match="include_success"):
+        validate_single(ROWS, validator, include_success=True, sink=DictSink())
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sink_multi(db: Any, workers: int):
+    hh = FieldsetFactory(name="household")
+    FlexFieldFactory(name="household_id", fieldset=hh)
+    ind = FieldsetFactory(name="individual")
+    FlexFieldFactory(name="household_id", fieldset=ind)
+    hh.set_primary_key_col("household_id")
+    ind.set_master(hh, "household_id")
+    g = open_xls_multi(str(Path(__file__).parent / "data" / "missing_master.xlsx"), [0, 1])
+
+    sink = validate_xls_multi(g, [hh, ind], workers=workers, sink=DictSink())
+
+    assert sink.result()["2:individual"] == {2: {"-": ["'missing' not found in master"]}}
+
+
+def test_error_sink_abstract():
+    class Incomplete(ErrorSink):
+        def store(self, row: int, errors: dict[str, Any], sheet: str | None) -> bool:
+            return True
+
+    with pytest.raises(TypeError, match="result"):
+        Incomplete()
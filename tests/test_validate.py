@@ -6,8 +6,15 @@ import pytest
 from demo.factories import FieldsetFactory, FlexFieldFactory
 from hope_flex_fields.models import Fieldset
 
-from hope_smart_import.readers import open_xls, open_xls_multi
-from hope_smart_import.shortcuts import validate_single, validate_xls_multi
+from hope_smart_import.readers import (
+    open_csv,
+    open_csv_batches,
+    open_xls,
+    open_xls_batches,
+    open_xls_multi,
+    rows_from_batches,
+)
+from hope_smart_import.shortcuts import validate_batches, validate_single, validate_xls_multi
 
 
 @pytest.fixture
@@ -40,8 +47,9 @@ def test_validate_simple(xls_simple: Iterable, simple_validator: Fieldset):
     }
 
 
-def test_validate_xls_multi(xls_multi: Iterable, simple_validator) -> None:
-    errors = validate_xls_multi(xls_multi, [simple_validator, simple_validator], fail_if_alien=True)
+@pytest.mark.parametrize("workers", [0, 2])
+def test_validate_xls_multi(xls_multi: Iterable, simple_validator, workers) -> None:
+    errors = validate_xls_multi(xls_multi, [simple_validator, simple_validator], fail_if_alien=True, workers=workers)
     assert errors == {
         "1:Simple Validator": {
             1: {"-": ["Alien values found {'gender'}"]},
@@ -52,3 +60,64 @@ def test_validate_xls_multi(xls_multi: Iterable, simple_validator) -> None:
             2: {"-": ["Alien values found {'gender'}"]},
         },
     }
+
+
+def test_validate_batches(simple_validator: Fieldset) -> None:
+    batches = open_xls_batches(str((Path(__file__).parent / "data" / "r1.xlsx").absolute()), batch_size=1)
+    errors = validate_single(rows_from_batches(batches), simple_validator, fail_if_alien=True)
+    assert errors == {
+        1: {"-": ["Alien values found {'gender'}"]},
+        2: {"-": ["Alien values found {'gender'}"]},
+    }
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_validate_batches_directly(simple_validator: Fieldset, tmp_path: Path, batch_size: int) -> None:
+    simple_validator.set_primary_key_col("name")
+    path = tmp_path / "people.csv"
+    path.write_text("name,last_name\nJohn,Doe\nJane,Doe\nJohn,Doe,extra\nJim\n")
+    expected = validate_single(open_csv(str(path), has_header=True), simple_validator, fail_if_alien=True)
+    assert expected == {3: {"-": ["Alien values found {None}", "John duplicated"]}}
+    batches = open_csv_batches(str(path), has_header=True, batch_size=batch_size)
+    assert validate_batches(batches, simple_validator, fail_if_alien=True) == expected
+    batches = open_csv_batches(str(path), has_header=True, batch_size=batch_size)
+    assert validate_batches(batches, simple_validator, fail_if_alien=True, max_errors=1) == expected
+
+
+def test_validate_compact(simple_validator: Fieldset) -> None:
+    rows = open_xls(str((Path(__file__).parent / "data" / "r1.xlsx").absolute()), compact=True)
+    errors = validate_single(rows, simple_validator, fail_if_alien=True)
+    assert errors == {
+        1: {"-": ["Alien values found {'gender'}"]},
+        2: {"-": ["Alien values found {'gender'}"]},
+    }
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+@pytest.mark.parametrize("include_success", [True, False])
+def test_validate_single_workers(simple_validator: Fieldset, chunk_size: int, include_success: bool) -> None:
+    rows = [
+        {"name": "John", "last_name": "Doe"},
+        {"name": "Jane", "last_name": "Doe", "gender": "F"},
+        {"name": "John", "last_name": "Doe", "gender": "M"},
+        {"name": "Jane", "last_name": "Doe"},
+        {"name": "John", "last_name": "Doe"},
+    ]
+    simple_validator.set_primary_key_col("name")
+    simple_validator.collect("last_name")
+    expected = validate_single(rows, simple_validator, include_success=include_success, fail_if_alien=True)
+    assert expected[3] == {"-": ["Alien values found {'gender'}", "John duplicated"]}
+
+    simple_validator.collect("last_name")
+    errors = validate_single(
+        iter(rows),
+        simple_validator,
+        include_success=include_success,
+        fail_if_alien=True,
+        workers=2,
+        chunk_size=chunk_size,
+    )
+    assert errors == expected
+    assert list(errors) == list(expected)
+    assert simple_validator.primary_keys == {"John", "Jane"}
+    assert simple_validator.collected("last_name") == ["Doe"] * 5